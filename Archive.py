@@ -0,0 +1,230 @@
+from SvgFile import SvgFile
+import posixpath
+import tarfile
+import time
+import zipfile
+
+"""
+    Zip and tar archives as a source of SvgFiles and as a place to save them to,
+    without extracting anything to disk first.
+
+    Members are named by the path of the archive followed by their path in it
+    (/path/to/icons.zip/actions/add.svg) so SvgFile.getOutputFilePath() keeps
+    any folders inside the archive, whether saving to a folder or another archive.
+    Members whose name would take them out of the archive (/etc/evil.svg,
+    ../evil.svg) are left out, they'd end up outside the output folder.
+"""
+class Archive:
+    # {extension: mode to open it for writing with}
+    WRITEMODES = {
+        '.zip': None,
+        '.tar': 'w',
+        '.tar.gz': 'w:gz',
+        '.tgz': 'w:gz',
+        '.tar.bz2': 'w:bz2',
+        '.tar.xz': 'w:xz',
+    }
+    FILEFILTER = 'Archives (*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz)'
+
+    @staticmethod
+    def IsArchive(path: str) -> bool:
+        return path.lower().endswith(tuple(Archive.WRITEMODES))
+
+    @staticmethod
+    def MemberPath(archivePath: str, name: str) -> str:
+        return f'{archivePath}/{name}'
+
+    """
+        Returns:
+            str: name without any './' or doubled slashes, None for names that
+            are absolute or go up a folder anywhere.
+    """
+    @staticmethod
+    def SafeMemberName(name: str) -> str:
+        parts = name.replace('\\', '/').split('/')
+        # '/etc' and 'C:/Windows' are absolute
+        if parts[0] == '' or ':' in parts[0] or '..' in parts:
+            return None
+
+        return posixpath.normpath('/'.join(parts))
+
+    """
+        Reads all the .svg files in an archive, or in a folder when path isn't
+        an archive (see SvgFile.LoadFolder). Archives are read in a single pass,
+        tar archives as a stream. Members with the same content share a single
+        parsed SvgFile, see SvgFile.Load.
+
+        Raises:
+            OSError: if the archive can't be read.
+            ValueError: if it isn't a valid archive.
+    """
+    @staticmethod
+    def LoadSvgFiles(path: str) -> list:
+        if not Archive.IsArchive(path):
+            return SvgFile.LoadFolder(path)
+
+        svgFiles = []
+        loaded = {}
+        try:
+            if path.lower().endswith('.zip'):
+                with zipfile.ZipFile(path) as archive:
+                    for info in archive.infolist():
+                        name = Archive.SafeMemberName(info.filename)
+                        if name is not None and not info.is_dir() and name.lower().endswith('.svg'):
+                            svgFiles.append(SvgFile.Load(Archive.MemberPath(path, name), loaded, archive.read(info)))
+            else:
+                with tarfile.open(path, 'r|*') as archive:
+                    for member in archive:
+                        name = Archive.SafeMemberName(member.name)
+                        if name is not None and member.isfile() and name.lower().endswith('.svg'):
+                            content = archive.extractfile(member).read()
+                            svgFiles.append(SvgFile.Load(Archive.MemberPath(path, name), loaded, content))
+        except (zipfile.BadZipFile, tarfile.TarError) as error:
+            raise ValueError(f'{path} is not a valid archive: {error}')
+
+        return svgFiles
+
+
+"""
+    Looks up members of an existing archive by name, to compare against what
+    saving to it would write (see ChangeReport). Member names are made safe the
+    same way Archive.LoadSvgFiles does.
+
+    Use as a context manager:
+        with ArchiveReader(path) as archive:
+            size = archive.size(name)
+
+    Raises:
+        OSError: if the archive can't be read.
+        ValueError: if it isn't a valid archive.
+"""
+class ArchiveReader:
+    def __init__(self, path: str):
+        try:
+            if path.lower().endswith('.zip'):
+                self.archive = zipfile.ZipFile(path)
+                members = [(info.filename, info) for info in self.archive.infolist() if not info.is_dir()]
+            else:
+                self.archive = tarfile.open(path)
+                members = [(member.name, member) for member in self.archive.getmembers() if member.isfile()]
+        except (zipfile.BadZipFile, tarfile.TarError) as error:
+            raise ValueError(f'{path} is not a valid archive: {error}')
+
+        # {name: ZipInfo or TarInfo}
+        self.members = {}
+        for name, member in members:
+            name = Archive.SafeMemberName(name)
+            if name is not None:
+                self.members[name] = member
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        self.archive.close()
+
+    # None if there's no such member
+    def size(self, name: str) -> int:
+        member = self.members.get(name)
+        if member is None:
+            return None
+
+        return member.file_size if isinstance(member, zipfile.ZipInfo) else member.size
+
+    # A file object to read the member from
+    def open(self, name: str):
+        member = self.members[name]
+        if isinstance(member, zipfile.ZipInfo):
+            return self.archive.open(member)
+
+        return self.archive.extractfile(member)
+
+
+"""
+    Feeds the chunks of SvgFile.iterateColorMappedChunks to tarfile, which reads
+    fixed size blocks from a file object.
+"""
+class ChunkReader:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.chunk = b''
+        # How much of chunk has been read
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        pieces = []
+        while size != 0:
+            if self.position == len(self.chunk):
+                self.chunk = next(self.chunks, None)
+                self.position = 0
+                if self.chunk is None:
+                    self.chunk = b''
+                    break
+
+            end = len(self.chunk) if size < 0 else min(len(self.chunk), self.position + size)
+            pieces.append(self.chunk[self.position:end])
+            if size > 0:
+                size -= end - self.position
+            self.position = end
+
+        return b''.join(pieces)
+
+
+"""
+    Writes color mapped SvgFiles straight into a new zip or tar archive (the
+    format follows from the extension), a chunk at a time so large files are
+    streamed into the archive as well.
+
+    Use as a context manager:
+        with ArchiveWriter(path) as archive:
+            archive.add(name, svgFile)
+"""
+class ArchiveWriter:
+    def __init__(self, path: str):
+        self.path = path
+        extension = next(extension for extension in Archive.WRITEMODES if path.lower().endswith(extension))
+        self.writeMode = Archive.WRITEMODES[extension]
+        if self.writeMode is None:
+            self.archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = tarfile.open(path, self.writeMode)
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        self.archive.close()
+
+    """
+        Adds svgFile with its color mapping applied.
+
+        Args:
+            name (str) path of the member inside the archive.
+            minifier (SvgMinifier, optional) minifies the file on the way.
+    """
+    def add(self, name: str, svgFile: SvgFile, minifier=None):
+        if minifier is None:
+            chunks = svgFile.iterateColorMappedChunks(svgFile.compiledColorMap)
+        else:
+            chunks = minifier.iterateChunks(svgFile)
+            if self.writeMode is not None:
+                # There's no telling the size of a minified file without minifying it
+                content = b''.join(chunks)
+                chunks = iter((content,))
+        if self.writeMode is None:
+            with self.archive.open(name, 'w', force_zip64=svgFile.streamed) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+        else:
+            # Tar needs the size up front, it follows from the color counts (or
+            # the minified content)
+            info = tarfile.TarInfo(name)
+            info.size = svgFile.getColorMappedSize(svgFile.compiledColorMap) if minifier is None else len(content)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, ChunkReader(chunks))
@@ -0,0 +1,234 @@
+from SvgFile import SvgFile, CompiledColorMap
+from ThemeVariables import ThemeVariables
+from ColorTable import ColorTable
+from Archive import Archive, ArchiveReader
+import csv
+import json
+import os
+import sys
+
+"""
+    What saving a single file would do: which colors get replaced (and how often)
+    and how the result compares to what's already in the output folder.
+"""
+class FileChange:
+    NEW = 'new'
+    CHANGED = 'changed'
+    UNCHANGED = 'unchanged'
+
+    def __init__(self, filePath: str, outputFilePath: str, replacements: list, status: str):
+        self.filePath = filePath
+        self.outputFilePath = outputFilePath
+        # [(oldHex, newHex, occurrences)]
+        self.replacements = replacements
+        self.status = status
+
+    def occurrences(self) -> int:
+        return sum(count for _, _, count in self.replacements)
+
+"""
+    A dry run of saving: lists per file what would be written without writing
+    (or rendering) anything.
+
+    Everything is worked out from the color counts SvgFile already collected
+    while reading the file. The output folder is only looked at to tell whether
+    a file is new, and the file itself is only read when its size matches what
+    the mapped output would be, any other size means it changes.
+
+    Files saved minified or with CSS variables (see SvgMinifier and
+    ThemeVariables) are compared against what saving that way would write,
+    their size isn't known up front so those are always read. When saving to
+    an archive that already exists its members are compared instead.
+"""
+class ChangeReport:
+    def __init__(self, changes: list):
+        self.changes = changes
+
+    """
+        Args:
+            svgFiles (list) the SvgFiles that would be saved.
+            colorMap (dict) {oldColor: newColor} the mapping that would be applied
+            (ColorTable integers), None to use the colorMap each svgFile has set.
+            inputFolder (str) folder the svgFiles were read from.
+            outputFolder (str) folder the svgFiles would be saved to.
+            mode (str) how colors are written, see ThemeVariables.MODES.
+            minifier (SvgMinifier, optional) minifies the files, for mode HEX.
+    """
+    @staticmethod
+    def Build(
+        svgFiles: list, colorMap: dict, inputFolder: str, outputFolder: str,
+        mode: str = ThemeVariables.HEX, minifier=None
+    ) -> 'ChangeReport':
+        # Saving to an archive that's already there replaces it, its members are
+        # what the files compare against
+        archive = None
+        if Archive.IsArchive(outputFolder) and os.path.isfile(outputFolder):
+            archive = ArchiveReader(outputFolder)
+
+        changes = []
+        stylesheetColorMap = ThemeVariables.StylesheetColorMap(svgFiles, colorMap)
+        try:
+            for svgFile in svgFiles:
+                fileColorMap = svgFile.colorMap if colorMap is None else svgFile.restrictColorMap(colorMap)
+                replacements = [
+                    (ColorTable.ToHex(color), ColorTable.ToHex(newColor), svgFile.colors[color])
+                    for color, newColor in fileColorMap.items()
+                ]
+
+                outputFilePath = svgFile.getOutputFilePath(inputFolder, outputFolder)
+                if archive is None:
+                    status = ChangeReport.CompareWithDisk(
+                        svgFile, fileColorMap, outputFilePath, outputFolder, mode, minifier, stylesheetColorMap
+                    )
+                else:
+                    status = ChangeReport.CompareWithArchive(
+                        svgFile, fileColorMap, archive, svgFile.getRelativePath(inputFolder), minifier
+                    )
+                changes.append(FileChange(svgFile.filePath, outputFilePath, replacements, status))
+        finally:
+            if archive is not None:
+                archive.close()
+
+        return ChangeReport(changes)
+
+    @staticmethod
+    def CompareWithDisk(
+        svgFile: SvgFile, fileColorMap: dict, outputFilePath: str, outputFolder: str,
+        mode: str = ThemeVariables.HEX, minifier=None, stylesheetColorMap: dict = None
+    ) -> str:
+        try:
+            sizeOnDisk = os.stat(outputFilePath).st_size
+        except OSError:
+            return FileChange.NEW
+
+        if mode != ThemeVariables.HEX:
+            headers = ThemeVariables.Headers(
+                svgFile, mode, outputFilePath, outputFolder, stylesheetColorMap or {}, fileColorMap
+            )
+            chunks = ThemeVariables.IterateChunks(svgFile, headers)
+        else:
+            chunks = ChangeReport.HexChunks(svgFile, fileColorMap, sizeOnDisk, minifier)
+            if chunks is None:
+                return FileChange.CHANGED
+
+        # Compared a chunk at a time, large (streamed) files never get read whole
+        return FileChange.UNCHANGED if SvgFile.IsSavedAs(outputFilePath, chunks) else FileChange.CHANGED
+
+    # Like CompareWithDisk for a member of an archive, those are always saved in mode HEX
+    @staticmethod
+    def CompareWithArchive(
+        svgFile: SvgFile, fileColorMap: dict, archive: ArchiveReader, name: str, minifier=None
+    ) -> str:
+        size = archive.size(name)
+        if size is None:
+            return FileChange.NEW
+
+        chunks = ChangeReport.HexChunks(svgFile, fileColorMap, size, minifier)
+        if chunks is None:
+            return FileChange.CHANGED
+
+        return FileChange.UNCHANGED if SvgFile.IsSavedAs(archive.open(name), chunks) else FileChange.CHANGED
+
+    """
+        Returns:
+            generator: the chunks saving svgFile with hex colors writes, None if
+            they can't add up to savedSize.
+    """
+    @staticmethod
+    def HexChunks(svgFile: SvgFile, fileColorMap: dict, savedSize: int, minifier=None):
+        if minifier is not None:
+            return minifier.iterateChunks(svgFile, fileColorMap)
+
+        # The size of the output follows directly from the color counts and the
+        # length of what they're replaced with, the content is only compared
+        # when that matches.
+        compiledColorMap = CompiledColorMap.Compile(fileColorMap)
+        if savedSize != svgFile.getColorMappedSize(compiledColorMap):
+            return None
+
+        return svgFile.iterateColorMappedChunks(compiledColorMap)
+
+    def changedFiles(self) -> list:
+        return [change for change in self.changes if change.status != FileChange.UNCHANGED]
+
+    def summary(self) -> str:
+        counts = {FileChange.NEW: 0, FileChange.CHANGED: 0, FileChange.UNCHANGED: 0}
+        for change in self.changes:
+            counts[change.status] += 1
+        occurrences = sum(change.occurrences() for change in self.changes)
+
+        return '{} files: {} new, {} changed, {} unchanged. {} color occurrences replaced'.format(
+            len(self.changes), counts[FileChange.NEW], counts[FileChange.CHANGED],
+            counts[FileChange.UNCHANGED], occurrences
+        )
+
+    # One row per replaced color per file, files without replacements get a
+    # single row with empty color columns.
+    def exportCsv(self, filePath: str):
+        with open(filePath, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(('file', 'output file', 'status', 'old color', 'new color', 'occurrences'))
+            for change in self.changes:
+                rows = change.replacements or [('', '', 0)]
+                for color, newColor, count in rows:
+                    writer.writerow((change.filePath, change.outputFilePath, change.status, color, newColor, count))
+
+    def exportJson(self, filePath: str):
+        report = [
+            {
+                'file': change.filePath,
+                'outputFile': change.outputFilePath,
+                'status': change.status,
+                'replacements': [
+                    {'old': color, 'new': newColor, 'occurrences': count}
+                    for color, newColor, count in change.replacements
+                ],
+            }
+            for change in self.changes
+        ]
+        with open(filePath, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+    # Picks the format based on the extension, .json or anything else for .csv
+    def export(self, filePath: str):
+        if filePath.lower().endswith('.json'):
+            self.exportJson(filePath)
+        else:
+            self.exportCsv(filePath)
+
+
+"""
+    Headless use, prints the summary of what saving a project would do:
+        python ChangeReport.py path/to/project.json [path/to/report.csv|.json]
+"""
+if __name__ == '__main__':
+    from ProjectFile import ProjectFile
+    from IconIndex import IconIndex
+    from MappingLayers import MappingLayers
+    from Settings import SettingsVar
+
+    usage = 'Usage: python ChangeReport.py project.json [report.csv|report.json]'
+    if len(sys.argv) < 2:
+        sys.exit(usage)
+
+    try:
+        project = ProjectFile.Load(sys.argv[1])
+    except (OSError, ValueError) as error:
+        sys.exit(str(error))
+    inputFolder = project.get(SettingsVar.INPUT_FOLDER.value)
+    outputFolder = project.get(SettingsVar.OUTPUT_FOLDER.value)
+    if not inputFolder or not outputFolder:
+        sys.exit(f'{sys.argv[1]} needs both an input and an output folder\n{usage}')
+    profiles = project.get(SettingsVar.PROFILES.value, {})
+    colorSwaps = ColorTable.ParseSwaps(profiles.get(project.get(SettingsVar.CURRENT_PROFILE.value), {}))
+
+    svgFiles = Archive.LoadSvgFiles(inputFolder)
+    mappingLayers = MappingLayers(layers=project.get(SettingsVar.MAPPING_LAYERS.value) or [])
+    mappingLayers.apply(svgFiles, IconIndex(svgFiles), colorSwaps)
+    report = ChangeReport.Build(
+        svgFiles, None, inputFolder, outputFolder,
+        project.get(SettingsVar.OUTPUT_COLOR_MODE.value, ThemeVariables.HEX), ProjectFile.Minifier(project)
+    )
+    print(report.summary())
+    if len(sys.argv) > 2:
+        report.export(sys.argv[2])
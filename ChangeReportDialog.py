@@ -0,0 +1,67 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem, QPushButton, QCheckBox, QFileDialog, QMessageBox
+from PySide6.QtCore import QDir
+from ChangeReport import ChangeReport
+
+"""
+    Shows a ChangeReport: every file with the colors that would be replaced in it
+    as its children. The report can be exported as .csv or .json.
+"""
+class ChangeReportDialog(QDialog):
+    def __init__(self, parent, report: ChangeReport):
+        super().__init__(parent)
+        self.report = report
+        self.setWindowTitle('Dry run')
+        self.resize(800, 600)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(report.summary()))
+
+        self.checkboxHideUnchanged = QCheckBox('Hide unchanged files')
+        self.checkboxHideUnchanged.toggled.connect(self.populate)
+        layout.addWidget(self.checkboxHideUnchanged)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(('File', 'Status', 'Occurrences'))
+        self.tree.setUniformRowHeights(True)
+        layout.addWidget(self.tree)
+
+        layoutButtons = QHBoxLayout()
+        layoutButtons.addStretch()
+        buttonExport = QPushButton('Export...')
+        buttonExport.clicked.connect(self.onPressedExport)
+        layoutButtons.addWidget(buttonExport)
+        buttonClose = QPushButton('Close')
+        buttonClose.clicked.connect(self.accept)
+        layoutButtons.addWidget(buttonClose)
+        layout.addLayout(layoutButtons)
+
+        self.populate()
+
+    def populate(self):
+        changes = self.report.changes
+        if self.checkboxHideUnchanged.isChecked():
+            changes = self.report.changedFiles()
+
+        items = []
+        for change in changes:
+            fileItem = QTreeWidgetItem((change.outputFilePath, change.status, str(change.occurrences())))
+            fileItem.setToolTip(0, change.filePath)
+            for color, newColor, count in change.replacements:
+                QTreeWidgetItem(fileItem, (f'{color} → {newColor}', '', str(count)))
+            items.append(fileItem)
+
+        self.tree.clear()
+        self.tree.addTopLevelItems(items)
+        self.tree.resizeColumnToContents(0)
+
+    def onPressedExport(self):
+        filePath, _ = QFileDialog.getSaveFileName(
+            self, 'Export dry run', QDir.homePath(), 'CSV (*.csv);;JSON (*.json)'
+        )
+        if filePath == '':
+            return
+
+        try:
+            self.report.export(filePath)
+        except OSError as error:
+            QMessageBox.critical(self, 'Export dry run', str(error))
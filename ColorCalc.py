@@ -1,6 +1,4 @@
-from PyQt5.QtCore import QSize, Qt, QRect
-from PySide6.QtGui import QColor
-from PySide6.QtGui import QPixmap, QPainter, QFont, QIcon
+from PySide6.QtGui import QColor, QPixmap, QPainter, QFont, QIcon
 from PySide6.QtCore import QSize, QRect, Qt
 from typing import Union
 
@@ -15,6 +13,8 @@ class ColorCalc:
     GOODRATIOTHRESHOLD = 4.5
     OKRATIOTHRESHOLD = 3
     COLOROPTIONS = (QColor('#FFFFFF'), QColor('#000000'))
+    # The rating icons are drawn on first use and then reused, see ContrastRatioToIcon
+    _ratingIcons = {}
 
     @staticmethod
     def RelativeLuminance(color: QColor) -> float:
@@ -54,11 +54,17 @@ class ColorCalc:
     @staticmethod
     def ContrastRatioToIcon(contrastRatio: float) -> QIcon:
         if contrastRatio >= ColorCalc.GOODRATIOTHRESHOLD:
-            return ColorCalc.EmoticonToIcon('👍', QSize(48, 48), QColor(0, 255, 0, 128))
+            rating = ('👍', QColor(0, 255, 0, 128))
         elif contrastRatio >= ColorCalc.OKRATIOTHRESHOLD:
-            return ColorCalc.EmoticonToIcon('👌', QSize(48, 48), QColor(155, 100, 50, 128))
+            rating = ('👌', QColor(155, 100, 50, 128))
         else:
-            return ColorCalc.EmoticonToIcon('👎', QSize(48, 48), QColor(255, 0, 0, 128))
+            rating = ('👎', QColor(255, 0, 0, 128))
+
+        emoticon, hue = rating
+        if emoticon not in ColorCalc._ratingIcons:
+            ColorCalc._ratingIcons[emoticon] = ColorCalc.EmoticonToIcon(emoticon, QSize(48, 48), hue)
+
+        return ColorCalc._ratingIcons[emoticon]
 
     """
     Converts the given character(s) to a QIcon.
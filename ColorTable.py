@@ -0,0 +1,127 @@
+from PySide6.QtGui import QColor
+import re
+
+"""
+    The canonical color table, every color is interned as a single packed
+    0xAARRGGBB integer (the same layout as QRgb). Colors without an alpha
+    channel get an alpha of 0xFF, so '#abc', '#AABBCC', '#aabbcc' and '#aabbccff'
+    all end up as the very same integer.
+
+    Indexing, mapping and comparing colors is all done on these integers, hex
+    strings are only used to show colors and to write them back out.
+"""
+class ColorTable:
+    # A hex color in an SVG, followed by a ';' or whitespace like Inkscape writes
+    # them in style attributes, or by the quote closing a presentation attribute
+    # (fill="#abc"). The lookbehinds skip character references (&#123;) and
+    # links to ids that happen to look like a color (href="#add")
+    TOKENPATTERN = re.compile(
+        rb'(?<!&)(?<!href=")(?<!href=\')'
+        rb'#([0-9a-fA-F]{8}|[0-9a-fA-F]{6}|[0-9a-fA-F]{4}|[0-9a-fA-F]{3})(?=[;\s"\'])'
+    )
+    # Longest possible token ('#' + 8 digits), plus the character after it
+    MAXTOKENLENGTH = 10
+    # Bytes before a token the lookbehinds of TOKENPATTERN look at
+    LOOKBEHINDLENGTH = 6
+
+    # {spelling: color}, saves parsing the same spelling more than once
+    _interned = {}
+    # {color: {every spelling encountered}}
+    spellings = {}
+
+    """
+        Interns a spelling as found in an SVG file.
+
+        Args:
+            spelling (bytes) the hex color including the '#'.
+
+        Returns:
+            int: the color as 0xAARRGGBB
+    """
+    @staticmethod
+    def Intern(spelling: bytes) -> int:
+        color = ColorTable._interned.get(spelling)
+        if color is None:
+            color = ColorTable.Parse(spelling.decode('ascii'))
+            ColorTable._interned[spelling] = color
+            ColorTable.spellings.setdefault(color, set()).add(spelling.decode('ascii'))
+
+        return color
+
+    """
+        Args:
+            hex (str) #rgb, #rgba, #rrggbb or #rrggbbaa (case doesn't matter).
+
+        Returns:
+            int: the color as 0xAARRGGBB
+
+        Raises:
+            ValueError: if hex isn't a color in one of the above forms.
+    """
+    @staticmethod
+    def Parse(hex: str) -> int:
+        digits = hex.lstrip('#')
+        if len(digits) in (3, 4):
+            digits = ''.join(digit * 2 for digit in digits)
+        if len(digits) == 6:
+            digits += 'ff'
+        if len(digits) != 8:
+            raise ValueError(f'{hex} is not a hex color')
+
+        rgba = int(digits, 16)
+        return ((rgba & 0xFF) << 24) | (rgba >> 8)
+
+    """
+        Returns:
+            str: '#rrggbb', or '#rrggbbaa' for colors that aren't fully opaque.
+    """
+    @staticmethod
+    def ToHex(color: int) -> str:
+        alpha = color >> 24
+        if alpha == 0xFF:
+            return '#{:06x}'.format(color & 0xFFFFFF)
+        return '#{:06x}{:02x}'.format(color & 0xFFFFFF, alpha)
+
+    @staticmethod
+    def ToQColor(color: int) -> QColor:
+        return QColor.fromRgba(color)
+
+    """
+        Converts {oldHex: newHex} (how swaps are stored in the profiles) to
+        {oldColor: newColor}, anything that isn't a valid color is left out.
+    """
+    @staticmethod
+    def ParseSwaps(colorSwaps: dict) -> dict:
+        colorMap = {}
+        for oldHex, newHex in colorSwaps.items():
+            try:
+                colorMap[ColorTable.Parse(oldHex)] = ColorTable.Parse(newHex)
+            except (ValueError, AttributeError):
+                pass
+
+        return colorMap
+
+    # hex as ColorTable.ToHex writes it ('#FFF' is '#ffffff'), as is if it isn't a color
+    @staticmethod
+    def NormalizeHex(hex: str) -> str:
+        try:
+            return ColorTable.ToHex(ColorTable.Parse(hex))
+        except (ValueError, AttributeError):
+            return hex
+
+    """
+        Adds newSwaps to swaps (both {oldHex: newHex}), the way they're stored:
+        colors are written like ColorTable.ToHex writes them, so a color that
+        was stored as '#FF0000' gets replaced rather than kept next to '#ff0000'.
+        A newHex of None removes the swap.
+    """
+    @staticmethod
+    def MergeSwaps(swaps: dict, newSwaps: dict) -> dict:
+        merged = {}
+        for oldHex, newHex in (swaps | newSwaps).items():
+            if newHex is None:
+                merged.pop(ColorTable.NormalizeHex(oldHex), None)
+            else:
+                merged[ColorTable.NormalizeHex(oldHex)] = ColorTable.NormalizeHex(newHex)
+
+        return merged
@@ -0,0 +1,81 @@
+import numpy as np
+
+"""
+    Tone transforms over whole sets of colors at once: rotating the hue,
+    changing the saturation and lightness, or flipping the lightness for a dark
+    theme. Colors go in and come out as ColorTable integers (0xAARRGGBB), the
+    conversion to HSL and back is a handful of array operations for all of them.
+
+    Alpha is left alone.
+"""
+class ColorTransform:
+    """
+        Args:
+            rgb (np.ndarray) shape (n, 3) with values in the 0-1 range.
+
+        Returns:
+            np.ndarray: shape (n, 3) with hue (0-1, fraction of a turn),
+            saturation and lightness.
+    """
+    @staticmethod
+    def RgbToHsl(rgb: np.ndarray) -> np.ndarray:
+        maximum = rgb.max(axis=1)
+        minimum = rgb.min(axis=1)
+        chroma = maximum - minimum
+        lightness = (maximum + minimum) / 2
+
+        grey = chroma == 0
+        safeChroma = np.where(grey, 1, chroma)
+        saturation = np.where(grey, 0, chroma / np.where(grey, 1, 1 - np.abs(2 * lightness - 1)))
+
+        red, green, blue = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        hue = np.select(
+            (maximum == red, maximum == green),
+            (((green - blue) / safeChroma) % 6, (blue - red) / safeChroma + 2),
+            (red - green) / safeChroma + 4
+        )
+        hue = np.where(grey, 0, hue / 6)
+
+        return np.stack((hue, saturation, lightness), axis=1)
+
+    @staticmethod
+    def HslToRgb(hsl: np.ndarray) -> np.ndarray:
+        hue, saturation, lightness = hsl[:, 0], hsl[:, 1], hsl[:, 2]
+        chroma = (1 - np.abs(2 * lightness - 1)) * saturation
+        # https://en.wikipedia.org/wiki/HSL_and_HSV#HSL_to_RGB_alternative
+        k = (np.array((0, 8, 4)) + hue[:, None] * 12) % 12
+        return lightness[:, None] - chroma[:, None] / 2 * np.clip(np.minimum(k - 3, 9 - k), -1, 1)
+
+    """
+        Args:
+            colors (list) ColorTable integers.
+            hue (float) degrees to rotate the hue by.
+            saturation (float) -100 (grey) to 100 (fully saturated), 0 leaves it.
+            lightness (float) -100 (black) to 100 (white), 0 leaves it.
+            invertLightness (bool) flip the lightness first, light colors become
+            dark and the other way around while keeping their hue.
+
+        Returns:
+            np.ndarray: the transformed colors, in the same order (uint32).
+    """
+    @staticmethod
+    def Apply(
+        colors: list, hue: float = 0, saturation: float = 0, lightness: float = 0, invertLightness: bool = False
+    ) -> np.ndarray:
+        colors = np.asarray(colors, dtype=np.uint32)
+        rgb = np.stack(((colors >> 16) & 0xFF, (colors >> 8) & 0xFF, colors & 0xFF), axis=1) / 255
+        hsl = ColorTransform.RgbToHsl(rgb)
+
+        hsl[:, 0] = (hsl[:, 0] + hue / 360) % 1
+        if invertLightness:
+            hsl[:, 2] = 1 - hsl[:, 2]
+        # Moves towards the end of the range by the given percentage of the way left
+        for channel, amount in ((1, saturation), (2, lightness)):
+            amount = amount / 100
+            if amount > 0:
+                hsl[:, channel] += (1 - hsl[:, channel]) * amount
+            elif amount < 0:
+                hsl[:, channel] *= 1 + amount
+
+        rgb = np.rint(np.clip(ColorTransform.HslToRgb(hsl), 0, 1) * 255).astype(np.uint32)
+        return (colors & 0xFF000000) | (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
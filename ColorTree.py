@@ -1,10 +1,8 @@
-from PySide6.QtWidgets import QStyledItemDelegate, QStyle, QApplication
-from PySide6.QtCore import QRect, Qt
-from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
+from PySide6.QtWidgets import QApplication, QTreeWidget, QTreeWidgetItem, QStyledItemDelegate, QStyleOptionViewItem, QHeaderView
 from PySide6.QtGui import QBrush, QColor, QPainter, QFont
-from PySide6.QtWidgets import QApplication, QTreeWidget, QTreeWidgetItem, QItemDelegate, QStyledItemDelegate, QHeaderView, QStyleOptionHeader, QStyle
 from PySide6.QtCore import Qt, QRect
 from ColorCalc import ColorCalc
+from ColorTable import ColorTable
 from enum import Enum
 
 class ColIndex(Enum):
@@ -57,6 +55,7 @@ class ColorTreeWidget(QTreeWidget):
         self.setInputHalfBackground('#000000')
         self.setOutputHalfBackground('#FFFFFF')
 
+    # colors are ColorTable integers
     def addColors(self, colors: set, oldBackground: str, newBackground: str):
         colorsSet = set(colors)
 
@@ -141,11 +140,13 @@ class ColorTreeWidget(QTreeWidget):
 
 
 class ColorTreeItem(QTreeWidgetItem):
-    def __init__(self, parent, hex: str, oldBackground: QColor, newBackground: QColor):
+    def __init__(self, parent, color: int, oldBackground: QColor, newBackground: QColor):
         super().__init__(parent)
         hexFont =  QFont('DejaVu Mono, Consolas, Courier, monospace')
-        oldColor = QColor(hex)
-        newColor = QColor(hex)
+        self.color = color
+        hex = ColorTable.ToHex(color)
+        oldColor = ColorTable.ToQColor(color)
+        newColor = ColorTable.ToQColor(color)
 
         self.oldBackground = oldBackground
         self.newBackground = newBackground
@@ -169,7 +170,7 @@ class ColorTreeItem(QTreeWidgetItem):
         self.setIcon(ColIndex.NEWCONTRAST.value, newRatingIcon)
         self.setText(ColIndex.NEWHEX.value, 'Change')
         self.setFont(ColIndex.NEWHEX.value, hexFont)
-        self.setBackground(ColIndex.NEWCOLOR.value, QBrush(QColor(hex)))
+        self.setBackground(ColIndex.NEWCOLOR.value, QBrush(newColor))
 
         #self.setForeground(ColIndex.OLDHEX.value, QBrush(QColor("#FFFFFF")))
         #self.setForeground(ColIndex.OLDCONTRAST.value, QBrush(QColor("#FFFFFF")))
@@ -193,7 +194,7 @@ class ColorTreeItem(QTreeWidgetItem):
         newColor = self.background(ColIndex.OLDCOLOR.value).color()
 
         if self.text(ColIndex.NEWHEX.value) != 'Change':
-            newColor = QColor(self.text(ColIndex.NEWHEX.value))
+            newColor = ColorTable.ToQColor(ColorTable.Parse(self.text(ColIndex.NEWHEX.value)))
 
         newRatio = ColorCalc.ContrastRatio(newColor, self.newBackground)
 
@@ -206,7 +207,7 @@ class ColorTreeItem(QTreeWidgetItem):
         self.setBackground(ColIndex.NEWCOLOR.value, newColor)
 
     def updateOldColumns(self):
-        oldColor = QColor(self.text(ColIndex.OLDHEX.value))
+        oldColor = ColorTable.ToQColor(self.color)
         oldRatio = ColorCalc.ContrastRatio(oldColor, self.oldBackground)
 
         oldIcon = ColorCalc.ContrastRatioToIcon(oldRatio)
@@ -217,12 +218,13 @@ class ColorTreeItem(QTreeWidgetItem):
 
         self.setBackground(ColIndex.NEWCOLOR.value, oldColor)
 
+    # {oldColor: newColor} as ColorTable integers, empty if the color isn't swapped
     def getColorMapping(self) -> {}:
         newColor = self.data(ColIndex.NEWHEX.value, Qt.DisplayRole)
         if newColor == 'Change':
             return {}
         else:
-            return {self.data(ColIndex.OLDHEX.value, Qt.DisplayRole): newColor}
+            return {self.color: ColorTable.Parse(newColor)}
 
 
 class IconOnTheRightDelegate(QStyledItemDelegate):
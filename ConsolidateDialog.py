@@ -0,0 +1,79 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QGridLayout, QLabel, QRadioButton, QSpinBox, QDoubleSpinBox, QTreeWidget, QTreeWidgetItem, QDialogButtonBox
+from PySide6.QtGui import QColor
+from Palette import Palette
+from ColorCalc import ColorCalc
+
+"""
+    Proposes a smaller palette by clustering all the colors in the folder, see
+    Palette.Consolidate. The proposal is previewed as old → new pairs and applied
+    as color swaps in one go when the dialog is accepted (see colorSwaps).
+"""
+class ConsolidateDialog(QDialog):
+    def __init__(self, parent, colorCounts: dict):
+        super().__init__(parent)
+        self.colorCounts = colorCounts
+        self.colorSwaps = {}
+        self.setWindowTitle('Consolidate palette')
+        self.resize(420, 560)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f'{len(colorCounts)} colors in use'))
+
+        layoutOptions = QGridLayout()
+        self.radioClusterCount = QRadioButton('Reduce to')
+        self.radioClusterCount.setChecked(True)
+        layoutOptions.addWidget(self.radioClusterCount, 0, 0)
+        self.spinBoxClusterCount = QSpinBox()
+        self.spinBoxClusterCount.setRange(1, max(1, len(colorCounts)))
+        self.spinBoxClusterCount.setValue(max(1, len(colorCounts) // 2))
+        self.spinBoxClusterCount.setSuffix(' colors')
+        layoutOptions.addWidget(self.spinBoxClusterCount, 0, 1)
+
+        self.radioThreshold = QRadioButton('Merge colors closer than')
+        layoutOptions.addWidget(self.radioThreshold, 1, 0)
+        self.spinBoxThreshold = QDoubleSpinBox()
+        self.spinBoxThreshold.setRange(0.1, 100)
+        self.spinBoxThreshold.setValue(5)
+        self.spinBoxThreshold.setPrefix('ΔE ')
+        self.spinBoxThreshold.setToolTip('CIEDE2000 difference, around 2 is barely noticeable')
+        layoutOptions.addWidget(self.spinBoxThreshold, 1, 1)
+        layout.addLayout(layoutOptions)
+
+        self.labelResult = QLabel()
+        layout.addWidget(self.labelResult)
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(('Old', 'New', 'Uses'))
+        self.tree.setRootIsDecorated(False)
+        layout.addWidget(self.tree)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Apply | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Apply).clicked.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        for radio in (self.radioClusterCount, self.radioThreshold):
+            radio.toggled.connect(self.propose)
+        self.spinBoxClusterCount.valueChanged.connect(self.propose)
+        self.spinBoxThreshold.valueChanged.connect(self.propose)
+        self.propose()
+
+    def propose(self):
+        if self.radioClusterCount.isChecked():
+            self.colorSwaps = Palette.Consolidate(self.colorCounts, clusterCount=self.spinBoxClusterCount.value())
+        else:
+            self.colorSwaps = Palette.Consolidate(self.colorCounts, threshold=self.spinBoxThreshold.value())
+
+        remaining = len(self.colorCounts) - len(self.colorSwaps)
+        self.labelResult.setText(f'{len(self.colorSwaps)} colors merged, {remaining} remain')
+
+        items = []
+        for color, newColor in sorted(self.colorSwaps.items(), key=lambda swap: swap[1]):
+            item = QTreeWidgetItem((color, newColor, str(self.colorCounts[color])))
+            item.setBackground(0, QColor(color))
+            item.setForeground(0, ColorCalc.GoodContrastColorForBackground(color))
+            item.setBackground(1, QColor(newColor))
+            item.setForeground(1, ColorCalc.GoodContrastColorForBackground(newColor))
+            items.append(item)
+
+        self.tree.clear()
+        self.tree.addTopLevelItems(items)
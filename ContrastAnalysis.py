@@ -0,0 +1,79 @@
+from ColorCalc import ColorCalc
+from ColorTable import ColorTable
+from RenderPool import RenderPool
+import numpy as np
+
+"""
+    How the pixels of a rendered icon contrast with a background.
+
+    The contrast columns in the color tree rate every color on its own, this
+    looks at the icon as it's actually drawn: each pixel's contrast ratio is
+    weighed by its alpha, so a color covering half the icon counts for a lot more
+    than a thin outline, and (anti-aliased) edges count for less than solid fill.
+
+    The fractions are of the visible (alpha weighted) pixels:
+        good: at least ColorCalc.GOODRATIOTHRESHOLD
+        ok: at least ColorCalc.OKRATIOTHRESHOLD
+        bad: below that
+"""
+class ContrastAnalysis:
+    RENDERSIZE = 64
+    # An icon is flagged when more than this fraction of it is 'bad'
+    FLAGTHRESHOLD = 0.5
+
+    def __init__(self, good: float, ok: float, bad: float, coverage: float):
+        self.good = good
+        self.ok = ok
+        self.bad = bad
+        # Fraction of the render area that is visible (alpha weighted)
+        self.coverage = coverage
+        # Set by whoever requested the analysis to know what it was made for
+        self.mappingKey = None
+        self.background = None
+
+    def isFlagged(self) -> bool:
+        return self.bad > ContrastAnalysis.FLAGTHRESHOLD
+
+    def toString(self) -> str:
+        return 'Contrast: {:.0%} good, {:.0%} ok, {:.0%} low'.format(self.good, self.ok, self.bad)
+
+    """
+        Vectorized version of ColorCalc.RelativeLuminance.
+
+        Args:
+            rgb (np.ndarray) (..., 3) with 0-255 values.
+    """
+    @staticmethod
+    def RelativeLuminance(rgb: np.ndarray) -> np.ndarray:
+        rgb = rgb / 255.0
+        linear = np.where(rgb <= 0.03928, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+        return linear @ np.array((0.2126, 0.7152, 0.0722))
+
+    """
+        Renders content and analyses it, meant to be run in the RenderPool.
+
+        Args:
+            content (bytes) the (color mapped) SVG.
+            background (str) hex color of the background the icon is shown on.
+    """
+    @staticmethod
+    def Analyze(content: bytes, background: str) -> 'ContrastAnalysis':
+        size = ContrastAnalysis.RENDERSIZE
+        pixels = RenderPool.ImageToArray(RenderPool.RenderImage(content, size)).astype(np.float64)
+        weights = pixels[..., 3] / 255
+        total = weights.sum()
+        if total == 0:
+            return ContrastAnalysis(0, 0, 0, 0)
+
+        backgroundColor = ColorTable.Parse(background)
+        backgroundLuminance = ContrastAnalysis.RelativeLuminance(np.array(
+            (backgroundColor >> 16 & 0xFF, backgroundColor >> 8 & 0xFF, backgroundColor & 0xFF), dtype=np.float64
+        ))
+        luminance = ContrastAnalysis.RelativeLuminance(pixels[..., :3])
+        lighter = np.maximum(luminance, backgroundLuminance)
+        darker = np.minimum(luminance, backgroundLuminance)
+        ratios = (lighter + 0.05) / (darker + 0.05)
+
+        good = weights[ratios >= ColorCalc.GOODRATIOTHRESHOLD].sum() / total
+        bad = weights[ratios < ColorCalc.OKRATIOTHRESHOLD].sum() / total
+        return ContrastAnalysis(float(good), float(1 - good - bad), float(bad), float(total / (size * size)))
@@ -1,6 +1,8 @@
-from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QListWidgetItem
-from PySide6.QtCore import Qt, QRect, QSize, QAbstractListModel, QModelIndex
-from PySide6.QtGui import QColor, QDesktopServices, QIcon
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtCore import (
+    Qt, QRect, QRectF, QSize, QAbstractListModel, QAbstractProxyModel, QModelIndex, QTimer, QUrl, Signal
+)
+from PySide6.QtGui import QColor, QDesktopServices
 from SvgFile import SvgFile
 from ColorCalc import ColorCalc
 import os
@@ -12,61 +14,143 @@ import os
     next item will be placed on the next row.
 
     The look is supposed to mimic what you would find in a typical file explorer
-    providing a preview of the icon and the name of the file.
+    providing a preview of the icon and the name of the file. Every item shows
+    an input/output pair side by side, each half on its own background, so a
+    single view (and a single layout pass) covers both.
 """
 class FlowList(QListView):
+    # Path of a file that double clicking couldn't open
+    openFailed = Signal(str)
+    # Size of a single half (icon) of an item
+    CELLSIZE = QSize(160, 160)
+    # Small chunks so a screenful of icons is spread over all the workers
+    BACKGROUNDCHUNKSIZE = 4
 
     """
     A custom QStyledItemDelegate that's to be used exclusively with the FlowList
     class. 
 
     It uses a custom sizeHint() to allow the icons to be drawn in a consistent 
-    manner. It adds two methods to define how the icons are rendered.
+    manner. It adds methods to define how the icons are rendered.
     """
     class IconTextDelegate(QStyledItemDelegate):
-        def __init__(self, size: int, contrastingColor: QColor = None):
+        FLAGCOLOR = QColor('#ff8c00')
+        # Width of the selection highlight around the pair
+        SELECTIONWIDTH = 3
+
+        def __init__(self, size: int):
             super().__init__()
-            self.contrastingColor = contrastingColor
+            self.inputBackground = QColor('#000000')
+            self.outputBackground = QColor('#ffffff')
+            self.inputContrastingColor = None
+            self.outputContrastingColor = None
             self.styleAsDisabled = False
+            self.showDifferences = False
+            # See FlowList.setProgressiveRendering
+            self.progressive = False
+            # Whether the last paint drew an icon as rendered for an earlier mapping
+            self.drewStale = False
             self.size = size
+            # Of the screen painted on last, see pixelSize
+            self.devicePixelRatio = 1.0
 
         def paint(self, painter, option, index):
             # Handle selection
+            rect = QRect(option.rect)
             if option.state & QStyle.State_Selected:
-                painter.fillRect(option.rect, option.palette.highlight())
+                painter.fillRect(rect, option.palette.highlight())
+                selectionWidth = FlowList.IconTextDelegate.SELECTIONWIDTH
+                rect.adjust(selectionWidth, selectionWidth, -selectionWidth, -selectionWidth)
+
+            inputRect = QRect(rect)
+            inputRect.setWidth(rect.width() // 2)
+            outputRect = QRect(rect)
+            outputRect.setLeft(inputRect.right() + 1)
+            painter.fillRect(inputRect, self.inputBackground)
+            painter.fillRect(outputRect, self.outputBackground)
 
-            # Draw the pixmap
-            svgFile: SvgFile = index.data(Qt.DecorationRole)
-            pixmap = svgFile.getPixmapScaledTo(self.size)
-            if self.styleAsDisabled:
-                icon = QIcon(pixmap)
-                pixmap = icon.pixmap(pixmap.size(), QIcon.Disabled, QIcon.On)
+            # Thumbnails are rendered for the screen they're on, moving to a
+            # screen with another ratio renders them once more for that one
+            self.devicePixelRatio = painter.device().devicePixelRatioF()
 
             # Calculate the space needed for the text
-            text = index.data(Qt.DisplayRole)
             fontMetrics = painter.fontMetrics()
             textHeight = fontMetrics.height()
 
-            # Set the height of pixmapRect
-            pixmapRect = QRect(option.rect)
-            pixmapRect.setHeight(option.rect.height() - textHeight)
-
-            x = pixmapRect.left() + (pixmapRect.width() - pixmap.width()) / 2
-            y = pixmapRect.top() + (pixmapRect.height() - pixmap.height()) / 2
-            painter.drawPixmap(x, y, pixmap)
+            # Draw the pixmaps
+            inputSvgFile: SvgFile = index.data(IconModel.INPUTROLE)
+            outputSvgFile: SvgFile = index.data(IconModel.OUTPUTROLE)
+            visualDiff = None
+            outputPixmap = None
+            if self.showDifferences:
+                # Imported here as it pulls in NumPy, which isn't needed to start up
+                from VisualDiff import VisualDiff
+                visualDiff = VisualDiff.Get(outputSvgFile, inputSvgFile, self.pixelSize())
+                outputPixmap = visualDiff.heatmap
+            self.drawPixmap(painter, inputRect, textHeight, inputSvgFile, None)
+            self.drawPixmap(painter, outputRect, textHeight, outputSvgFile, outputPixmap)
 
-            # Draw the text
-            if self.contrastingColor != None:
-                painter.setPen(self.contrastingColor)
+            # Draw the text, across both halves each in the color that contrasts with it
             text = index.data(Qt.DisplayRole)
-            fontMetrics = painter.fontMetrics()
-            textHeight = fontMetrics.height()
-            textRect = QRect(option.rect)
+            textRect = QRect(rect)
             textRect.setTop(textRect.bottom() - textHeight - 8)
-            painter.drawText(textRect, Qt.AlignCenter, text)
+            for halfRect, contrastingColor in (
+                (inputRect, self.inputContrastingColor),
+                (outputRect, self.outputContrastingColor)
+            ):
+                painter.save()
+                painter.setClipRect(halfRect)
+                if contrastingColor != None:
+                    painter.setPen(contrastingColor)
+                painter.drawText(textRect, Qt.AlignCenter, text)
+                if visualDiff is not None and halfRect is outputRect:
+                    painter.drawText(outputRect.adjusted(4, 4, 0, 0), Qt.AlignTop | Qt.AlignLeft, f'{visualDiff.score:.0%}')
+                painter.restore()
+
+            # Flag icons that are mostly low contrast against the background
+            analysis = outputSvgFile.getContrastAnalysis()
+            if analysis is not None and analysis.isFlagged():
+                painter.setPen(FlowList.IconTextDelegate.FLAGCOLOR)
+                painter.drawText(outputRect.adjusted(0, 4, -4, 0), Qt.AlignTop | Qt.AlignRight, '⚠')
+
+        # Size of the thumbnails in device pixels, for the screen painted on last
+        def pixelSize(self) -> int:
+            return SvgFile.DevicePixels(self.size, self.devicePixelRatio)
+
+        # Draws the thumbnail of svgFile (or pixmap, if given, in device pixels)
+        # centered in the part of rect above the text
+        def drawPixmap(self, painter, rect: QRect, textHeight: int, svgFile: SvgFile, pixmap):
+            # The part of pixmap to draw, all of it unless it's an atlas page
+            sourceRect = None
+            if pixmap is None:
+                size = self.pixelSize()
+                slot = None
+                if self.progressive and not svgFile.hasThumbnail(size):
+                    slot = svgFile.getCachedThumbnail(size)
+                    self.drewStale = True
+                if slot is None:
+                    slot = svgFile.getThumbnail(size)
+                if self.styleAsDisabled:
+                    slot = slot.atlas.disabledVariant(slot)
+                pixmap = slot.pixmap()
+                sourceRect = slot.rect
+            if sourceRect is None:
+                sourceRect = pixmap.rect()
+
+            pixmapRect = QRect(rect)
+            pixmapRect.setHeight(rect.height() - textHeight)
+
+            # Drawn one pixmap pixel per device pixel, starting on a device
+            # pixel, so nothing gets scaled (and blurred) while painting
+            ratio = self.devicePixelRatio
+            width = sourceRect.width() / ratio
+            height = sourceRect.height() / ratio
+            x = round((pixmapRect.left() + (pixmapRect.width() - width) / 2) * ratio) / ratio
+            y = round((pixmapRect.top() + (pixmapRect.height() - height) / 2) * ratio) / ratio
+            painter.drawPixmap(QRectF(x, y, width, height), pixmap, QRectF(sourceRect))
 
         def sizeHint(self, option, index) -> QSize:
-            return QSize(160, 160)
+            return QSize(FlowList.CELLSIZE.width() * 2, FlowList.CELLSIZE.height())
         
         """
             Args:
@@ -92,17 +176,19 @@ class FlowList(QListView):
     """
     def __init__(self, size):
         super().__init__()
-        self.contrastingColor = None
         self.size = size
         self.setResizeMode(QListView.ResizeMode.Adjust)
-        self.setGridSize(QSize(160, 160))
+        self.setGridSize(QSize(FlowList.CELLSIZE.width() * 2, FlowList.CELLSIZE.height()))
         self.setSpacing(240 - size)
         self.setFlow(QListView.Flow.LeftToRight)
         self.setViewMode(QListView.ViewMode.IconMode)
         self.setUniformItemSizes(False)
-        self.setItemDelegate(FlowList.IconTextDelegate(self.size, self.contrastingColor))
+        self.setItemDelegate(FlowList.IconTextDelegate(self.size))
         self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.doubleClicked.connect(self.openFile)
+        self.backgroundBatch = None
+        # Another round of background renders is needed once the running one is done
+        self.backgroundPending = False
 
     def setDisabledStyling(self, styleAsDisabled: bool):
         iconTextDelegate: iconTextDelegate = self.itemDelegate()
@@ -114,32 +200,225 @@ class FlowList(QListView):
         iconTextDelegate.setSize(size)
         self.repaint()
 
+    # Shows a heatmap of how every output icon differs from its input instead
+    # of the output icon itself
+    def setShowDifferences(self, showDifferences: bool):
+        iconTextDelegate : iconTextDelegate = self.itemDelegate()
+        iconTextDelegate.showDifferences = showDifferences
+        self.viewport().update()
+
+    """
+        While on, output icons that haven't been rendered for their current color
+        mapping are drawn as they were last rendered and rendered in the
+        RenderPool instead, filling in as they come back. Keeps the list
+        responsive while the mapping changes many times a second (dragging a
+        slider).
+    """
+    def setProgressiveRendering(self, progressive: bool):
+        iconTextDelegate : iconTextDelegate = self.itemDelegate()
+        iconTextDelegate.progressive = progressive
+        if not progressive:
+            self.backgroundPending = False
+            if self.backgroundBatch is not None:
+                self.backgroundBatch.cancel()
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        iconTextDelegate : iconTextDelegate = self.itemDelegate()
+        iconTextDelegate.drewStale = False
+        super().paintEvent(event)
+        if iconTextDelegate.drewStale:
+            # Not from within the paint event, starting a batch takes a moment
+            QTimer.singleShot(0, self.renderVisibleInBackground)
+
+    # Proxy rows that are (partly) in view, found by bisecting as the rows are
+    # laid out in order
+    def visibleRows(self) -> list:
+        model = self.model()
+        low, high = 0, model.rowCount()
+        while low < high:
+            middle = (low + high) // 2
+            if self.visualRect(model.index(middle, 0)).bottom() < 0:
+                low = middle + 1
+            else:
+                high = middle
+
+        rows = []
+        height = self.viewport().height()
+        for row in range(low, model.rowCount()):
+            if self.visualRect(model.index(row, 0)).top() > height:
+                break
+            rows.append(row)
+
+        return rows
+
+    # Renders the visible output icons that aren't rendered for their current
+    # mapping in the RenderPool, see setProgressiveRendering
+    def renderVisibleInBackground(self):
+        if not self.itemDelegate().progressive:
+            return
+        if self.backgroundBatch is not None:
+            # Whatever it's rendering is likely outdated already
+            self.backgroundBatch.cancel()
+            self.backgroundPending = True
+            return
+
+        # Imported here as it pulls in NumPy, which isn't needed to start up
+        from RenderPool import RenderPool, RenderBatch
+
+        iconTextDelegate : iconTextDelegate = self.itemDelegate()
+        size = iconTextDelegate.pixelSize()
+        model = self.model()
+        svgFiles = [model.index(row, 0).data(IconModel.OUTPUTROLE) for row in self.visibleRows()]
+        svgFiles = [svgFile for svgFile in svgFiles if not svgFile.hasThumbnail(size)]
+        if not svgFiles:
+            return
+
+        mappingKeys = [svgFile.compiledColorMap.key for svgFile in svgFiles]
+        self.backgroundBatch = RenderBatch(
+            RenderPool.RenderArray,
+            [(svgFile.getColorMappedContent(), size) for svgFile in svgFiles],
+            self, FlowList.BACKGROUNDCHUNKSIZE
+        )
+        self.backgroundBatch.resultReady.connect(
+            lambda i, pixels: self.onBackgroundRenderReady(svgFiles[i], mappingKeys[i], size, pixels)
+        )
+        self.backgroundBatch.finished.connect(self.onBackgroundRenderFinished)
+        self.backgroundBatch.start()
+
+    def onBackgroundRenderReady(self, svgFile: SvgFile, mappingKey: frozenset, size: int, pixels):
+        from RenderPool import RenderPool
+
+        # The mapping changed again while this was being rendered
+        if mappingKey != svgFile.compiledColorMap.key:
+            return
+
+        svgFile.setThumbnail(mappingKey, size, RenderPool.ArrayToImage(pixels))
+        self.viewport().update()
+
+    def onBackgroundRenderFinished(self, failures: int):
+        self.backgroundBatch = None
+        if self.backgroundPending:
+            self.backgroundPending = False
+            self.renderVisibleInBackground()
+
     def clear(self):
         for action in self.actions():
             self.removeAction(action)
 
-    def openFile(self, listItem: QListWidgetItem):
-        print(QDesktopServices.openUrl(listItem.data(3)))
+    def openFile(self, listItem: QModelIndex):
+        svgFile: SvgFile = listItem.data(Qt.DecorationRole)
+        if not QDesktopServices.openUrl(QUrl.fromLocalFile(svgFile.filePath)):
+            self.openFailed.emit(svgFile.filePath)
 
-    def setFontColorToContrastWith(self, color: QColor):
-        self.contrastingColor = ColorCalc.GoodContrastColorForBackground(color)
-        self.setItemDelegate(FlowList.IconTextDelegate(self.size, self.contrastingColor))
+    def setInputBackground(self, color: QColor):
+        iconTextDelegate : iconTextDelegate = self.itemDelegate()
+        iconTextDelegate.inputBackground = color
+        iconTextDelegate.inputContrastingColor = ColorCalc.GoodContrastColorForBackground(color)
+        self.viewport().update()
 
+    def setOutputBackground(self, color: QColor):
+        iconTextDelegate : iconTextDelegate = self.itemDelegate()
+        iconTextDelegate.outputBackground = color
+        iconTextDelegate.outputContrastingColor = ColorCalc.GoodContrastColorForBackground(color)
+        self.viewport().update()
+
+"""
+    The input SvgFiles paired up with their output SvgFiles, row n of the one
+    list goes with row n of the other.
+"""
 class IconModel(QAbstractListModel):
-    def __init__(self, icons, parent=None):
+    INPUTROLE = Qt.UserRole
+    OUTPUTROLE = Qt.UserRole + 1
+
+    def __init__(self, inputIcons, outputIcons, parent=None):
         super().__init__(parent)
-        self.icons = icons
+        self.inputIcons = inputIcons
+        self.outputIcons = outputIcons
+
+    # Call after the icons lists have been changed in place
+    def refresh(self):
+        self.beginResetModel()
+        self.endResetModel()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self.icons)
+        return len(self.outputIcons)
 
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
             return None
-        svgFile: SvgFile = self.icons[index.row()]
+        svgFile: SvgFile = self.outputIcons[index.row()]
         if role == Qt.DisplayRole:
             return os.path.basename(svgFile.filePath)
-        elif role == Qt.DecorationRole:
+        elif role == Qt.DecorationRole or role == IconModel.OUTPUTROLE:
             return svgFile
+        elif role == IconModel.INPUTROLE:
+            return self.inputIcons[index.row()]
         elif role == Qt.ToolTipRole:
-            return svgFile.filePath
\ No newline at end of file
+            lines = [svgFile.filePath]
+            duplicates = self.inputIcons[index.row()].duplicates
+            if len(duplicates) > 1:
+                lines.append('Identical to: ' + ', '.join(
+                    os.path.basename(duplicate.filePath) for duplicate in duplicates
+                    if duplicate.filePath != svgFile.filePath
+                ))
+            analysis = svgFile.getContrastAnalysis()
+            if analysis is not None:
+                lines.append(analysis.toString())
+            return '\n'.join(lines)
+
+
+"""
+    Shows (a subset of) the rows of an IconModel in a given order, used to sort
+    and filter the icons without touching the lists the IconModel wraps.
+"""
+class IconProxyModel(QAbstractProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # proxy row -> source row
+        self.rows = []
+        # source row -> proxy row
+        self.proxyRows = {}
+
+    def setSourceModel(self, sourceModel: IconModel):
+        super().setSourceModel(sourceModel)
+        sourceModel.modelReset.connect(self.showAllRows)
+        self.showAllRows()
+
+    def showAllRows(self):
+        self.setRows(range(self.sourceModel().rowCount()))
+
+    """
+        Args:
+            rows (list) the source rows to show, in the order to show them in.
+    """
+    def setRows(self, rows: list):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.proxyRows = {sourceRow: row for row, sourceRow in enumerate(self.rows)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < len(self.rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxyIndex):
+        if not proxyIndex.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.rows[proxyIndex.row()], 0)
+
+    def mapFromSource(self, sourceIndex):
+        row = self.proxyRows.get(sourceIndex.row()) if sourceIndex.isValid() else None
+        if row is None:
+            return QModelIndex()
+        return self.index(row, 0)
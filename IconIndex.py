@@ -0,0 +1,66 @@
+import fnmatch
+import os
+import re
+
+"""
+    Lookups over a list of SvgFiles for filtering them, built once when the
+    icons are loaded so filtering doesn't have to go through the SvgFiles
+    themselves. Rows are indexes into the list the index was built from.
+"""
+class IconIndex:
+    # Characters that turn a name filter into a glob
+    GLOBCHARACTERS = '*?['
+
+    def __init__(self, svgFiles: list):
+        # Lowercased file names, filtering by name ignores case
+        self.names = [os.path.basename(svgFile.filePath).lower() for svgFile in svgFiles]
+        # {filePath: row}
+        self.pathRows = {svgFile.filePath: row for row, svgFile in enumerate(svgFiles)}
+        # {color: [rows of the files the color is in]}
+        self.colorRows = {}
+        for row, svgFile in enumerate(svgFiles):
+            for color in svgFile.colors:
+                self.colorRows.setdefault(color, []).append(row)
+        # {row: first row with the same content} for files that have duplicates
+        self.duplicateGroups = {}
+        firstRows = {}
+        for row, svgFile in enumerate(svgFiles):
+            if len(svgFile.duplicates) > 1:
+                self.duplicateGroups[row] = firstRows.setdefault(id(svgFile.duplicates), row)
+
+    def rowCount(self) -> int:
+        return len(self.names)
+
+    """
+        Args:
+            pattern (str) a part of the file name, or a glob (*.svg, arrow-?.svg)
+            for the whole name if it contains any GLOBCHARACTERS.
+
+        Returns:
+            list: the matching rows, in order.
+    """
+    def rowsMatchingName(self, pattern: str) -> list:
+        pattern = pattern.lower()
+        if any(character in pattern for character in IconIndex.GLOBCHARACTERS):
+            match = re.compile(fnmatch.translate(pattern)).match
+            return [row for row, name in enumerate(self.names) if match(name)]
+
+        return [row for row, name in enumerate(self.names) if pattern in name]
+
+    def rowsWithPaths(self, filePaths) -> set:
+        return {self.pathRows[filePath] for filePath in filePaths if filePath in self.pathRows}
+
+    def rowsWithColor(self, color: int) -> set:
+        return set(self.colorRows.get(color, ()))
+
+    def rowsWithDuplicates(self) -> set:
+        return set(self.duplicateGroups)
+
+    # Rows of the files colorMap ({oldColor: newColor}) changes
+    def rowsChangedBy(self, colorMap: dict) -> set:
+        rows = set()
+        for color, newColor in colorMap.items():
+            if color != newColor:
+                rows.update(self.colorRows.get(color, ()))
+
+        return rows
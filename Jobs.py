@@ -0,0 +1,323 @@
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+from Archive import Archive, ArchiveWriter
+from ThemeVariables import ThemeVariables
+from SvgMinifier import SvgMinifier
+from MappingLayers import MappingLayers
+from IconIndex import IconIndex
+from ProjectFile import ProjectFile
+from Settings import SettingsVar
+from RenderPool import RenderPool
+from concurrent.futures import CancelledError
+import multiprocessing
+import queue
+import json
+import os
+import sys
+
+"""
+    A single entry of a job file: the icons in inputFolder mapped with the swaps
+    of a profile and saved to outputFolder. Either folder can be an archive.
+"""
+class Job:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    """
+        Args:
+            swaps (dict) {oldHex: newHex}, None if the profile wasn't found (the
+            job fails when it's run).
+    """
+    def __init__(self, inputFolder: str, outputFolder: str, profile: str, swaps: dict):
+        self.inputFolder = inputFolder
+        self.outputFolder = outputFolder
+        self.profile = profile
+        self.swaps = swaps
+        self.status = Job.PENDING
+        # Files written so far out of total (0 until the input has been read)
+        self.done = 0
+        self.total = 0
+        # What went wrong for failed jobs
+        self.error = None
+
+    def toString(self) -> str:
+        return f'{self.inputFolder} → {self.outputFolder} ({self.profile})'
+
+
+"""
+    Runs many jobs at once, for when the same icons are needed in a number of
+    themes or a number of icon folders need the same theme.
+
+    Jobs reading the same input are run together in one worker of the
+    RenderPool so the input is only read (and its colors parsed) once, jobs with
+    different inputs run at the same time in different workers. A job that
+    fails doesn't affect the others, not even the ones sharing its input.
+
+    Job files are JSON, relative paths are relative to the job file:
+        {
+            "version": 1,
+            "project": "theme.json",
+            "profiles": {"Dark": {"#000000": "#ffffff"}},
+            "jobs": [
+                {"input": "icons/actions", "output": "build/actions-dark", "profile": "Dark"}
+            ]
+        }
+    Profiles are looked up in "profiles" first and then in the profiles of the
+    (optional) project file. The icons are saved the way the project saves
+    them: with its mapping layers over the profile, its color mode (see
+    ThemeVariables) and minified if it minifies. Without a project they're
+    saved with hex colors, without layers and without minifying.
+"""
+class JobQueue:
+    VERSION = 1
+    # Progress is sent every this many files (and at the end of every job)
+    PROGRESSSTEP = 25
+
+    """
+        Args:
+            layers (list, optional) mapping layers as stored, see MappingLayer.toDict.
+            mode (str) how colors are written, see ThemeVariables.MODES.
+            minifier (SvgMinifier, optional) minifies the icons, for mode HEX.
+    """
+    def __init__(
+        self, jobs: list, layers: list = None, mode: str = ThemeVariables.HEX, minifier=None
+    ):
+        self.jobs = jobs
+        self.layers = layers or []
+        self.mode = mode
+        self.minifier = minifier
+        self.futures = []
+        self.progress = None
+        self.manager = None
+
+    """
+        Args:
+            profiles (dict, optional) {name: swaps} to fall back on for profiles
+            the job file doesn't define itself.
+
+        Raises:
+            OSError, ValueError: if the file (or its project) can't be read or
+            isn't a job file.
+    """
+    @staticmethod
+    def Load(filePath: str, profiles: dict = None) -> 'JobQueue':
+        with open(filePath, 'rb') as file:
+            definition = json.loads(file.read())
+
+        if not isinstance(definition, dict) or definition.get('version') != JobQueue.VERSION:
+            raise ValueError(f'{filePath} is not a (supported) job file')
+
+        folder = os.path.dirname(os.path.abspath(filePath))
+        allProfiles = dict(profiles or {})
+        project = {}
+        if 'project' in definition:
+            project = ProjectFile.Load(os.path.join(folder, definition['project']))
+            allProfiles.update(project.get(SettingsVar.PROFILES.value) or {})
+        allProfiles.update(definition.get('profiles', {}))
+
+        mode = project.get(SettingsVar.OUTPUT_COLOR_MODE.value, ThemeVariables.HEX)
+        if mode not in ThemeVariables.MODES:
+            raise ValueError(f'Unknown color mode in the project of {filePath}: {mode}')
+        minifier = ProjectFile.Minifier(project)
+
+        jobs = []
+        for job in definition.get('jobs', []):
+            try:
+                inputFolder, outputFolder = job['input'], job['output']
+            except (KeyError, TypeError):
+                raise ValueError(f'Every job in {filePath} needs an "input" and an "output"')
+            profile = job.get('profile', '')
+            jobs.append(Job(
+                os.path.join(folder, inputFolder), os.path.join(folder, outputFolder), profile, allProfiles.get(profile)
+            ))
+
+        return JobQueue(
+            jobs, project.get(SettingsVar.MAPPING_LAYERS.value), mode, minifier
+        )
+
+    """
+        Runs jobs that all read inputFolder, meant to be run in the RenderPool.
+
+        Args:
+            jobs (list) [(index, outputFolder, swaps)] swaps is None for a
+            profile that wasn't found.
+            layers, mode, minifier: see the constructor.
+            progress (queue) receives (index, files done, total files).
+
+        Returns:
+            list: [(index, error)] with error None for jobs that succeeded.
+    """
+    @staticmethod
+    def RunGroup(
+        inputFolder: str, jobs: list, layers: list, mode: str, minifier: SvgMinifier, progress
+    ) -> list:
+        # Reading a folder that isn't there finds nothing rather than failing
+        if not (os.path.isfile(inputFolder) if Archive.IsArchive(inputFolder) else os.path.isdir(inputFolder)):
+            return [(index, f'No such folder or archive: {inputFolder}') for index, _, _ in jobs]
+
+        try:
+            svgFiles = Archive.LoadSvgFiles(inputFolder)
+            mappingLayers = MappingLayers(None, layers)
+            iconIndex = IconIndex(svgFiles)
+        except Exception as error:
+            return [(index, f'Could not read {inputFolder}: {JobQueue.Describe(error)}') for index, _, _ in jobs]
+
+        # Whatever goes wrong in a job is reported on that job, the jobs after
+        # it in the group still run
+        results = []
+        for index, outputFolder, swaps in jobs:
+            if swaps is None:
+                results.append((index, 'No such profile'))
+                continue
+            try:
+                mappingLayers.apply(svgFiles, iconIndex, ColorTable.ParseSwaps(swaps))
+                JobQueue.Save(svgFiles, inputFolder, outputFolder, mode, minifier, index, progress)
+                results.append((index, None))
+            except Exception as error:
+                results.append((index, JobQueue.Describe(error)))
+
+        return results
+
+    # OSError and ValueError describe themselves, anything else is unexpected
+    @staticmethod
+    def Describe(error: Exception) -> str:
+        if isinstance(error, (OSError, ValueError)):
+            return str(error)
+
+        return f'{type(error).__name__}: {error}'
+
+    # Saves svgFiles with the color maps they have set to a folder or an archive
+    @staticmethod
+    def Save(
+        svgFiles: list, inputFolder: str, outputFolder: str, mode: str, minifier: SvgMinifier, index: int, progress
+    ):
+        def onSaved(done: int):
+            if done % JobQueue.PROGRESSSTEP == 0 or done == len(svgFiles):
+                progress.put((index, done, len(svgFiles)))
+
+        if mode != ThemeVariables.HEX:
+            if Archive.IsArchive(outputFolder):
+                raise ValueError('Icons with CSS variables can only be saved to a folder')
+            ThemeVariables.Save(svgFiles, inputFolder, outputFolder, mode)
+            onSaved(len(svgFiles))
+        elif Archive.IsArchive(outputFolder):
+            with ArchiveWriter(outputFolder) as archive:
+                for done, svgFile in enumerate(svgFiles, 1):
+                    archive.add(svgFile.getRelativePath(inputFolder), svgFile, minifier)
+                    onSaved(done)
+        else:
+            SvgFile.SaveToFolder(svgFiles, inputFolder, outputFolder, onSaved, minifier)
+
+        if not svgFiles:
+            progress.put((index, 0, 0))
+
+    # Starts all jobs, follow them with poll()
+    def start(self):
+        if not self.jobs:
+            return
+
+        self.manager = multiprocessing.get_context('spawn').Manager()
+        self.progress = self.manager.Queue()
+
+        groups = {}
+        for index, job in enumerate(self.jobs):
+            groups.setdefault(os.path.normcase(os.path.abspath(job.inputFolder)), []).append(index)
+
+        executor = RenderPool.Executor()
+        for indexes in groups.values():
+            jobs = [(index, self.jobs[index].outputFolder, self.jobs[index].swaps) for index in indexes]
+            future = executor.submit(
+                JobQueue.RunGroup, self.jobs[indexes[0]].inputFolder, jobs,
+                self.layers, self.mode, self.minifier, self.progress
+            )
+            self.futures.append((indexes, future))
+
+    """
+        Takes in the progress made since the last call and updates the jobs.
+
+        Args:
+            timeout (float) seconds to wait for progress, 0 to return right away.
+
+        Returns:
+            list: indexes of the jobs that changed.
+    """
+    def poll(self, timeout: float = 0) -> list:
+        changed = set()
+        try:
+            while True:
+                index, done, total = self.progress.get(timeout=timeout) if timeout > 0 else self.progress.get_nowait()
+                job = self.jobs[index]
+                if job.status == Job.PENDING:
+                    job.status = Job.RUNNING
+                job.done, job.total = done, total
+                changed.add(index)
+                timeout = 0
+        except queue.Empty:
+            pass
+
+        for indexes, future in self.futures:
+            if not future.done() or all(self.jobs[index].status in (Job.DONE, Job.FAILED) for index in indexes):
+                continue
+
+            try:
+                results = future.result()
+            except CancelledError:
+                results = [(index, 'Cancelled') for index in indexes]
+            except Exception as error:
+                # The worker itself went down, there's no telling which job caused it
+                results = [(index, f'Worker failed: {error}') for index in indexes]
+
+            for index, error in results:
+                job = self.jobs[index]
+                job.status = Job.DONE if error is None else Job.FAILED
+                job.error = error
+                changed.add(index)
+
+        if self.isDone() and self.manager is not None:
+            self.manager.shutdown()
+            self.manager = None
+
+        return sorted(changed)
+
+    def isDone(self) -> bool:
+        return all(job.status in (Job.DONE, Job.FAILED) for job in self.jobs)
+
+    # Jobs that haven't started yet won't, the running ones are finished
+    def cancel(self):
+        for _, future in self.futures:
+            future.cancel()
+
+    def failed(self) -> list:
+        return [job for job in self.jobs if job.status == Job.FAILED]
+
+
+"""
+    Headless use, runs all jobs in a job file:
+        python Jobs.py path/to/jobs.json
+"""
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('Usage: python Jobs.py jobs.json')
+
+    try:
+        jobQueue = JobQueue.Load(sys.argv[1])
+    except (OSError, ValueError) as error:
+        sys.exit(str(error))
+
+    jobQueue.start()
+    while not jobQueue.isDone():
+        for index in jobQueue.poll(timeout=0.5):
+            job = jobQueue.jobs[index]
+            if job.status == Job.FAILED:
+                print(f'[{index + 1}/{len(jobQueue.jobs)}] {job.toString()}: failed, {job.error}')
+            elif job.status == Job.DONE:
+                print(f'[{index + 1}/{len(jobQueue.jobs)}] {job.toString()}: {job.total} files saved')
+            else:
+                print(f'[{index + 1}/{len(jobQueue.jobs)}] {job.toString()}: {job.done}/{job.total}')
+    RenderPool.Shutdown()
+
+    failed = jobQueue.failed()
+    print(f'{len(jobQueue.jobs) - len(failed)} of {len(jobQueue.jobs)} jobs done')
+    sys.exit(1 if failed else 0)
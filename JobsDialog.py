@@ -0,0 +1,90 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem, QPushButton, QProgressBar
+from PySide6.QtCore import QTimer
+from Jobs import JobQueue, Job
+from ThemeVariables import ThemeVariables
+
+"""
+    Runs the jobs of a job file (see JobQueue) and shows how every one of them
+    is getting on, and how they save the icons (the settings of the job file's
+    project, not the ones in the main window). Closing the dialog before
+    they're done skips the jobs that haven't started yet.
+"""
+class JobsDialog(QDialog):
+    # How often (ms) the progress of the jobs is taken in
+    POLLINTERVAL = 100
+
+    def __init__(self, parent, jobQueue: JobQueue):
+        super().__init__(parent)
+        self.jobQueue = jobQueue
+        self.setWindowTitle('Jobs')
+        self.resize(900, 400)
+
+        layout = QVBoxLayout(self)
+        self.labelSummary = QLabel()
+        layout.addWidget(self.labelSummary)
+        layout.addWidget(QLabel(JobsDialog.DescribeOutput(jobQueue)))
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(('Input', 'Output', 'Profile', 'Progress', 'Status'))
+        self.tree.setRootIsDecorated(False)
+        self.progressBars = []
+        for job in jobQueue.jobs:
+            item = QTreeWidgetItem((job.inputFolder, job.outputFolder, job.profile, '', ''))
+            self.tree.addTopLevelItem(item)
+            progressBar = QProgressBar()
+            self.tree.setItemWidget(item, 3, progressBar)
+            self.progressBars.append(progressBar)
+        layout.addWidget(self.tree)
+
+        layoutButtons = QHBoxLayout()
+        layoutButtons.addStretch()
+        buttonClose = QPushButton('Close')
+        buttonClose.clicked.connect(self.accept)
+        layoutButtons.addWidget(buttonClose)
+        layout.addLayout(layoutButtons)
+
+        for index in range(len(jobQueue.jobs)):
+            self.updateJob(index)
+        self.updateSummary()
+
+        self.pollTimer = QTimer(self)
+        self.pollTimer.setInterval(JobsDialog.POLLINTERVAL)
+        self.pollTimer.timeout.connect(self.poll)
+        self.jobQueue.start()
+        self.pollTimer.start()
+
+    def poll(self):
+        for index in self.jobQueue.poll():
+            self.updateJob(index)
+        self.updateSummary()
+        if self.jobQueue.isDone():
+            self.pollTimer.stop()
+
+    def updateJob(self, index: int):
+        job = self.jobQueue.jobs[index]
+        progressBar = self.progressBars[index]
+        progressBar.setMaximum(max(1, job.total))
+        progressBar.setValue(job.total if job.status == Job.DONE else job.done)
+        progressBar.setFormat(f'{job.done}/{job.total}')
+
+        item = self.tree.topLevelItem(index)
+        item.setText(4, job.status if job.error is None else f'{job.status}: {job.error}')
+        item.setToolTip(4, job.error or '')
+
+    @staticmethod
+    def DescribeOutput(jobQueue: JobQueue) -> str:
+        settings = [ThemeVariables.MODES[jobQueue.mode]]
+        if jobQueue.minifier is not None:
+            settings.append('minified')
+        settings.append(f'{len(jobQueue.layers)} mapping layers' if jobQueue.layers else 'no mapping layers')
+        return 'Saved with the settings of the job file\'s project: ' + ', '.join(settings)
+
+    def updateSummary(self):
+        finished = sum(1 for job in self.jobQueue.jobs if job.status in (Job.DONE, Job.FAILED))
+        failed = len(self.jobQueue.failed())
+        self.labelSummary.setText(f'{finished} of {len(self.jobQueue.jobs)} jobs finished, {failed} failed')
+
+    def done(self, result: int):
+        if not self.jobQueue.isDone():
+            self.jobQueue.cancel()
+        super().done(result)
@@ -0,0 +1,171 @@
+from Settings import SETTINGS, SettingsVar
+from ColorTable import ColorTable
+from IconIndex import IconIndex
+
+from collections import OrderedDict
+
+"""
+    Color swaps that only apply to some of the icons: the ones picked when the
+    layer was made (filePaths) or the ones whose name matches pattern (see
+    IconIndex.rowsMatchingName).
+"""
+class MappingLayer:
+    def __init__(self, name: str, pattern: str = '', filePaths=(), swaps: dict = None):
+        self.name = name
+        self.pattern = pattern
+        self.filePaths = frozenset(filePaths)
+        # {oldHex: newHex}, like the profiles
+        self.swaps = dict(swaps or {})
+        self._fingerprint = None
+
+    # Identifies the layer as it is right now, changes whenever the swaps do
+    def fingerprint(self) -> tuple:
+        if self._fingerprint is None:
+            self._fingerprint = (self.name, self.pattern, self.filePaths, frozenset(self.swaps.items()))
+
+        return self._fingerprint
+
+    def setSwaps(self, swaps: dict):
+        self.swaps = dict(swaps)
+        self._fingerprint = None
+
+    def coveredRows(self, iconIndex: IconIndex) -> set:
+        rows = iconIndex.rowsWithPaths(self.filePaths)
+        if self.pattern:
+            rows.update(iconIndex.rowsMatchingName(self.pattern))
+
+        return rows
+
+    def toDict(self) -> dict:
+        return {'name': self.name, 'pattern': self.pattern, 'filePaths': sorted(self.filePaths), 'swaps': self.swaps}
+
+    @staticmethod
+    def FromDict(layer: dict) -> 'MappingLayer':
+        return MappingLayer(layer['name'], layer.get('pattern', ''), layer.get('filePaths', ()), layer.get('swaps'))
+
+
+"""
+    The mapping layers, stacked over the global mapping (the current profile)
+    in order: where layers swap the same color the last one wins.
+
+    Every file ends up with the global mapping updated with the swaps of the
+    layers covering it. That combination is worked out once per distinct set of
+    covering layers (by their fingerprints) and shared by all files it applies
+    to, editing one layer only touches the files it covers.
+
+    While a layer is being edited its swaps can be previewed (see setPreview)
+    without touching the layer itself, the layer only changes once the edit is
+    kept (MappingLayer.setSwaps).
+"""
+class MappingLayers:
+    # Amount of combined mappings kept around
+    CACHESIZE = 64
+
+    """
+        Args:
+            layers (list, optional) the layers as stored (see MappingLayer.toDict),
+            read from settings if omitted.
+    """
+    def __init__(self, settings=SETTINGS, layers: list = None):
+        self.settings = settings
+        if layers is None:
+            layers = settings.value(SettingsVar.MAPPING_LAYERS, []) or []
+        self.layers = [MappingLayer.FromDict(layer) for layer in layers]
+        # {(global mapping key, layer fingerprints): {oldColor: newColor}}
+        self._combined = OrderedDict()
+        # {(pattern, filePaths): covered rows}, only valid for _coverageIndex
+        self._coverage = {}
+        self._coverageIndex = None
+        # The layer being previewed with previewSwaps instead of its own swaps
+        self.previewLayer = None
+        self.previewSwaps = None
+
+    def names(self) -> list:
+        return [layer.name for layer in self.layers]
+
+    def add(self, layer: MappingLayer) -> bool:
+        if not layer.name or layer.name in self.names():
+            return False
+
+        self.layers.append(layer)
+        self.save()
+        return True
+
+    def remove(self, layer: MappingLayer):
+        if layer is self.previewLayer:
+            self.clearPreview()
+        self.layers.remove(layer)
+        self.save()
+
+    # Shows layer with swaps ({oldHex: newHex}) until clearPreview, apply to see it
+    def setPreview(self, layer: MappingLayer, swaps: dict):
+        self.previewLayer = layer
+        self.previewSwaps = dict(swaps)
+
+    def clearPreview(self):
+        self.previewLayer = None
+        self.previewSwaps = None
+
+    # The swaps layer is applied with, the previewed ones if it's being previewed
+    def swapsOf(self, layer: MappingLayer) -> dict:
+        return self.previewSwaps if layer is self.previewLayer else layer.swaps
+
+    def fingerprintOf(self, layer: MappingLayer) -> tuple:
+        if layer is self.previewLayer:
+            return ('preview',) + layer.fingerprint()[:3] + (frozenset(self.previewSwaps.items()),)
+
+        return layer.fingerprint()
+
+    def save(self):
+        self.settings.setValue(SettingsVar.MAPPING_LAYERS, [layer.toDict() for layer in self.layers])
+
+    def coveredRows(self, layer: MappingLayer, iconIndex: IconIndex) -> set:
+        if self._coverageIndex is not iconIndex:
+            self._coverageIndex = iconIndex
+            self._coverage = {}
+
+        # Only what the layer covers matters here, not its swaps
+        key = (layer.pattern, layer.filePaths)
+        if key not in self._coverage:
+            self._coverage[key] = layer.coveredRows(iconIndex)
+
+        return self._coverage[key]
+
+    """
+        Args:
+            globalKey (frozenset) the items of globalColorMap, passed along so
+            it only has to be made once when combining for a lot of files.
+    """
+    def combinedColorMap(self, globalColorMap: dict, globalKey: frozenset, layers: list) -> dict:
+        key = (globalKey, tuple(self.fingerprintOf(layer) for layer in layers))
+        if key in self._combined:
+            self._combined.move_to_end(key)
+        else:
+            colorMap = dict(globalColorMap)
+            for layer in layers:
+                colorMap.update(ColorTable.ParseSwaps(self.swapsOf(layer)))
+            self._combined[key] = colorMap
+            if len(self._combined) > MappingLayers.CACHESIZE:
+                self._combined.popitem(last=False)
+
+        return self._combined[key]
+
+    """
+        Sets the color map of the svgFiles to the global mapping combined with
+        the layers that cover them.
+
+        Args:
+            svgFiles (list) the SvgFiles iconIndex was built from.
+            globalColorMap (dict) {oldColor: newColor} for all files.
+            rows (iterable, optional) only update these rows, all if omitted.
+    """
+    def apply(self, svgFiles: list, iconIndex: IconIndex, globalColorMap: dict, rows=None):
+        layersPerRow = {}
+        for layer in self.layers:
+            for row in self.coveredRows(layer, iconIndex):
+                layersPerRow.setdefault(row, []).append(layer)
+
+        globalKey = frozenset(globalColorMap.items())
+        for row in (range(len(svgFiles)) if rows is None else rows):
+            layers = layersPerRow.get(row, [])
+            svgFiles[row].setColorMap(self.combinedColorMap(globalColorMap, globalKey, layers))
@@ -0,0 +1,65 @@
+from PySide6.QtWidgets import QApplication, QStyleOptionViewItem
+from PySide6.QtCore import QRect
+from PySide6.QtGui import QImage, QPainter
+from SvgFile import SvgFile
+from FlowList import FlowList, IconModel
+import time
+import sys
+
+"""
+    Measures what painting the icon list costs at a device pixel ratio of 1
+    and of 2 (like a HiDPI screen), without a screen of either:
+        python PaintBenchmark.py path/to/icons [size]
+
+    The first paint at a ratio renders the thumbnails for it, the paints after
+    that only draw them from the atlas. Both are reported per icon pair.
+"""
+class PaintBenchmark:
+    RATIOS = (1.0, 2.0)
+    # Paints of the whole list (after the first) averaged over
+    ROUNDS = 20
+
+    def __init__(self, svgFiles: list, size: int):
+        outputSvgFiles = [svgFile.sharedCopy(svgFile.filePath) for svgFile in svgFiles]
+        self.model = IconModel(svgFiles, outputSvgFiles)
+        self.delegate = FlowList.IconTextDelegate(size)
+
+    # Paints every row once onto an image with the given ratio, returns the seconds it took
+    def paintAll(self, ratio: float) -> float:
+        cell = FlowList.CELLSIZE
+        image = QImage(round(cell.width() * 2 * ratio), round(cell.height() * ratio), QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)
+        option = QStyleOptionViewItem()
+        option.rect = QRect(0, 0, cell.width() * 2, cell.height())
+
+        painter = QPainter(image)
+        start = time.perf_counter()
+        for row in range(self.model.rowCount()):
+            self.delegate.paint(painter, option, self.model.index(row, 0))
+        seconds = time.perf_counter() - start
+        painter.end()
+
+        return seconds
+
+    def run(self):
+        pairs = max(1, self.model.rowCount())
+        for ratio in PaintBenchmark.RATIOS:
+            first = self.paintAll(ratio)
+            cached = sum(self.paintAll(ratio) for _ in range(PaintBenchmark.ROUNDS)) / PaintBenchmark.ROUNDS
+            print(
+                f'ratio {ratio:g}: {self.delegate.pixelSize()} px thumbnails, '
+                f'first paint {first / pairs * 1000:.3f} ms, cached {cached / pairs * 1000:.3f} ms per icon pair'
+            )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('Usage: python PaintBenchmark.py path/to/icons [size]')
+
+    app = QApplication(sys.argv[:1])
+    svgFiles = SvgFile.LoadFolder(sys.argv[1])
+    if not svgFiles:
+        sys.exit(f'No .svg files in {sys.argv[1]}')
+
+    print(f'{len(svgFiles)} icons')
+    PaintBenchmark(svgFiles, int(sys.argv[2]) if len(sys.argv) > 2 else 32).run()
@@ -0,0 +1,375 @@
+import numpy as np
+import re
+import struct
+
+"""
+    Perceptual color math on whole arrays of colors at once, used to match colors
+    against a palette.
+
+    Colors go in as hex strings ('#abc' or '#aabbcc'), are converted to CIE Lab
+    (D65) and compared using CIEDE2000: http://www2.ece.rochester.edu/~gsharma/ciede2000/
+    Colors with an alpha ('#abcd', '#aabbccdd') are compared on their color
+    alone and keep their alpha in what they're mapped to, see WithAlphaOf.
+
+    Everything works on NumPy arrays so matching thousands of colors against
+    hundreds of palette entries is a handful of array operations rather than
+    millions of Python function calls.
+"""
+class Palette:
+    # D65 reference white
+    WHITE = np.array((0.95047, 1.0, 1.08883))
+    SRGBTOXYZ = np.array((
+        (0.4124564, 0.3575761, 0.1804375),
+        (0.2126729, 0.7151522, 0.0721750),
+        (0.0193339, 0.1191920, 0.9503041),
+    ))
+    # Rows of the distance matrix computed in one go, bounds the memory used
+    CHUNKSIZE = 4096
+
+    # '#' prefixed colors anywhere, or lines with nothing but a 6 (or 8, with
+    # alpha) digit hex value
+    HEXPATTERN = re.compile(
+        r'#([0-9a-fA-F]{8}|[0-9a-fA-F]{6}|[0-9a-fA-F]{3,4})(?![0-9a-fA-F])'
+        r'|^\s*([0-9a-fA-F]{8}|[0-9a-fA-F]{6})\s*,?\s*$',
+        re.MULTILINE
+    )
+
+    # The alpha, if there is one, is left out
+    @staticmethod
+    def HexToRgb(hex: str) -> tuple:
+        hex = hex.lstrip('#')
+        if len(hex) in (3, 4):
+            hex = ''.join(digit * 2 for digit in hex)
+        return int(hex[0:2], 16), int(hex[2:4], 16), int(hex[4:6], 16)
+
+    # The alpha of hex as two hex digits, '' for colors that are fully opaque
+    @staticmethod
+    def AlphaOf(hex: str) -> str:
+        hex = hex.lstrip('#').lower()
+        if len(hex) == 4:
+            alpha = hex[3] * 2
+        elif len(hex) == 8:
+            alpha = hex[6:8]
+        else:
+            return ''
+
+        return '' if alpha == 'ff' else alpha
+
+    # hex with the alpha of source, a semi-transparent color stays as transparent.
+    # An opaque source takes the alpha of hex.
+    @staticmethod
+    def WithAlphaOf(hex: str, source: str) -> str:
+        alpha = Palette.AlphaOf(source)
+        if alpha == '':
+            return hex
+
+        return Palette.RgbToHex(Palette.HexToRgb(hex)) + alpha
+
+    @staticmethod
+    def RgbToHex(rgb) -> str:
+        return '#{:02x}{:02x}{:02x}'.format(*(int(round(channel)) for channel in rgb))
+
+    """
+        Args:
+            rgb (np.ndarray) shape (n, 3) with sRGB values in the 0-255 range.
+
+        Returns:
+            np.ndarray: shape (n, 3) with L, a and b.
+    """
+    @staticmethod
+    def RgbToLab(rgb: np.ndarray) -> np.ndarray:
+        rgb = np.asarray(rgb, dtype=np.float64) / 255
+        linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+        xyz = linear @ Palette.SRGBTOXYZ.T / Palette.WHITE
+
+        f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+        return np.stack((
+            116 * f[:, 1] - 16,
+            500 * (f[:, 0] - f[:, 1]),
+            200 * (f[:, 1] - f[:, 2]),
+        ), axis=1)
+
+    @staticmethod
+    def HexesToLab(hexes: list) -> np.ndarray:
+        rgb = np.array([Palette.HexToRgb(hex) for hex in hexes], dtype=np.float64).reshape(-1, 3)
+        return Palette.RgbToLab(rgb)
+
+    """
+        CIEDE2000 color difference between every color in lab1 and every color
+        in lab2.
+
+        Args:
+            lab1 (np.ndarray) shape (n, 3)
+            lab2 (np.ndarray) shape (m, 3)
+
+        Returns:
+            np.ndarray: shape (n, m) with the differences.
+    """
+    @staticmethod
+    def Ciede2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+        L1, a1, b1 = (lab1[:, channel, np.newaxis] for channel in range(3))
+        L2, a2, b2 = (lab2[np.newaxis, :, channel] for channel in range(3))
+
+        cBar7 = ((np.hypot(a1, b1) + np.hypot(a2, b2)) / 2) ** 7
+        g = 0.5 * (1 - np.sqrt(cBar7 / (cBar7 + 25 ** 7)))
+        a1p = (1 + g) * a1
+        a2p = (1 + g) * a2
+        c1p = np.hypot(a1p, b1)
+        c2p = np.hypot(a2p, b2)
+        h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+        h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+        chromaProduct = c1p * c2p
+
+        deltaLp = L2 - L1
+        deltaCp = c2p - c1p
+        deltahp = h2p - h1p
+        deltahp = np.where(deltahp > 180, deltahp - 360, deltahp)
+        deltahp = np.where(deltahp < -180, deltahp + 360, deltahp)
+        deltahp = np.where(chromaProduct == 0, 0, deltahp)
+        deltaHp = 2 * np.sqrt(chromaProduct) * np.sin(np.radians(deltahp) / 2)
+
+        lBarp = (L1 + L2) / 2
+        cBarp = (c1p + c2p) / 2
+        hSum = h1p + h2p
+        hBarp = np.where(
+            chromaProduct == 0, hSum,
+            np.where(
+                np.abs(h1p - h2p) <= 180, hSum / 2,
+                np.where(hSum < 360, (hSum + 360) / 2, (hSum - 360) / 2)
+            )
+        )
+
+        t = (1 - 0.17 * np.cos(np.radians(hBarp - 30))
+             + 0.24 * np.cos(np.radians(2 * hBarp))
+             + 0.32 * np.cos(np.radians(3 * hBarp + 6))
+             - 0.20 * np.cos(np.radians(4 * hBarp - 63)))
+        deltaTheta = 30 * np.exp(-(((hBarp - 275) / 25) ** 2))
+        cBarp7 = cBarp ** 7
+        rc = 2 * np.sqrt(cBarp7 / (cBarp7 + 25 ** 7))
+        lBarp50 = (lBarp - 50) ** 2
+        sl = 1 + 0.015 * lBarp50 / np.sqrt(20 + lBarp50)
+        sc = 1 + 0.045 * cBarp
+        sh = 1 + 0.015 * cBarp * t
+        rt = -np.sin(np.radians(2 * deltaTheta)) * rc
+
+        return np.sqrt(
+            (deltaLp / sl) ** 2 + (deltaCp / sc) ** 2 + (deltaHp / sh) ** 2
+            + rt * (deltaCp / sc) * (deltaHp / sh)
+        )
+
+    """
+        Finds the perceptually closest palette entry for every color.
+
+        Args:
+            colors (list) hex strings of the colors to map.
+            palette (list) hex strings of the colors to map to.
+
+        Returns:
+            dict: {color: palette entry} with the alpha of color, if color
+            has one.
+    """
+    @staticmethod
+    def NearestColors(colors: list, palette: list) -> dict:
+        colors = list(colors)
+        if not colors or not palette:
+            return {}
+
+        colorsLab = Palette.HexesToLab(colors)
+        paletteLab = Palette.HexesToLab(palette)
+        nearest = np.empty(len(colors), dtype=np.intp)
+        for start in range(0, len(colors), Palette.CHUNKSIZE):
+            distances = Palette.Ciede2000(colorsLab[start:start + Palette.CHUNKSIZE], paletteLab)
+            nearest[start:start + Palette.CHUNKSIZE] = distances.argmin(axis=1)
+
+        return {color: Palette.WithAlphaOf(palette[index], color) for color, index in zip(colors, nearest)}
+
+    """
+        Groups similar colors together and proposes to replace each group by the
+        color used most within it, a way to clean up a palette that collected
+        lots of nearly identical colors over the years.
+
+        Either clusterCount or threshold should be given:
+            clusterCount: weighted k-means in Lab, ends up with (at most) that many colors.
+            threshold: agglomerative (centroid linkage), keeps merging the two
+            closest groups until they're more than threshold CIEDE2000 apart.
+
+        Args:
+            colorCounts (dict) {hex: how often the color is used}, the counts
+            weigh the clustering so often used colors pull harder.
+
+        Returns:
+            dict: {hex: replacement hex} only for the colors that change, the
+            replacement has the alpha of the color it replaces.
+    """
+    @staticmethod
+    def Consolidate(colorCounts: dict, clusterCount: int = None, threshold: float = None) -> dict:
+        colors = list(colorCounts.keys())
+        if len(colors) < 2:
+            return {}
+
+        lab = Palette.HexesToLab(colors)
+        weights = np.array([colorCounts[color] for color in colors], dtype=np.float64)
+        if clusterCount is not None:
+            labels = Palette.WeightedKMeans(lab, weights, clusterCount)
+        else:
+            labels = Palette.Agglomerate(lab, weights, threshold)
+
+        # Every group is replaced by its most used member, heaviest color first so
+        # it's the one that gets picked.
+        representatives = {}
+        for index in np.argsort(-weights, kind='stable'):
+            representatives.setdefault(labels[index], colors[index])
+
+        colorSwaps = {}
+        for color, label in zip(colors, labels):
+            replacement = Palette.WithAlphaOf(representatives[label], color)
+            if replacement.lower() != color.lower():
+                colorSwaps[color] = replacement
+
+        return colorSwaps
+
+    @staticmethod
+    def WeightedKMeans(lab: np.ndarray, weights: np.ndarray, clusterCount: int, iterations: int = 50) -> np.ndarray:
+        clusterCount = max(1, min(clusterCount, len(lab)))
+        random = np.random.default_rng(0) # Same colors in, same proposal out
+
+        # k-means++ seeding, weighted by usage
+        centers = [lab[np.argmax(weights)]]
+        for _ in range(1, clusterCount):
+            distances = ((lab[:, np.newaxis, :] - np.array(centers)[np.newaxis]) ** 2).sum(axis=2).min(axis=1)
+            probabilities = distances * weights
+            if probabilities.sum() == 0:
+                break
+            centers.append(lab[random.choice(len(lab), p=probabilities / probabilities.sum())])
+        centers = np.array(centers)
+
+        labels = None
+        for _ in range(iterations):
+            distances = ((lab[:, np.newaxis, :] - centers[np.newaxis]) ** 2).sum(axis=2)
+            newLabels = distances.argmin(axis=1)
+            if labels is not None and np.array_equal(labels, newLabels):
+                break
+            labels = newLabels
+
+            totals = np.bincount(labels, weights=weights, minlength=len(centers))
+            used = totals > 0
+            for channel in range(3):
+                sums = np.bincount(labels, weights=weights * lab[:, channel], minlength=len(centers))
+                centers[used, channel] = sums[used] / totals[used]
+
+        return labels
+
+    @staticmethod
+    def Agglomerate(lab: np.ndarray, weights: np.ndarray, threshold: float) -> np.ndarray:
+        centroids = lab.copy()
+        clusterWeights = weights.copy()
+        labels = np.arange(len(lab))
+        merged = np.zeros(len(lab), dtype=bool)
+
+        distances = Palette.Ciede2000(centroids, centroids)
+        np.fill_diagonal(distances, np.inf)
+        # Closest other group per group, so finding the closest pair doesn't
+        # have to search the whole matrix after every merge
+        nearest = distances.argmin(axis=1)
+        nearestDistances = distances[np.arange(len(lab)), nearest]
+        while True:
+            i = np.argmin(nearestDistances)
+            j = nearest[i]
+            if not nearestDistances[i] <= threshold:
+                break
+
+            # Merge j into i
+            total = clusterWeights[i] + clusterWeights[j]
+            centroids[i] = (centroids[i] * clusterWeights[i] + centroids[j] * clusterWeights[j]) / total
+            clusterWeights[i] = total
+            labels[labels == j] = i
+            merged[j] = True
+
+            distances[i] = Palette.Ciede2000(centroids[i:i + 1], centroids)[0]
+            distances[i, merged] = np.inf
+            distances[i, i] = np.inf
+            distances[:, i] = distances[i]
+            distances[j, :] = np.inf
+            distances[:, j] = np.inf
+
+            stale = (nearest == i) | (nearest == j)
+            stale[i] = True
+            nearest[stale] = distances[stale].argmin(axis=1)
+            nearestDistances[stale] = distances[stale, nearest[stale]]
+            closer = distances[:, i] < nearestDistances
+            nearest[closer] = i
+            nearestDistances[closer] = distances[closer, i]
+
+        return labels
+
+    """
+        Reads a palette from a file. Supported are GIMP palettes (.gpl), Adobe
+        Swatch Exchange files (.ase) and anything else is read as text with
+        hex colors in it (one per line, comma separated, CSS...).
+
+        Returns:
+            list: the palette as '#rrggbb' hex strings ('#rrggbbaa' for entries
+            with an alpha), duplicates removed.
+    """
+    @staticmethod
+    def Load(filePath: str) -> list:
+        with open(filePath, 'rb') as file:
+            data = file.read()
+
+        if data.startswith(b'ASEF'):
+            colors = Palette.ParseAse(data)
+        else:
+            text = data.decode('utf-8', errors='replace')
+            if text.startswith('GIMP Palette'):
+                colors = Palette.ParseGpl(text)
+            else:
+                colors = Palette.ParseHexList(text)
+
+        return list(dict.fromkeys(colors))
+
+    @staticmethod
+    def ParseHexList(text: str) -> list:
+        return [
+            Palette.RgbToHex(Palette.HexToRgb(prefixed or bare)) + Palette.AlphaOf(prefixed or bare)
+            for prefixed, bare in Palette.HEXPATTERN.findall(text)
+        ]
+
+    @staticmethod
+    def ParseGpl(text: str) -> list:
+        colors = []
+        for line in text.splitlines()[1:]:
+            values = line.split()
+            if len(values) >= 3 and all(value.isdigit() for value in values[:3]):
+                colors.append(Palette.RgbToHex(int(value) for value in values[:3]))
+
+        return colors
+
+    # See http://www.selapa.net/swatches/colors/fileformats.php#adobe_ase
+    @staticmethod
+    def ParseAse(data: bytes) -> list:
+        colors = []
+        blockCount, = struct.unpack_from('>I', data, 8)
+        offset = 12
+        for _ in range(blockCount):
+            blockType, blockLength = struct.unpack_from('>HI', data, offset)
+            offset += 6
+            if blockType == 0x0001:
+                nameLength, = struct.unpack_from('>H', data, offset)
+                modelOffset = offset + 2 + nameLength * 2
+                model = data[modelOffset:modelOffset + 4]
+                valuesOffset = modelOffset + 4
+                if model == b'RGB ':
+                    rgb = struct.unpack_from('>3f', data, valuesOffset)
+                elif model == b'Gray':
+                    rgb = struct.unpack_from('>f', data, valuesOffset) * 3
+                elif model == b'CMYK':
+                    c, m, y, k = struct.unpack_from('>4f', data, valuesOffset)
+                    rgb = ((1 - c) * (1 - k), (1 - m) * (1 - k), (1 - y) * (1 - k))
+                else:
+                    rgb = None # LAB swatches are skipped
+
+                if rgb is not None:
+                    colors.append(Palette.RgbToHex(channel * 255 for channel in rgb))
+            offset += blockLength
+
+        return colors
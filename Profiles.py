@@ -0,0 +1,83 @@
+from Settings import SETTINGS, SettingsVar
+from ColorTable import ColorTable
+
+"""
+    Keeps track of the named color mappings (profiles) the user has made.
+
+    Every profile is a plain {oldHex: newHex} dictionary, exactly what used to be
+    stored under SettingsVar.COLOR_SWAPS. That old single mapping is picked up
+    as the 'Default' profile the first time this runs.
+"""
+class PaletteProfiles:
+    DEFAULTNAME = 'Default'
+
+    def __init__(self, settings=SETTINGS):
+        self.settings = settings
+        self.profiles = dict(settings.value(SettingsVar.PROFILES, {}) or {})
+        if not self.profiles:
+            self.profiles[PaletteProfiles.DEFAULTNAME] = dict(
+                settings.value(SettingsVar.COLOR_SWAPS, {}) or {}
+            )
+
+        self.currentName = settings.value(
+            SettingsVar.CURRENT_PROFILE, PaletteProfiles.DEFAULTNAME, str
+        )
+        if self.currentName not in self.profiles:
+            self.currentName = next(iter(self.profiles))
+
+    def names(self) -> list:
+        return list(self.profiles.keys())
+
+    def current(self) -> dict:
+        return self.profiles[self.currentName]
+
+    def setCurrent(self, name: str):
+        if name in self.profiles:
+            self.currentName = name
+            self.save()
+
+    """
+        Creates a new profile and makes it the current one.
+
+        Args:
+            name (str) name of the new profile, should not be in use yet.
+            swaps (dict, optional) the mapping to start out with, empty if omitted.
+
+        Returns:
+            bool: False if the name was already taken (nothing is changed).
+    """
+    def create(self, name: str, swaps: dict = None) -> bool:
+        if not name or name in self.profiles:
+            return False
+
+        self.profiles[name] = dict(swaps or {})
+        self.currentName = name
+        self.save()
+        return True
+
+    def duplicate(self, name: str) -> bool:
+        return self.create(name, self.current())
+
+    """
+        Removes the current profile, the last remaining profile can't be removed.
+    """
+    def removeCurrent(self) -> bool:
+        if len(self.profiles) < 2:
+            return False
+
+        del self.profiles[self.currentName]
+        self.currentName = next(iter(self.profiles))
+        self.save()
+        return True
+
+    def setSwap(self, oldHex: str, newHex: str):
+        self.setSwaps({oldHex: newHex})
+
+    # Like setSwap but for a whole {oldHex: newHex} dictionary at once, see ColorTable.MergeSwaps
+    def setSwaps(self, swaps: dict):
+        self.profiles[self.currentName] = ColorTable.MergeSwaps(self.current(), swaps)
+        self.save()
+
+    def save(self):
+        self.settings.setValue(SettingsVar.PROFILES, self.profiles)
+        self.settings.setValue(SettingsVar.CURRENT_PROFILE, self.currentName)
@@ -0,0 +1,102 @@
+from Settings import SettingsVar
+from ThemeVariables import ThemeVariables
+from SvgMinifier import SvgMinifier
+import json
+
+"""
+    A standalone JSON file holding everything needed to reproduce a color swap:
+    the folders, background colors, the swap profiles and the mapping layers.
+
+    Unlike QSettings (which is shared by the whole application) a project file
+    can be kept next to the icons it belongs to, put under version control and
+    loaded in a single read.
+"""
+class ProjectFile:
+    VERSION = 1
+    # The settings stored in a project file along with the type QSettings should
+    # hand them back as (None for the dictionaries, those come back as is)
+    KEYS = {
+        SettingsVar.INPUT_FOLDER: str,
+        SettingsVar.OUTPUT_FOLDER: str,
+        SettingsVar.INPUT_BACKGROUND_COLOR: str,
+        SettingsVar.OUTPUT_BACKGROUND_COLOR: str,
+        SettingsVar.CUSTOM_INPUT_COLORS: list,
+        SettingsVar.CUSTOM_OUTPUT_COLORS: list,
+        SettingsVar.PROFILES: None,
+        SettingsVar.CURRENT_PROFILE: str,
+        SettingsVar.MAPPING_LAYERS: None,
+        SettingsVar.OUTPUT_COLOR_MODE: str,
+        SettingsVar.MINIFY: bool,
+        SettingsVar.MINIFY_PRECISION: int,
+    }
+    # What each of the KEYS has to be in the JSON
+    JSONTYPES = {
+        SettingsVar.CUSTOM_INPUT_COLORS: list,
+        SettingsVar.CUSTOM_OUTPUT_COLORS: list,
+        SettingsVar.PROFILES: dict,
+        SettingsVar.MAPPING_LAYERS: list,
+        SettingsVar.MINIFY: bool,
+        SettingsVar.MINIFY_PRECISION: int,
+    }
+
+    """
+        Reads a project file.
+
+        Returns:
+            dict: {SettingsVar value: value} for all the keys found in the file.
+
+        Raises:
+            OSError, ValueError: if the file can't be read or isn't a project file.
+    """
+    @staticmethod
+    def Load(filePath: str) -> dict:
+        with open(filePath, 'rb') as file:
+            project = json.loads(file.read())
+
+        if not isinstance(project, dict) or project.get('version') != ProjectFile.VERSION:
+            raise ValueError(f'{filePath} is not a (supported) project file')
+
+        for key in ProjectFile.KEYS:
+            jsonType = ProjectFile.JSONTYPES.get(key, str)
+            if key.value in project and not isinstance(project[key.value], jsonType):
+                raise ValueError(f'{key.value} in {filePath} should be a {jsonType.__name__}')
+
+        return {key.value: project[key.value] for key in ProjectFile.KEYS if key.value in project}
+
+    @staticmethod
+    def Save(filePath: str, settings):
+        project = {'version': ProjectFile.VERSION}
+        for key, valueType in ProjectFile.KEYS.items():
+            if settings.contains(key):
+                if valueType is None:
+                    project[key.value] = settings.value(key)
+                else:
+                    project[key.value] = settings.value(key, None, valueType)
+
+        with open(filePath, 'w', encoding='utf-8') as file:
+            json.dump(project, file, indent=2)
+
+    # Keys the project doesn't have are removed, nothing of the previous project
+    # (or of what was set up before it) is left behind
+    @staticmethod
+    def ApplyTo(settings, project: dict):
+        for key in ProjectFile.KEYS:
+            if key.value in project:
+                settings.setValue(key, project[key.value])
+            else:
+                settings.remove(key)
+
+    """
+        Returns:
+            SvgMinifier: what the project saves with, None if it doesn't minify
+            (or saves with CSS variables, those aren't minified).
+    """
+    @staticmethod
+    def Minifier(project: dict) -> SvgMinifier:
+        if project.get(SettingsVar.OUTPUT_COLOR_MODE.value, ThemeVariables.HEX) != ThemeVariables.HEX:
+            return None
+        if not project.get(SettingsVar.MINIFY.value, False):
+            return None
+
+        # 0 leaves the path data as it is, like in the main window
+        return SvgMinifier(project.get(SettingsVar.MINIFY_PRECISION.value, 0) or None)
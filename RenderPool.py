@@ -0,0 +1,168 @@
+from PySide6.QtCore import QObject, Signal, QByteArray, Qt
+from PySide6.QtGui import QImage, QPainter, QGuiApplication
+from PySide6.QtSvg import QSvgRenderer
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import os
+import sys
+
+"""
+    Renders SVGs outside of the GUI (thread) and spreads work that needs those
+    renders over a pool of worker processes, one per core.
+
+    The workers are started with 'spawn' (forking a process that already runs Qt
+    isn't safe) and each of them gets its own offscreen QGuiApplication so fonts
+    and painting work without a display. The pool is started on first use and
+    kept around, starting it takes a moment.
+
+    Functions run in the pool have to be importable by the workers: module level
+    functions or static methods, taking and returning plain (picklable) values.
+"""
+class RenderPool:
+    # Tasks sent to a worker in one go, keeps the per task overhead down
+    CHUNKSIZE = 64
+    _executor = None
+
+    @staticmethod
+    def RenderImage(content: bytes, size: int) -> QImage:
+        return RenderPool.Render(QSvgRenderer(QByteArray(content)), size)
+
+    # RenderImage as an array (see ImageToArray), which can be sent back from a worker
+    @staticmethod
+    def RenderArray(content: bytes, size: int) -> np.ndarray:
+        return RenderPool.ImageToArray(RenderPool.RenderImage(content, size))
+
+    # Invalid SVGs render as a fully transparent image
+    @staticmethod
+    def Render(svgRenderer: QSvgRenderer, size: int) -> QImage:
+        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        if svgRenderer.isValid():
+            painter = QPainter(image)
+            svgRenderer.render(painter)
+            painter.end()
+
+        return image
+
+    """
+        Returns:
+            np.ndarray: shape (height, width, 4) uint8 array with RGBA values
+            (not premultiplied), a copy so it outlives the image.
+    """
+    @staticmethod
+    def ImageToArray(image: QImage) -> np.ndarray:
+        image = image.convertToFormat(QImage.Format_RGBA8888)
+        height, width = image.height(), image.width()
+        buffer = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+
+        return buffer.reshape(height, image.bytesPerLine())[:, :width * 4].reshape(height, width, 4).copy()
+
+    # The reverse of ImageToArray, the image has its own copy of the pixels
+    @staticmethod
+    def ArrayToImage(pixels: np.ndarray) -> QImage:
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+        height, width = pixels.shape[:2]
+        return QImage(pixels.data, width, height, width * 4, QImage.Format_RGBA8888).copy()
+
+    @staticmethod
+    def Executor() -> ProcessPoolExecutor:
+        if RenderPool._executor is None:
+            RenderPool._executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=RenderPool.InitializeWorker
+            )
+
+        return RenderPool._executor
+
+    @staticmethod
+    def InitializeWorker():
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+        # The script that started the pool might have made one while being imported
+        RenderPool.workerApplication = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    @staticmethod
+    def RunChunk(function, chunk: list) -> list:
+        return [function(*arguments) for arguments in chunk]
+
+    """
+        Runs function(*arguments) for every entry in argumentsList in the pool.
+
+        Args:
+            chunkSize (int, optional) tasks sent to a worker at a time, smaller
+            chunks spread a short list over more workers and report sooner.
+
+        Returns:
+            list: (first index, future) per chunk, every future results in the
+            list of return values for its chunk.
+    """
+    @staticmethod
+    def Submit(function, argumentsList: list, chunkSize: int = CHUNKSIZE) -> list:
+        executor = RenderPool.Executor()
+        return [
+            (start, executor.submit(RenderPool.RunChunk, function, argumentsList[start:start + chunkSize]))
+            for start in range(0, len(argumentsList), chunkSize)
+        ]
+
+    # Blocking version of Submit, returns the results in order
+    @staticmethod
+    def Map(function, argumentsList: list) -> list:
+        results = []
+        for _, future in RenderPool.Submit(function, argumentsList):
+            results.extend(future.result())
+
+        return results
+
+    @staticmethod
+    def Shutdown():
+        if RenderPool._executor is not None:
+            RenderPool._executor.shutdown(cancel_futures=True)
+            RenderPool._executor = None
+
+
+"""
+    Runs a batch of tasks in the RenderPool without blocking the GUI, results are
+    delivered through signals on the thread the batch was created on.
+"""
+class RenderBatch(QObject):
+    # index into the arguments list, return value
+    resultReady = Signal(int, object)
+    # number of tasks that raised instead of returning
+    finished = Signal(int)
+    # Emitted from the executor's thread, Qt queues it over to ours
+    chunkDone = Signal(int, object)
+
+    def __init__(self, function, argumentsList: list, parent=None, chunkSize: int = RenderPool.CHUNKSIZE):
+        super().__init__(parent)
+        self.function = function
+        self.argumentsList = argumentsList
+        self.chunkSize = chunkSize
+        self.remaining = 0
+        self.failures = 0
+        self.futures = []
+        self.chunkDone.connect(self.onChunkDone)
+
+    def start(self):
+        self.futures = RenderPool.Submit(self.function, self.argumentsList, self.chunkSize)
+        self.remaining = len(self.futures)
+        if self.remaining == 0:
+            self.finished.emit(0)
+        for start, future in self.futures:
+            future.add_done_callback(lambda future, start=start: self.chunkDone.emit(start, future))
+
+    def cancel(self):
+        for _, future in self.futures:
+            future.cancel()
+
+    def onChunkDone(self, start: int, future):
+        self.remaining -= 1
+        if not future.cancelled():
+            try:
+                for offset, result in enumerate(future.result()):
+                    self.resultReady.emit(start + offset, result)
+            except Exception:
+                self.failures += len(self.argumentsList[start:start + self.chunkSize])
+
+        if self.remaining == 0:
+            self.finished.emit(self.failures)
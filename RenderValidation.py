@@ -0,0 +1,103 @@
+from PySide6.QtCore import QByteArray
+from PySide6.QtSvg import QSvgRenderer
+from RenderPool import RenderPool
+from SvgFile import SvgFile
+from SvgMinifier import SvgMinifier
+import numpy as np
+
+"""
+    Checks that the mapped icons render before they're saved. QSvgRenderer only
+    supports SVG Tiny 1.2, anything it can't make sense of renders as nothing at
+    all without any error, so that's what's looked for:
+        INVALID: QSvgRenderer can't load the mapped SVG
+        BLANK: it renders, but not a single pixel is visible
+        UNCHANGED: the mapping should change the icon, but it renders the same
+        MINIFIED: minifying changed how it renders (more than MINIFYTOLERANCE)
+
+    Meant to be run in the RenderPool, see CheckFile. Renders are done at the
+    small RENDERSIZE, that's plenty to tell any of these apart and keeps it fast.
+"""
+class RenderValidation:
+    RENDERSIZE = 32
+    INVALID = 'invalid'
+    BLANK = 'blank'
+    UNCHANGED = 'unchanged'
+    MINIFIED = 'minified'
+    DESCRIPTIONS = {
+        INVALID: 'not a valid SVG (Tiny 1.2)',
+        BLANK: 'renders fully transparent',
+        UNCHANGED: 'renders the same as before the color swap',
+        MINIFIED: 'renders differently once minified',
+    }
+    # Largest difference (0-255) in any channel of any pixel allowed after
+    # minifying, rounded path data moves the anti-aliasing around a little
+    MINIFYTOLERANCE = 8
+
+    """
+        The arguments CheckFile is called with for svgFile: what it takes to
+        make the contents to compare, not the contents themselves. Those are
+        made by the workers, streamed files are read there instead of being
+        held here once for every version.
+
+        Args:
+            minifier (SvgMinifier, optional) the minifier it will be saved with.
+    """
+    @staticmethod
+    def Arguments(svgFile: SvgFile, minifier: SvgMinifier = None) -> tuple:
+        content = None if svgFile.streamed else svgFile.content
+        precision = minifier.precision if minifier is not None else None
+        return (svgFile.filePath, content, svgFile.colorMap, minifier is not None, precision)
+
+    """
+        Check for the icon at filePath (or with content, for icons that aren't
+        streamed) as it's saved with colorMap and, if minify, an SvgMinifier
+        with precision.
+    """
+    @staticmethod
+    def CheckFile(filePath: str, content: bytes, colorMap: dict, minify: bool, precision: int) -> str:
+        svgFile = SvgFile(filePath, content)
+        svgFile.setColorMap(colorMap)
+        expectChange = len(svgFile.colorMap) > 0
+        original = svgFile.getContentMappedWith({}) if expectChange else b''
+        minified = b''.join(SvgMinifier(precision).iterateChunks(svgFile)) if minify else None
+        return RenderValidation.Check(original, svgFile.getColorMappedContent(), expectChange, minified)
+
+    """
+        Args:
+            original (bytes) the SVG without mapping, only used when expectChange.
+            mapped (bytes) the SVG as it would be saved.
+            expectChange (bool) whether the mapping changes any of its colors.
+            minified (bytes, optional) mapped after minifying.
+
+        Returns:
+            str: INVALID, BLANK, UNCHANGED or MINIFIED, or None if it's fine.
+    """
+    @staticmethod
+    def Check(original: bytes, mapped: bytes, expectChange: bool, minified: bytes = None) -> str:
+        svgRenderer = QSvgRenderer(QByteArray(mapped))
+        if not svgRenderer.isValid():
+            return RenderValidation.INVALID
+
+        image = RenderPool.Render(svgRenderer, RenderValidation.RENDERSIZE)
+        if not RenderPool.ImageToArray(image)[..., 3].any():
+            return RenderValidation.BLANK
+
+        if expectChange and image == RenderPool.RenderImage(original, RenderValidation.RENDERSIZE):
+            return RenderValidation.UNCHANGED
+
+        if minified is not None:
+            pixels = RenderValidation.Premultiplied(RenderPool.ImageToArray(image))
+            minifiedPixels = RenderValidation.Premultiplied(
+                RenderPool.RenderArray(minified, RenderValidation.RENDERSIZE)
+            )
+            if np.abs(pixels - minifiedPixels).max() > RenderValidation.MINIFYTOLERANCE:
+                return RenderValidation.MINIFIED
+
+        return None
+
+    # Colors of barely visible pixels can be far apart, weigh them by their alpha
+    @staticmethod
+    def Premultiplied(pixels: np.ndarray) -> np.ndarray:
+        pixels = pixels.astype(np.int32)
+        pixels[..., :3] = pixels[..., :3] * pixels[..., 3:] // 255
+        return pixels
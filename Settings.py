@@ -0,0 +1,123 @@
+from PySide6.QtCore import QSettings, QTimer, QCoreApplication
+from enum import Enum
+
+# Instead of writing the same string to both set and get settings names which is
+# error prone. Set it one place and just refer to it instead.
+class SettingsVar(str, Enum):
+    INPUT_FOLDER = 'InputFolder'
+    OUTPUT_FOLDER = 'OutputFolder'
+    PREVIEW_ICON_SIZE = 'PreviewIconSize'
+    INPUT_BACKGROUND_COLOR = 'InputBackgroundColor'
+    OUTPUT_BACKGROUND_COLOR = 'OutputBackgroundColor'
+    SHOW_CONTRAST = 'ShowContrast'
+    COLOR_SWAPS = 'ColorSwaps'
+    CUSTOM_INPUT_COLORS = 'CustomInputColors'
+    CUSTOM_OUTPUT_COLORS = 'CustomOutputColors'
+    WINDOW_GEOMETRY = 'WindowGeometry'
+    TREE_DOCK_POSITION = 'TreeDockPosition'
+    STYLE_AS_DISABLED = 'StyleAsDisabled'
+    PROFILES = 'Profiles'
+    CURRENT_PROFILE = 'CurrentProfile'
+    VALIDATE_RENDERS = 'ValidateRenders'
+    MAPPING_LAYERS = 'MappingLayers'
+    OUTPUT_COLOR_MODE = 'OutputColorMode'
+    MINIFY = 'Minify'
+    MINIFY_PRECISION = 'MinifyPrecision'
+
+
+ORGANIZATION = 'SVG Color Swapper'
+APPNAME = 'SVG Color Swapper'
+
+"""
+    Wraps QSettings so that changes are kept in memory and written out together.
+
+    Every UI change used to hit QSettings right away, dragging a slider or picking
+    a color could easily result in dozens of writes. Values set here are stored
+    as pending and flushed FLUSHDELAY milliseconds after the last change (or when
+    flush() is called, which the main window does when it closes).
+
+    Without a running Q(Core)Application there's no event loop for the timer, in
+    that case values are written through immediately.
+"""
+class DeferredSettings:
+    FLUSHDELAY = 500
+    # Pending value of keys that are removed on the next flush
+    REMOVED = object()
+
+    def __init__(self, settings: QSettings):
+        self.settings = settings
+        self.pending = {}
+        self.flushTimer = None
+
+    def value(self, key: str, defaultValue=None, type=None):
+        if key in self.pending:
+            value = self.pending[key]
+            return defaultValue if value is DeferredSettings.REMOVED else DeferredSettings.Coerce(value, defaultValue, type)
+        if type is None:
+            return self.settings.value(key, defaultValue)
+        return self.settings.value(key, defaultValue, type)
+
+    """
+        A pending value the way QSettings hands it back once it's written, values
+        are stored as text so asking for a type converts them: 'true' is True,
+        '1.6' is 2 and a single value is a list of one. Like QSettings, a value
+        that doesn't convert comes back as the empty value of the type.
+    """
+    @staticmethod
+    def Coerce(value, defaultValue, type):
+        if value is None:
+            return defaultValue
+        if type is None or isinstance(value, type):
+            return value
+
+        try:
+            if type is bool:
+                return value.lower() == 'true' if isinstance(value, str) else bool(value)
+            if type is list:
+                return list(value) if isinstance(value, tuple) else [value]
+            if type is int:
+                return round(float(value))
+            return type(value)
+        except (TypeError, ValueError):
+            return type()
+
+    def setValue(self, key: str, value):
+        self.pending[key] = value
+        self.scheduleFlush()
+
+    def remove(self, key: str):
+        self.pending[key] = DeferredSettings.REMOVED
+        self.scheduleFlush()
+
+    def contains(self, key: str) -> bool:
+        if key in self.pending:
+            return self.pending[key] is not DeferredSettings.REMOVED
+        return self.settings.contains(key)
+
+    def scheduleFlush(self):
+        if QCoreApplication.instance() is None:
+            self.flush()
+            return
+
+        # Created lazily, SETTINGS exists before the QApplication does
+        if self.flushTimer is None:
+            self.flushTimer = QTimer()
+            self.flushTimer.setSingleShot(True)
+            self.flushTimer.setInterval(DeferredSettings.FLUSHDELAY)
+            self.flushTimer.timeout.connect(self.flush)
+        self.flushTimer.start()
+
+    def flush(self):
+        if self.flushTimer is not None:
+            self.flushTimer.stop()
+
+        for key, value in self.pending.items():
+            if value is DeferredSettings.REMOVED:
+                self.settings.remove(key)
+            else:
+                self.settings.setValue(key, value)
+        self.pending.clear()
+        self.settings.sync()
+
+
+SETTINGS = DeferredSettings(QSettings(ORGANIZATION, APPNAME))
@@ -1,58 +1,495 @@
-from PySide6.QtCore import QFile, QRegularExpression, QRegularExpressionMatch, QSize, QByteArray
-from PySide6.QtGui import QPixmap, QPainter
-from PySide6.QtCore import QFile, Qt
+from PySide6.QtCore import QFile, QFileInfo, QDir, QDirIterator, QByteArray
+from PySide6.QtGui import QPixmap, QImage
 from PySide6.QtSvg import QSvgRenderer
+from ColorTable import ColorTable
+from ThumbnailAtlas import ThumbnailAtlas, AtlasSlot
 
-import re
+from collections import OrderedDict
+import hashlib
+import os
+import shutil
 
+"""
+    A color mapping ({oldColor: newColor} as ColorTable integers) together with
+    the bytes every new color is written as.
+
+    Compiling is done through CompiledColorMap.Compile() which hands out shared
+    instances, so going back to a mapping that was used before (switching palette
+    profiles for example) doesn't have to rebuild anything.
+"""
+class CompiledColorMap:
+    CACHESIZE = 256
+    _cache = OrderedDict()
+
+    def __init__(self, colorMap: dict):
+        self.colorMap = dict(colorMap)
+        self.key = frozenset(self.colorMap.items())
+        self.replacements = {
+            color: ColorTable.ToHex(newColor).encode('ascii') for color, newColor in self.colorMap.items()
+        }
+
+    """
+        Args:
+            content (bytes) the SVG.
+            occurrences (list) [(start, end, color)] of every color in content, in order.
+
+        Returns:
+            bytes: content with the colors replaced.
+    """
+    def apply(self, content: bytes, occurrences: list) -> bytes:
+        if not self.replacements:
+            return content
+
+        pieces = []
+        position = 0
+        for start, end, color in occurrences:
+            replacement = self.replacements.get(color)
+            if replacement is not None:
+                pieces.append(content[position:start])
+                pieces.append(replacement)
+                position = end
+        pieces.append(content[position:])
+
+        return b''.join(pieces)
+
+    @staticmethod
+    def Compile(colorMap: dict) -> 'CompiledColorMap':
+        key = frozenset(colorMap.items())
+        cache = CompiledColorMap._cache
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            cache[key] = CompiledColorMap(colorMap)
+            if len(cache) > CompiledColorMap.CACHESIZE:
+                cache.popitem(last=False)
+
+        return cache[key]
+
+
+"""
+    An SVG file along with the colors in it.
+
+    Files larger than STREAMTHRESHOLD are streamed: their content isn't kept in
+    memory, it's read again in chunks of STREAMCHUNKSIZE whenever it's needed.
+    Saving those writes the mapped chunks as they come (see
+    iterateColorMappedChunks) so it never holds more than a chunk at a time.
+
+    An SvgFile can also be made from content that's already been read (from an
+    archive for example), filePath is then only used to name it.
+
+    Files with the exact same content (aliases like edit.svg and pencil.svg)
+    share a single parsed SvgFile, see Load and sharedCopy.
+"""
 class SvgFile:
-    def __init__(self, filePath: str):
+    # Amount of different color mappings thumbnails are kept around for
+    THUMBNAILCACHESIZE = 8
+    STREAMTHRESHOLD = 4 * 1024 * 1024
+    STREAMCHUNKSIZE = 1024 * 1024
+
+    def __init__(self, filePath: str, content: bytes = None):
+        # {color: number of occurrences}, colors are ColorTable integers
         self.colors = {}
-        self.content = ''
+        # {color: combined length in bytes of all its occurrences}
+        self.tokenLengths = {}
+        # [(start, end, color)] byte offsets of every color in content
+        self.occurrences = []
+        self.content = b''
+        self.fileSize = QFileInfo(filePath).size() if content is None else len(content)
+        # Streamed files leave content and occurrences empty
+        self.streamed = content is None and self.fileSize > SvgFile.STREAMTHRESHOLD
         self.filePath = filePath
         self.colorMap = {}
+        self.compiledColorMap = CompiledColorMap.Compile({})
+        # {compiledColorMap.key: {size: AtlasSlot}}, least recently used first
+        self.thumbnailCache = OrderedDict()
+        # Set after analysing the rendered icon, see getContrastAnalysis
+        self.contrastAnalysis = None
+        # {size: VisualDiff} for the mapping in visualDiffsKey, see VisualDiff.Get
+        self.visualDiffs = {}
+        self.visualDiffsKey = None
+        # {size: score} scored in the RenderPool, see VisualDiff.ScoreFile
+        self.visualDiffScores = {}
+        # Hash of the content when loaded through Load, files with the same hash
+        # are the same file under different names
+        self.contentHash = None
+        # The SvgFiles (this one included) with the same content, see Load
+        self.duplicates = [self]
+
+        if self.streamed:
+            for _, token in SvgFile.StreamTokens(filePath):
+                if token is not None:
+                    self.addColor(ColorTable.Intern(token), len(token))
+            return
 
-        file = QFile(filePath)
-        if file.open(QFile.ReadOnly | QFile.Text):
-            self.content = str(file.readAll(), encoding='utf-8')
+        if content is None:
+            file = QFile(filePath)
+            if file.open(QFile.ReadOnly):
+                content = file.readAll().data()
 
-            regEx = QRegularExpression('(#[[:xdigit:]]{3,6})(?:;|\s)')
-            matches = regEx.globalMatch(self.content)
-            while matches.hasNext():
-                match: QRegularExpressionMatch = matches.next()
+        if content is not None:
+            self.content = content
+            self.fileSize = len(content)
 
-                colorHex = match.captured(1).capitalize()
-                if colorHex in self.colors:
-                    self.colors[colorHex] += 1
-                else:
-                    self.colors[colorHex] = 1
+            for match in ColorTable.TOKENPATTERN.finditer(self.content):
+                color = ColorTable.Intern(match.group(0))
+                self.occurrences.append((match.start(), match.end(), color))
+                self.addColor(color, match.end() - match.start())
 
+    """
+        Another SvgFile for the same content, without reading or parsing anything:
+        it shares the colors, the content and the thumbnails (which are kept per
+        color mapping) with this one. The color mapping is its own.
+    """
+    def sharedCopy(self, filePath: str) -> 'SvgFile':
+        copy = SvgFile.__new__(SvgFile)
+        copy.colors = self.colors
+        copy.tokenLengths = self.tokenLengths
+        copy.occurrences = self.occurrences
+        copy.content = self.content
+        copy.fileSize = self.fileSize
+        copy.streamed = self.streamed
+        copy.filePath = filePath
+        copy.colorMap = {}
+        copy.compiledColorMap = CompiledColorMap.Compile({})
+        copy.thumbnailCache = self.thumbnailCache
+        copy.contrastAnalysis = None
+        copy.visualDiffs = {}
+        copy.visualDiffsKey = None
+        copy.visualDiffScores = {}
+        copy.contentHash = self.contentHash
+        copy.duplicates = [copy]
+
+        return copy
+
+    """
+        Makes an SvgFile like the constructor does, unless a file with the very
+        same content was loaded before: then it's a sharedCopy of that one and
+        the two are each other's duplicates.
+
+        Args:
+            loaded (dict) {contentHash: SvgFile} of the files loaded so far,
+            shared between the calls for one folder.
+    """
+    @staticmethod
+    def Load(filePath: str, loaded: dict, content: bytes = None) -> 'SvgFile':
+        # Streamed files aren't read as a whole, they're never deduplicated
+        if content is None and QFileInfo(filePath).size() <= SvgFile.STREAMTHRESHOLD:
+            file = QFile(filePath)
+            if file.open(QFile.ReadOnly):
+                content = file.readAll().data()
+        if content is None:
+            return SvgFile(filePath)
+
+        contentHash = hashlib.blake2b(content, digest_size=16).digest()
+        original = loaded.get(contentHash)
+        if original is None:
+            svgFile = loaded[contentHash] = SvgFile(filePath, content)
+            svgFile.contentHash = contentHash
+            return svgFile
+
+        svgFile = original.sharedCopy(filePath)
+        original.duplicates.append(svgFile)
+        svgFile.duplicates = original.duplicates
+        return svgFile
+
+    def addColor(self, color: int, length: int):
+        self.colors[color] = self.colors.get(color, 0) + 1
+        self.tokenLengths[color] = self.tokenLengths.get(color, 0) + length
+
+    # Only the part of the mapping that concerns colors in this file is kept,
+    # that way changing an unrelated color leaves the cached thumbnails valid.
     def setColorMap(self, colorMap: {}):
-        self.colorMap = colorMap
+        self.colorMap = self.restrictColorMap(colorMap)
+        self.compiledColorMap = CompiledColorMap.Compile(self.colorMap)
+
+    # Returns the part of colorMap that actually changes a color in this file
+    def restrictColorMap(self, colorMap: {}) -> {}:
+        return {
+            color: newColor for color, newColor in colorMap.items()
+            if color in self.colors and color != newColor
+        }
 
-    def getPixmapScaledTo(self, size: int) -> QPixmap:
-        svgRenderer = QSvgRenderer(QByteArray(self.getColorMappedContent()))
+    # The thumbnail for the current mapping, rendered into the atlas for its
+    # size (in device pixels, see getPixmapScaledTo) if it isn't there (anymore)
+    def getThumbnail(self, size: int) -> AtlasSlot:
+        slots = self.thumbnailsFor(self.compiledColorMap.key)
+        slot = slots.get(size)
+        if slot is None or not slot.valid:
+            slot = slots[size] = ThumbnailAtlas.ForSize(size).allocate()
+            slot.atlas.render(slot, QSvgRenderer(QByteArray(self.getColorMappedContent())))
+        else:
+            slot.atlas.touch(slot)
 
-        pixmap = QPixmap(QSize(size, size))
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
-        svgRenderer.render(painter)
-        painter.end()
+        return slot
 
+    """
+        For when the thumbnail is needed as a pixmap of its own.
+
+        Args:
+            size (int) in device independent pixels.
+            devicePixelRatio (float) of the screen it's for, the pixmap is
+            rendered at size * devicePixelRatio device pixels so it stays sharp.
+    """
+    def getPixmapScaledTo(self, size: int, devicePixelRatio: float = 1.0) -> QPixmap:
+        pixmap = self.getThumbnail(SvgFile.DevicePixels(size, devicePixelRatio)).copy()
+        pixmap.setDevicePixelRatio(devicePixelRatio)
         return pixmap
-    
-    def getColorMappedContent(self) -> str:
-        svgAsString = self.content
 
-        if self.colorMap:
-            # create a regular expression pattern that matches all the substrings
-            pattern = '|'.join(map(re.escape, self.colorMap.keys()))
-            # define a callback function to perform the replacement
+    # Thumbnails (and the atlases they're in) are kept per size in device
+    # pixels: 32 at a ratio of 2 is the same thumbnail as 64 at a ratio of 1
+    @staticmethod
+    def DevicePixels(size: int, devicePixelRatio: float) -> int:
+        return round(size * devicePixelRatio)
+
+    # {size: AtlasSlot} for the mapping with the given key, marked as used
+    def thumbnailsFor(self, key: frozenset) -> dict:
+        slots = self.thumbnailCache.get(key)
+        if slots is None:
+            slots = self.thumbnailCache[key] = {}
+            if len(self.thumbnailCache) > SvgFile.THUMBNAILCACHESIZE:
+                _, evicted = self.thumbnailCache.popitem(last=False)
+                for slot in evicted.values():
+                    slot.atlas.release(slot)
+        else:
+            self.thumbnailCache.move_to_end(key)
+
+        return slots
+
+    # Stores a thumbnail rendered elsewhere, see FlowList.renderVisibleInBackground
+    def setThumbnail(self, key: frozenset, size: int, image: QImage):
+        slots = self.thumbnailsFor(key)
+        slot = slots.get(size)
+        if slot is None or not slot.valid:
+            slot = slots[size] = ThumbnailAtlas.ForSize(size).allocate()
+        slot.atlas.setImage(slot, image)
+
+    def hasThumbnail(self, size: int) -> bool:
+        slot = self.thumbnailCache.get(self.compiledColorMap.key, {}).get(size)
+        return slot is not None and slot.valid
+
+    # Doesn't render anything: the thumbnail for the current mapping if there
+    # is one, otherwise the one rendered most recently for an earlier mapping
+    # (to show until the current one is ready), or None.
+    def getCachedThumbnail(self, size: int) -> AtlasSlot:
+        for slots in [self.thumbnailCache.get(self.compiledColorMap.key, {})] + list(reversed(self.thumbnailCache.values())):
+            slot = slots.get(size)
+            if slot is not None and slot.valid:
+                return slot
+
+        return None
+
+    # The contrast analysis, as long as it was made for the current color mapping
+    def getContrastAnalysis(self):
+        analysis = self.contrastAnalysis
+        if analysis is None or analysis.mappingKey != self.compiledColorMap.key:
+            return None
+
+        return analysis
+
+    # For streamed files this is the one place the whole file ends up in memory,
+    # rendering needs all of it.
+    def getColorMappedContent(self) -> bytes:
+        return b''.join(self.iterateColorMappedChunks(self.compiledColorMap))
+
+    # Same as getColorMappedContent but for any mapping, not just the one set
+    def getContentMappedWith(self, colorMap: dict) -> bytes:
+        return b''.join(self.iterateColorMappedChunks(CompiledColorMap.Compile(self.restrictColorMap(colorMap))))
+
+    """
+        The content with compiledColorMap applied, in pieces. Files that aren't
+        streamed come in a single piece, streamed ones in pieces of around
+        STREAMCHUNKSIZE so they can be written out without holding the whole file.
+    """
+    def iterateColorMappedChunks(self, compiledColorMap: CompiledColorMap):
+        if not self.streamed:
+            yield compiledColorMap.apply(self.content, self.occurrences)
+            return
+
+        replacements = compiledColorMap.replacements
+        pieces = []
+        pending = 0
+        for text, token in SvgFile.StreamTokens(self.filePath):
+            pieces.append(text)
+            pending += len(text)
+            if token is not None:
+                pieces.append(replacements.get(ColorTable.Intern(token), token))
+            if pending >= SvgFile.STREAMCHUNKSIZE:
+                yield b''.join(pieces)
+                pieces = []
+                pending = 0
+        yield b''.join(pieces)
+
+    # Size in bytes of the content with compiledColorMap applied, worked out
+    # from the color counts without applying anything
+    def getColorMappedSize(self, compiledColorMap: CompiledColorMap) -> int:
+        return self.fileSize + sum(
+            self.colors[color] * len(replacement) - self.tokenLengths[color]
+            for color, replacement in compiledColorMap.replacements.items()
+        )
+
+    """
+        Writes the color mapped content to file (anything with a write(bytes)
+        method) a chunk at a time.
+
+        Args:
+            minifier (SvgMinifier, optional) minifies the content on the way.
+
+        Returns:
+            bool: False if any of the writes failed.
+    """
+    def writeColorMappedTo(self, file, minifier=None) -> bool:
+        if minifier is None:
+            chunks = self.iterateColorMappedChunks(self.compiledColorMap)
+        else:
+            chunks = minifier.iterateChunks(self)
+        for chunk in chunks:
+            if file.write(chunk) == -1:
+                return False
+
+        return True
+
+    # Whether the file at filePath (or the open file, which gets closed) holds
+    # exactly what chunks make up
+    @staticmethod
+    def IsSavedAs(filePath, chunks) -> bool:
+        try:
+            with open(filePath, 'rb') if isinstance(filePath, str) else filePath as file:
+                for chunk in chunks:
+                    if file.read(len(chunk)) != chunk:
+                        return False
+                return file.read(1) == b''
+        except OSError:
+            return False
+
+    """
+        Reads filePath in chunks and splits it up at every color in it, without
+        ever holding more than a chunk (plus the few bytes a color spans) of it.
+
+        A color token can straddle two chunks, so the last
+        ColorTable.MAXTOKENLENGTH bytes of every chunk are held back and searched
+        again together with the next chunk.
+
+        Yields:
+            (bytes, bytes): the text up to the next color and that color as
+            written in the file, the color is None for text without one after it.
+            Joined together they make up the whole file.
+    """
+    @staticmethod
+    def StreamTokens(filePath: str):
+        pattern = ColorTable.TOKENPATTERN
+        with open(filePath, 'rb') as file:
+            data = b''
+            # Everything in data before position has been yielded
+            position = 0
+            while True:
+                chunk = file.read(SvgFile.STREAMCHUNKSIZE)
+                # Some yielded bytes are kept for the lookbehinds of the pattern
+                keep = max(position - ColorTable.LOOKBEHINDLENGTH, 0)
+                data = data[keep:] + chunk
+                position -= keep
+
+                # Tokens starting in the held back bytes might not be complete yet
+                limit = len(data) - ColorTable.MAXTOKENLENGTH if chunk else len(data)
+                for match in pattern.finditer(data, position):
+                    if match.start() >= limit:
+                        break
+                    yield data[position:match.start()], match.group(0)
+                    position = match.end()
+
+                if not chunk:
+                    yield data[position:], None
+                    return
+                if limit > position:
+                    yield data[position:limit], None
+                    position = limit
+
+    """
+        Path of this file relative to inputFolder, how it's named in an output
+        folder or archive.
+
+        Raises:
+            ValueError: if the file isn't inside inputFolder, saving it would
+            write outside the output.
+    """
+    def getRelativePath(self, inputFolder: str) -> str:
+        relativePath = QDir(inputFolder).relativeFilePath(self.filePath)
+        if QDir.isAbsolutePath(relativePath) or '..' in relativePath.split('/'):
+            raise ValueError(f'{self.filePath} is outside of {inputFolder}')
+
+        return relativePath
+
+    """
+        Where this file ends up when saving from inputFolder to outputFolder, any
+        subfolders it's in are kept.
+
+        Raises:
+            ValueError: see getRelativePath.
+    """
+    def getOutputFilePath(self, inputFolder: str, outputFolder: str) -> str:
+        return QDir(outputFolder).filePath(self.getRelativePath(inputFolder))
+
+    """
+        Reads all the .svg files in the given folder.
+
+        Returns:
+            list: an SvgFile for every .svg in the folder.
+    """
+    @staticmethod
+    def LoadFolder(folder: str) -> list:
+        dir = QDir(folder)
+        dir.setNameFilters(['*.svg'])
+
+        svgFiles = []
+        loaded = {}
+        it = QDirIterator(dir)
+        while it.hasNext():
+            it.next()
+            svgFiles.append(SvgFile.Load(it.filePath(), loaded))
+
+        return svgFiles
+
+    """
+        Saves svgFiles, with their color mapping applied, from inputFolder to
+        outputFolder (see getOutputFilePath). Files with the same content and
+        the same mapping only get mapped and written once, the others are copies
+        of that. Copies rather than hardlinks, every output is a file of its own
+        that changing one of the others doesn't affect.
+
+        Args:
+            onSaved (callable, optional) called with the number of files saved
+            so far after every file.
+            minifier (SvgMinifier, optional) minifies the files on the way.
+
+        Raises:
+            OSError: if a file can't be written, the files before it are saved.
+            ValueError: if a file isn't inside inputFolder, see getRelativePath.
+    """
+    @staticmethod
+    def SaveToFolder(
+        svgFiles: list, inputFolder: str, outputFolder: str, onSaved=None, minifier=None
+    ):
+        # {(contentHash, mapping key): path it was written to}
+        written = {}
+        for done, svgFile in enumerate(svgFiles, 1):
+            filePath = svgFile.getOutputFilePath(inputFolder, outputFolder)
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            # A hardlink (made by an older version, or by hand), writing to it
+            # would change the files it's linked to as well
+            if os.path.isfile(filePath) and os.stat(filePath).st_nlink > 1:
+                os.remove(filePath)
 
-            def replace(match):
-                return self.colorMap[match.group(0)]
-            # use the sub method to perform the replacement
-            svgAsString = re.sub(pattern, replace, self.content)
+            key = (svgFile.contentHash, svgFile.compiledColorMap.key)
+            writtenPath = written.get(key) if svgFile.contentHash is not None else None
+            if writtenPath is None:
+                with open(filePath, 'wb') as file:
+                    if not svgFile.writeColorMappedTo(file, minifier):
+                        raise OSError(f'Could not write {filePath}')
+                # Only what's been written in full is copied, a file with a
+                # different mapping (from a mapping layer) has a key of its own
+                written[key] = filePath
+            else:
+                shutil.copyfile(writtenPath, filePath)
 
-        return svgAsString
+            if onSaved is not None:
+                onSaved(done)
 
@@ -0,0 +1,245 @@
+from SvgFile import SvgFile, CompiledColorMap
+from ColorTable import ColorTable
+import re
+
+"""
+    A color mapping that writes every color in its shortest form (#aabbcc as
+    #abc), the colors that aren't swapped included.
+"""
+class ShortHexColorMap(CompiledColorMap):
+    def __init__(self, colorMap: dict):
+        super().__init__(colorMap)
+        self.key = ('short', self.key)
+        self.replacements = {
+            color: SvgMinifier.ShortHex(newColor).encode('ascii') for color, newColor in self.colorMap.items()
+        }
+
+
+"""
+    Makes the saved icons smaller: leaves out comments and editor metadata
+    (Inkscape and Sodipodi elements and attributes, <metadata>), leaves out the
+    whitespace between tags (not in text, or where xml:space asks to keep it),
+    writes colors in their shortest form and, if asked for, rounds
+    the numbers in path data to a number of decimals.
+
+    Minifying is done on the mapped content as it comes out of the color swap
+    (see iterateChunks), so a file is still read once and written once. Streamed
+    files come in pieces, a piece ends where a tag starts and anything that
+    isn't complete yet (a comment, CDATA, an editor element) is kept for the
+    next one.
+
+    The shortened colors are part of the color swap itself, see ShortHexColorMap.
+"""
+class SvgMinifier:
+    EDITORELEMENTPATTERN = re.compile(
+        rb'<((?:sodipodi|inkscape):[\w.-]+|metadata)\b(?:[^>]*?/>|.*?</\1\s*>)', re.DOTALL
+    )
+    EDITORATTRIBUTEPATTERN = re.compile(
+        rb'\s+(?:xmlns:)?(?:sodipodi|inkscape)(?::[\w.-]+)?\s*=\s*(?:"[^"]*"|\'[^\']*\')'
+    )
+    # Where an element, comment or CDATA section starts that might not be complete yet
+    OPENINGPATTERN = re.compile(rb'<(?:!--|!\[CDATA\[|(?:sodipodi|inkscape):[\w.-]+|metadata\b)')
+    # A CDATA section, comment, tag or the text up to the next one
+    TOKENPATTERN = re.compile(
+        rb'<!\[CDATA\[.*?\]\]>|<!--.*?-->|<(?:"[^"]*"|\'[^\']*\'|[^\'">])*>|[^<]+|<', re.DOTALL
+    )
+    TAGNAMEPATTERN = re.compile(rb'<(/?)([\w:.-]+)')
+    XMLSPACEPATTERN = re.compile(rb'\sxml:space\s*=\s*["\'](\w+)')
+    WHITESPACEPATTERN = re.compile(rb'\s+')
+    TAGENDPATTERN = re.compile(rb'\s+(/?>)')
+    PATHDATAPATTERN = re.compile(rb'(\sd\s*=\s*)("[^"]*"|\'[^\']*\')')
+    NUMBERPATTERN = re.compile(rb'[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?')
+    # Which of the 7 parameters of an arc are flags
+    ARCFLAGS = (3, 4)
+    # Elements whose text is shown (or read), whitespace in there is kept
+    TEXTELEMENTS = {b'text', b'tspan', b'textPath', b'title', b'desc', b'style', b'script'}
+
+    """
+        Args:
+            precision (int, optional) decimals to round path data to, None leaves
+            the numbers as they are.
+    """
+    def __init__(self, precision: int = None):
+        self.precision = precision
+        # Bytes left out compared to saving without minifying, over all files
+        self.bytesSaved = 0
+        # {color mapping key: ShortHexColorMap}
+        self.colorMaps = {}
+
+    """
+        Returns:
+            str: color as '#rgb' if that's the same color, like ColorTable.ToHex
+            otherwise.
+    """
+    @staticmethod
+    def ShortHex(color: int) -> str:
+        hex = ColorTable.ToHex(color)
+        if len(hex) == 7 and hex[1] == hex[2] and hex[3] == hex[4] and hex[5] == hex[6]:
+            return '#' + hex[1] + hex[3] + hex[5]
+
+        return hex
+
+    # The color mapping of svgFile (or colorMap), extended to all of its colors
+    def compile(self, svgFile: SvgFile, colorMap: dict = None) -> ShortHexColorMap:
+        if colorMap is None:
+            colorMap = svgFile.colorMap
+        colorMap = {color: colorMap.get(color, color) for color in svgFile.colors}
+        key = frozenset(colorMap.items())
+        compiled = self.colorMaps.get(key)
+        if compiled is None:
+            compiled = self.colorMaps[key] = ShortHexColorMap(colorMap)
+
+        return compiled
+
+    # Like SvgFile.iterateColorMappedChunks for the mapping set (or colorMap), but minified
+    def iterateChunks(self, svgFile: SvgFile, colorMap: dict = None):
+        written = 0
+        pending = b''
+        # Whether whitespace is kept, per element that's open
+        scopes = []
+        for chunk in svgFile.iterateColorMappedChunks(self.compile(svgFile, colorMap)):
+            data = pending + chunk
+            end = self.completeEnd(data)
+            pending = data[end:]
+            if end > 0:
+                minified = self.minify(data[:end], scopes)
+                written += len(minified)
+                yield minified
+
+        minified = self.minify(pending, scopes)
+        written += len(minified)
+        yield minified
+        compiledColorMap = svgFile.compiledColorMap if colorMap is None else CompiledColorMap.Compile(colorMap)
+        self.bytesSaved += svgFile.getColorMappedSize(compiledColorMap) - written
+
+    # Up to where data can be minified without anything that continues in the next chunk
+    def completeEnd(self, data: bytes) -> int:
+        end = data.rfind(b'<')
+        if end == -1:
+            return 0
+
+        position = 0
+        while True:
+            match = SvgMinifier.OPENINGPATTERN.search(data, position, end)
+            if match is None:
+                return end
+            if match.group(0) in (b'<!--', b'<![CDATA['):
+                closing = b'-->' if match.group(0) == b'<!--' else b']]>'
+                commentEnd = data.find(closing, match.end(), end)
+                position = commentEnd + len(closing)
+                complete = commentEnd != -1
+            else:
+                element = SvgMinifier.EDITORELEMENTPATTERN.match(data, match.start(), end)
+                position = element.end() if element is not None else end
+                complete = element is not None
+            if not complete:
+                return match.start()
+
+    """
+        Args:
+            scopes (list, optional) [keeps whitespace] for the elements left open
+            by the content before, updated for the next piece of the same file.
+    """
+    def minify(self, content: bytes, scopes: list = None) -> bytes:
+        if scopes is None:
+            scopes = []
+        content = SvgMinifier.EDITORELEMENTPATTERN.sub(b'', content)
+
+        pieces = []
+        for token in SvgMinifier.TOKENPATTERN.findall(content):
+            keepWhitespace = scopes[-1] if scopes else False
+            if token.startswith(b'<!--'):
+                continue
+            if token.startswith((b'<![CDATA[', b'<?', b'<!')) or token == b'<':
+                pieces.append(token)
+            elif token.startswith(b'<'):
+                pieces.append(self.minifyTag(token))
+                name = SvgMinifier.TAGNAMEPATTERN.match(token)
+                if name is None:
+                    continue
+                if name.group(1):
+                    if scopes:
+                        scopes.pop()
+                elif not token.endswith(b'/>'):
+                    xmlSpace = SvgMinifier.XMLSPACEPATTERN.search(token)
+                    if xmlSpace is not None:
+                        keepWhitespace = xmlSpace.group(1) == b'preserve'
+                    scopes.append(keepWhitespace or name.group(2).split(b':')[-1] in SvgMinifier.TEXTELEMENTS)
+            elif keepWhitespace:
+                pieces.append(token)
+            elif token.strip():
+                pieces.append(SvgMinifier.WHITESPACEPATTERN.sub(b' ', token))
+            # Whitespace between tags is left out
+
+        return b''.join(pieces)
+
+    # The whitespace between attributes is collapsed, their values are left alone
+    def minifyTag(self, tag: bytes) -> bytes:
+        tag = SvgMinifier.EDITORATTRIBUTEPATTERN.sub(b'', tag)
+        if self.precision is not None:
+            tag = SvgMinifier.PATHDATAPATTERN.sub(self.roundPathData, tag)
+        pieces = re.split(rb'("[^"]*"|\'[^\']*\')', tag)
+        pieces[::2] = [SvgMinifier.WHITESPACEPATTERN.sub(b' ', piece) for piece in pieces[::2]]
+
+        return SvgMinifier.TAGENDPATTERN.sub(rb'\1', b''.join(pieces))
+
+    def roundPathData(self, match: re.Match) -> bytes:
+        value = match.group(2)
+        return match.group(1) + value[:1] + self.roundPath(value[1:-1]) + value[-1:]
+
+    """
+        Rounds the numbers in path data, a command at a time: the large arc and
+        sweep flags of an arc are single digits that can be written without a
+        separator (a5 5 0 015 5 is flags 0 and 1, then 5) and are left as they are.
+        Path data that doesn't parse is left as it is altogether.
+    """
+    def roundPath(self, data: bytes) -> bytes:
+        pieces = []
+        position = 0
+        command = b''
+        # Parameters read since the command
+        parameter = 0
+        while position < len(data):
+            character = data[position:position + 1]
+            if character.isalpha():
+                command = character
+                parameter = 0
+                pieces.append(character)
+                position += 1
+            elif character in b' ,\t\r\n':
+                pieces.append(character)
+                position += 1
+            elif command in (b'a', b'A') and parameter % 7 in SvgMinifier.ARCFLAGS:
+                if character not in (b'0', b'1'):
+                    return data
+                pieces.append(character)
+                position += 1
+                parameter += 1
+            else:
+                match = SvgMinifier.NUMBERPATTERN.match(data, position)
+                if match is None:
+                    return data
+                pieces.append(self.roundNumber(match))
+                position = match.end()
+                parameter += 1
+
+        return b''.join(pieces)
+
+    def roundNumber(self, match: re.Match) -> bytes:
+        number = '{:.{}f}'.format(float(match.group(0)), self.precision)
+        if '.' in number:
+            number = number.rstrip('0').rstrip('.')
+        if number == '-0':
+            number = '0'
+        elif number.startswith(('0.', '-0.')):
+            number = number.replace('0.', '.', 1)
+        # Numbers can follow each other without a separator (1.5.5 is 1.5 and
+        # .5), rounding mustn't make them run together: 1.96.5 isn't 2.5
+        preceding = match.string[match.start() - 1:match.start()] if match.start() > 0 else b''
+        if (preceding.isdigit() or preceding == b'.') and number[0].isdigit():
+            number = ' ' + number
+        following = match.string[match.end():match.end() + 1]
+        if following == b'.' and '.' not in number:
+            number += ' '
+
+        return number.encode('ascii')
@@ -0,0 +1,225 @@
+from SvgFile import SvgFile, CompiledColorMap
+from ColorTable import ColorTable
+import os
+import re
+
+"""
+    Replaces every color with a reference to a CSS variable named after it
+    (#4d4d4d becomes var(--c-4d4d4d,#4d4d4d)), as if it were a color mapping.
+    The original color is the fallback for renderers without a value for it.
+"""
+class VariableColorMap(CompiledColorMap):
+    def __init__(self, colors):
+        self.colorMap = {}
+        self.key = ('variables', frozenset(colors))
+        self.replacements = {
+            color: f'var({ThemeVariables.VariableName(color)},{ColorTable.ToHex(color)})'.encode('ascii')
+            for color in colors
+        }
+
+
+"""
+    Saves icons with CSS variables instead of colors, the colors they're swapped
+    for are set in a stylesheet. Switching to another theme then only means
+    writing another stylesheet, the icons themselves stay exactly the same.
+
+    Two ways to go about it:
+        STYLESHEET: one palette.css in the output folder, referenced from every
+        icon through an <?xml-stylesheet?>. Icons used inline in a web page can
+        get the variables from the page's CSS instead. palette.css holds the
+        color most icons are mapped to, icons that mapping layers give another
+        color get a small <style> overriding just those variables.
+        INLINE: every icon gets a small <style> with the variables it uses.
+
+    SVG Tiny 1.2 (and with that QSvgRenderer, the previews in this application)
+    has no CSS variables, such icons only show their theme in renderers that do
+    (browsers for one), see CheckRender.
+"""
+class ThemeVariables:
+    HEX = 'hex'
+    STYLESHEET = 'stylesheet'
+    INLINE = 'inline'
+    # {mode: description}
+    MODES = {
+        HEX: 'hex colors',
+        STYLESHEET: 'CSS variables + palette.css',
+        INLINE: 'CSS variables, inline <style>',
+    }
+    STYLESHEETNAME = 'palette.css'
+    # Where an <?xml-stylesheet?> can go: after the XML declaration, if there is one
+    XMLDECLARATIONPATTERN = re.compile(rb'\s*<\?xml[^>]*\?>\s*')
+    SVGTAGPATTERN = re.compile(rb'<svg\b[^>]*>')
+
+    @staticmethod
+    def VariableName(color: int) -> str:
+        return '--c-' + ColorTable.ToHex(color)[1:]
+
+    # {oldColor: newColor} as the declarations of a CSS rule
+    @staticmethod
+    def Declarations(colors, colorMap: dict, separator: str = ' ') -> str:
+        return separator.join(
+            f'{ThemeVariables.VariableName(color)}: {ColorTable.ToHex(colorMap.get(color, color))};'
+            for color in sorted(colors)
+        )
+
+    """
+        Args:
+            colors (iterable) every color in the icons.
+            colorMap (dict) {oldColor: newColor} the theme, colors that aren't
+            in it keep their own color.
+    """
+    @staticmethod
+    def Stylesheet(colors, colorMap: dict) -> str:
+        return (
+            '/* The colors of the icons, each variable is named after the color it replaces */\n'
+            ':root {\n  ' + ThemeVariables.Declarations(colors, colorMap, '\n  ') + '\n}\n'
+        )
+
+    """
+        What goes in palette.css: every color of svgFiles mapped to the color
+        most of the icons with it are mapped to (by their own mapping, mapping
+        layers included, or by colorMap if given).
+    """
+    @staticmethod
+    def StylesheetColorMap(svgFiles: list, colorMap: dict = None) -> dict:
+        # {oldColor: {newColor: number of icons}}
+        votes = {}
+        for svgFile in svgFiles:
+            fileColorMap = svgFile.colorMap if colorMap is None else colorMap
+            for color in svgFile.colors:
+                newColor = fileColorMap.get(color, color)
+                counts = votes.setdefault(color, {})
+                counts[newColor] = counts.get(newColor, 0) + 1
+
+        return {color: max(counts, key=counts.get) for color, counts in votes.items()}
+
+    """
+        The content of svgFile with its colors replaced by variables, in pieces
+        like SvgFile.iterateColorMappedChunks. Pieces are held back until the
+        start tag of the root <svg> has come by, the headers go in there.
+
+        Args:
+            headers (bytes, bytes) see Headers.
+    """
+    @staticmethod
+    def IterateChunks(svgFile: SvgFile, headers: tuple):
+        prolog, style = headers
+        pending = b''
+        for chunk in svgFile.iterateColorMappedChunks(VariableColorMap(svgFile.colors)):
+            if pending is None:
+                yield chunk
+                continue
+
+            pending += chunk
+            match = ThemeVariables.SVGTAGPATTERN.search(pending)
+            if match is not None:
+                yield ThemeVariables.InsertHeaders(pending, prolog, style, match.end())
+                pending = None
+
+        # Not an SVG (as far as can be told), the <style> goes at the end
+        if pending is not None:
+            yield ThemeVariables.InsertHeaders(pending, prolog, style, len(pending))
+
+    @staticmethod
+    def InsertHeaders(content: bytes, prolog: bytes, style: bytes, rootEnd: int) -> bytes:
+        match = ThemeVariables.XMLDECLARATIONPATTERN.match(content)
+        position = match.end() if match is not None else 0
+        return content[:position] + prolog + content[position:rootEnd] + style + content[rootEnd:]
+
+    """
+        What IterateChunks adds to svgFile saved to filePath.
+
+        Args:
+            stylesheetColorMap (dict) what's in palette.css, for mode STYLESHEET.
+            colorMap (dict, optional) the mapping of svgFile, the one it has
+            set if omitted.
+
+        Returns:
+            (bytes, bytes): what goes before the root element (the
+            <?xml-stylesheet?>) and the <style> that goes in it, either can be
+            empty.
+    """
+    @staticmethod
+    def Headers(
+        svgFile: SvgFile, mode: str, filePath: str, outputFolder: str, stylesheetColorMap: dict, colorMap: dict = None
+    ) -> tuple:
+        if colorMap is None:
+            colorMap = svgFile.colorMap
+        colors = svgFile.colors
+        prolog = b''
+        if mode == ThemeVariables.STYLESHEET:
+            href = os.path.relpath(os.path.join(outputFolder, ThemeVariables.STYLESHEETNAME), os.path.dirname(filePath))
+            prolog = f'<?xml-stylesheet type="text/css" href="{href.replace(os.sep, "/")}"?>\n'.encode('utf-8')
+            # Only the colors palette.css doesn't have right for this icon
+            colors = [
+                color for color in colors
+                if colorMap.get(color, color) != stylesheetColorMap.get(color, color)
+            ]
+            if not colors:
+                return (prolog, b'')
+
+        return (prolog, f'<style>:root {{ {ThemeVariables.Declarations(colors, colorMap)} }}</style>'.encode('ascii'))
+
+    """
+        Saves svgFiles with variables to outputFolder, like
+        SvgFile.SaveToFolder. Icons that are already saved exactly like this
+        aren't written again, in STYLESHEET mode that leaves only palette.css to
+        write when switching themes.
+
+        Returns:
+            int: the number of icons written (not counting the unchanged ones).
+
+        Raises:
+            OSError: if a file can't be written.
+            ValueError: if a file isn't inside inputFolder, see SvgFile.getRelativePath.
+    """
+    @staticmethod
+    def Save(svgFiles: list, inputFolder: str, outputFolder: str, mode: str) -> int:
+        written = 0
+        stylesheetColorMap = ThemeVariables.StylesheetColorMap(svgFiles)
+        for svgFile in svgFiles:
+            filePath = svgFile.getOutputFilePath(inputFolder, outputFolder)
+            headers = ThemeVariables.Headers(svgFile, mode, filePath, outputFolder, stylesheetColorMap)
+            if SvgFile.IsSavedAs(filePath, ThemeVariables.IterateChunks(svgFile, headers)):
+                continue
+
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            with open(filePath, 'wb') as file:
+                for chunk in ThemeVariables.IterateChunks(svgFile, headers):
+                    file.write(chunk)
+            written += 1
+
+        if mode == ThemeVariables.STYLESHEET:
+            os.makedirs(outputFolder, exist_ok=True)
+            with open(os.path.join(outputFolder, ThemeVariables.STYLESHEETNAME), 'w', encoding='utf-8') as file:
+                file.write(ThemeVariables.Stylesheet(stylesheetColorMap, stylesheetColorMap))
+
+        return written
+
+    """
+        The arguments of CheckRender for svgFile as Save writes it: what it
+        takes to make the contents to compare, like RenderValidation.Arguments.
+    """
+    @staticmethod
+    def Arguments(svgFile: SvgFile, headers: tuple) -> tuple:
+        content = None if svgFile.streamed else svgFile.content
+        return (svgFile.filePath, content, svgFile.colorMap, headers)
+
+    """
+        Whether QSvgRenderer shows the icon at filePath (or with content, for
+        icons that aren't streamed) with variables the way it shows it with the
+        colors of colorMap written out, meant to be run in the RenderPool.
+    """
+    @staticmethod
+    def CheckRender(filePath: str, content: bytes, colorMap: dict, headers: tuple) -> bool:
+        # Imported here, only the workers need it
+        from RenderPool import RenderPool
+        import numpy as np
+
+        svgFile = SvgFile(filePath, content)
+        svgFile.setColorMap(colorMap)
+        variableContent = b''.join(ThemeVariables.IterateChunks(svgFile, headers))
+        size = 32
+        return np.array_equal(
+            RenderPool.RenderArray(variableContent, size), RenderPool.RenderArray(svgFile.getColorMappedContent(), size)
+        )
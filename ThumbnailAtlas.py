@@ -0,0 +1,154 @@
+from PySide6.QtCore import QRect, QRectF, Qt
+from PySide6.QtGui import QPixmap, QPainter, QImage, QIcon
+from PySide6.QtSvg import QSvgRenderer
+
+from collections import OrderedDict
+
+"""
+    A place in a ThumbnailAtlas holding a single thumbnail. Slots are handed
+    out by the atlas and stop being valid when it takes them back to reuse the
+    space for another thumbnail.
+"""
+class AtlasSlot:
+    def __init__(self, atlas: 'ThumbnailAtlas', page: int, rect: QRect):
+        self.atlas = atlas
+        self.page = page
+        self.rect = rect
+        self.valid = True
+        # The same thumbnail styled as disabled, see ThumbnailAtlas.disabledVariant
+        self.disabled = None
+
+    def pixmap(self) -> QPixmap:
+        return self.atlas.pages[self.page]
+
+    # A pixmap of its own, for when the thumbnail is needed on its own
+    def copy(self) -> QPixmap:
+        return self.pixmap().copy(self.rect)
+
+
+"""
+    All thumbnails of one size packed into a few large pixmaps (pages) rather
+    than a pixmap per thumbnail, painting draws a part of a page.
+
+    Sizes are in device pixels, a 32 pixel icon on a screen with a device pixel
+    ratio of 2 has its thumbnail in the atlas for 64.
+
+    Pages are added as they're needed, up to MAXPAGES. After that the least
+    recently drawn thumbnail gives up its slot, which in a scrolling list means
+    the icons that scrolled out of view the longest ago. There's one atlas per
+    size (see ForSize), switching sizes switches atlases and leaves the
+    thumbnails of the other size where they are.
+
+    A thumbnail can have a disabled looking variant next to it in the same
+    atlas, made once by the style (see disabledVariant) and dropped along with
+    the thumbnail or when the thumbnail is drawn anew.
+"""
+class ThumbnailAtlas:
+    PAGESIZE = 1024
+    MAXPAGES = 16
+    _atlases = {}
+
+    def __init__(self, size: int):
+        self.size = size
+        self.pages = []
+        self.free = []
+        # Slots in use, least recently used first
+        self.used = OrderedDict()
+
+    @staticmethod
+    def ForSize(size: int) -> 'ThumbnailAtlas':
+        atlas = ThumbnailAtlas._atlases.get(size)
+        if atlas is None:
+            atlas = ThumbnailAtlas._atlases[size] = ThumbnailAtlas(size)
+
+        return atlas
+
+    def slotsPerPage(self) -> int:
+        return (ThumbnailAtlas.PAGESIZE // self.size) ** 2
+
+    def addPage(self):
+        page = QPixmap(ThumbnailAtlas.PAGESIZE, ThumbnailAtlas.PAGESIZE)
+        page.fill(Qt.transparent)
+        self.pages.append(page)
+
+        perRow = ThumbnailAtlas.PAGESIZE // self.size
+        self.free.extend(
+            AtlasSlot(self, len(self.pages) - 1, QRect(column * self.size, row * self.size, self.size, self.size))
+            for row in reversed(range(perRow)) for column in reversed(range(perRow))
+        )
+
+    # An empty slot, either one that's free or the least recently used one
+    def allocate(self) -> AtlasSlot:
+        if not self.free:
+            if len(self.pages) < ThumbnailAtlas.MAXPAGES:
+                self.addPage()
+            else:
+                previous, _ = self.used.popitem(last=False)
+                previous.valid = False
+                self.free.append(AtlasSlot(self, previous.page, previous.rect))
+                self.dropVariants(previous)
+
+        slot = self.free.pop()
+        self.used[slot] = None
+        return slot
+
+    # Gives the slot back to the atlas, for thumbnails that are no longer needed
+    def release(self, slot: AtlasSlot):
+        if slot.valid:
+            slot.valid = False
+            del self.used[slot]
+            self.free.append(AtlasSlot(self, slot.page, slot.rect))
+        self.dropVariants(slot)
+
+    def dropVariants(self, slot: AtlasSlot):
+        if slot.disabled is not None:
+            self.release(slot.disabled)
+            slot.disabled = None
+
+    """
+        The thumbnail in slot the way the style draws disabled icons, generated
+        the first time it's asked for and kept until the thumbnail changes.
+
+        Returns:
+            AtlasSlot: where the disabled variant is.
+    """
+    def disabledVariant(self, slot: AtlasSlot) -> AtlasSlot:
+        variant = slot.disabled
+        if variant is not None and variant.valid:
+            self.touch(variant)
+            return variant
+
+        # Making room for the variant mustn't push out the thumbnail it's made from
+        self.touch(slot)
+        variant = self.allocate()
+        # At a ratio of 1: the slot is in device pixels already
+        pixmap = QIcon(slot.copy()).pixmap(slot.rect.size(), 1.0, QIcon.Disabled, QIcon.On)
+        self.setImage(variant, pixmap.toImage())
+        slot.disabled = variant
+        return variant
+
+    # Marks the slot as just used, keeps it from being reused soon
+    def touch(self, slot: AtlasSlot):
+        self.used.move_to_end(slot)
+
+    def render(self, slot: AtlasSlot, svgRenderer: QSvgRenderer):
+        self.dropVariants(slot)
+        painter = self.beginSlot(slot)
+        if svgRenderer.isValid():
+            svgRenderer.render(painter, QRectF(slot.rect))
+        painter.end()
+
+    def setImage(self, slot: AtlasSlot, image: QImage):
+        self.dropVariants(slot)
+        painter = self.beginSlot(slot)
+        painter.drawImage(slot.rect, image)
+        painter.end()
+
+    # Clears whatever was in the slot before and leaves the painter ready to draw in it
+    def beginSlot(self, slot: AtlasSlot) -> QPainter:
+        painter = QPainter(self.pages[slot.page])
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(slot.rect, Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        painter.setClipRect(slot.rect)
+        return painter
@@ -0,0 +1,107 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QGridLayout, QLabel, QSlider, QCheckBox, QDialogButtonBox
+from PySide6.QtCore import Qt, QTimer, Signal
+from ColorTransform import ColorTransform
+from ColorTable import ColorTable
+
+"""
+    Shifts all colors at once: rotates the hue, changes the saturation or
+    lightness, or flips the lightness for a dark theme, see ColorTransform.
+
+    The transform starts from the colors as they're currently mapped (the old
+    color if it has no swap yet). Every change is sent out as {oldHex: newHex}
+    swaps through swapsChanged so it can be previewed while a slider is being
+    dragged, the last ones are in colorSwaps when the dialog is accepted and in
+    colorMap ({oldColor: newColor} for every color, changed or not).
+"""
+class ToneDialog(QDialog):
+    swapsChanged = Signal(dict)
+    # Slider changes arriving within this many ms are previewed together
+    PREVIEWDELAY = 30
+
+    """
+        Args:
+            colors (dict) {oldColor: color it's mapped to now} ColorTable integers.
+    """
+    def __init__(self, parent, colors: dict):
+        super().__init__(parent)
+        self.oldColors = list(colors.keys())
+        self.currentColors = list(colors.values())
+        self.colorSwaps = {}
+        self.colorMap = dict(colors)
+        self.setWindowTitle('Adjust tones')
+        self.resize(380, 200)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f'Applies to all {len(colors)} colors'))
+
+        layoutSliders = QGridLayout()
+        self.sliders = {}
+        self.labels = {}
+        for row, (name, minimum, maximum, unit) in enumerate((
+            ('Hue', -180, 180, '°'),
+            ('Saturation', -100, 100, '%'),
+            ('Lightness', -100, 100, '%'),
+        )):
+            layoutSliders.addWidget(QLabel(name), row, 0)
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(minimum, maximum)
+            slider.valueChanged.connect(self.onSliderChanged)
+            layoutSliders.addWidget(slider, row, 1)
+            label = QLabel()
+            label.setMinimumWidth(40)
+            layoutSliders.addWidget(label, row, 2)
+            self.sliders[name] = slider
+            self.labels[name] = (label, unit)
+        layout.addLayout(layoutSliders)
+
+        self.checkboxInvertLightness = QCheckBox('Invert lightness (light colors become dark)')
+        self.checkboxInvertLightness.toggled.connect(self.onSliderChanged)
+        layout.addWidget(self.checkboxInvertLightness)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Apply | QDialogButtonBox.Reset | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Apply).clicked.connect(self.accept)
+        buttons.button(QDialogButtonBox.Reset).clicked.connect(self.reset)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.previewTimer = QTimer(self)
+        self.previewTimer.setSingleShot(True)
+        self.previewTimer.setInterval(ToneDialog.PREVIEWDELAY)
+        self.previewTimer.timeout.connect(self.transform)
+        self.updateLabels()
+
+    def reset(self):
+        for slider in self.sliders.values():
+            slider.setValue(0)
+        self.checkboxInvertLightness.setChecked(False)
+
+    def updateLabels(self):
+        for name, (label, unit) in self.labels.items():
+            label.setText(f'{self.sliders[name].value()}{unit}')
+
+    def onSliderChanged(self):
+        self.updateLabels()
+        self.previewTimer.start()
+
+    def transform(self):
+        newColors = ColorTransform.Apply(
+            self.currentColors,
+            self.sliders['Hue'].value(),
+            self.sliders['Saturation'].value(),
+            self.sliders['Lightness'].value(),
+            self.checkboxInvertLightness.isChecked()
+        )
+        self.colorMap = {color: int(newColor) for color, newColor in zip(self.oldColors, newColors)}
+        self.colorSwaps = {
+            ColorTable.ToHex(color): ColorTable.ToHex(newColor)
+            for color, newColor in self.colorMap.items()
+            if color != newColor
+        }
+        self.swapsChanged.emit(self.colorSwaps)
+
+    def accept(self):
+        # Don't lose a change that's still waiting for the timer
+        if self.previewTimer.isActive():
+            self.previewTimer.stop()
+            self.transform()
+        super().accept()
@@ -0,0 +1,126 @@
+from PySide6.QtGui import QPixmap
+from RenderPool import RenderPool
+from SvgFile import SvgFile
+import numpy as np
+
+"""
+    How much an icon changed by the color mapping: a heatmap of the difference
+    between the original and the mapped render, and a score summarizing it.
+
+    Both are worked out from the thumbnails SvgFile already caches, so showing
+    the heatmaps doesn't render anything the icon lists didn't already render.
+    Sorting needs the score of icons that haven't been painted as well, those
+    are scored in the RenderPool instead, see ScoreFile.
+"""
+class VisualDiff:
+    # How visible the unchanged parts of the mapped icon are under the heatmap
+    GHOSTOPACITY = 0.25
+
+    def __init__(self, heatmap: QPixmap, score: float):
+        self.heatmap = heatmap
+        # Average difference (0-1) over the pixels either render covers
+        self.score = score
+
+    """
+        Args:
+            original (QPixmap) the icon without the color mapping.
+            mapped (QPixmap) the same icon, same size, with the color mapping.
+    """
+    @staticmethod
+    def Compute(original: QPixmap, mapped: QPixmap) -> 'VisualDiff':
+        before = RenderPool.ImageToArray(original.toImage()).astype(np.float32) / 255
+        after = RenderPool.ImageToArray(mapped.toImage()).astype(np.float32) / 255
+        difference, score = VisualDiff.Difference(before, after)
+
+        # Yellow (small) to red (large) differences over a faint gray ghost of the icon
+        heatAlpha = difference
+        ghostAlpha = after[..., 3] * VisualDiff.GHOSTOPACITY * (1 - heatAlpha)
+        alpha = heatAlpha + ghostAlpha
+        visible = np.maximum(alpha, 1e-6)
+        heatmap = np.empty(difference.shape + (4,), dtype=np.float32)
+        heatmap[..., 0] = (heatAlpha + ghostAlpha * 0.5) / visible
+        heatmap[..., 1] = (heatAlpha * (1 - difference) + ghostAlpha * 0.5) / visible
+        heatmap[..., 2] = ghostAlpha * 0.5 / visible
+        heatmap[..., 3] = alpha
+
+        return VisualDiff(VisualDiff.ArrayToPixmap(heatmap), score)
+
+    """
+        Args:
+            before, after (np.ndarray) (height, width, 4) RGBA with 0-1 values.
+
+        Returns:
+            (np.ndarray, float): the difference (0-1) per pixel and the score.
+    """
+    @staticmethod
+    def Difference(before: np.ndarray, after: np.ndarray) -> tuple:
+        # Compared premultiplied, a color change where nothing is drawn isn't a change
+        difference = np.abs(before[..., :3] * before[..., 3:] - after[..., :3] * after[..., 3:]).max(axis=2)
+        difference = np.maximum(difference, np.abs(before[..., 3] - after[..., 3]))
+        coverage = np.maximum(before[..., 3], after[..., 3])
+        total = coverage.sum()
+        return difference, float(difference.sum() / total) if total > 0 else 0.0
+
+    # (height, width, 4) RGBA array with 0-1 values to a QPixmap
+    @staticmethod
+    def ArrayToPixmap(rgba: np.ndarray) -> QPixmap:
+        return QPixmap.fromImage(RenderPool.ArrayToImage(np.clip(rgba * 255 + 0.5, 0, 255).astype(np.uint8)))
+
+    """
+        The diff of mapped (an output SvgFile) against original (its input) at
+        the given size. Kept on mapped for as long as its color mapping stays the
+        same, so it's only computed the first time the icon is painted.
+    """
+    @staticmethod
+    def Get(mapped, original, size: int) -> 'VisualDiff':
+        VisualDiff.ForgetOutdated(mapped)
+        if size not in mapped.visualDiffs:
+            mapped.visualDiffs[size] = VisualDiff.Compute(
+                original.getPixmapScaledTo(size), mapped.getPixmapScaledTo(size)
+            )
+
+        return mapped.visualDiffs[size]
+
+    # Drops the diffs and scores of mapped made for another mapping than its current one
+    @staticmethod
+    def ForgetOutdated(mapped):
+        key = mapped.compiledColorMap.key
+        if mapped.visualDiffsKey != key:
+            mapped.visualDiffsKey = key
+            mapped.visualDiffs = {}
+            mapped.visualDiffScores = {}
+
+    # The score of mapped at size if it's known already, None otherwise
+    @staticmethod
+    def CachedScore(mapped, size: int) -> float:
+        VisualDiff.ForgetOutdated(mapped)
+        if size in mapped.visualDiffs:
+            return mapped.visualDiffs[size].score
+
+        return mapped.visualDiffScores.get(size)
+
+    # Keeps a score from ScoreFile, unless the mapping it was scored for has changed since
+    @staticmethod
+    def SetScore(mapped, mappingKey: frozenset, size: int, score: float):
+        VisualDiff.ForgetOutdated(mapped)
+        if mappingKey == mapped.visualDiffsKey:
+            mapped.visualDiffScores[size] = score
+
+    # The arguments ScoreFile is called with for mapped, like RenderValidation.Arguments
+    @staticmethod
+    def Arguments(mapped, size: int) -> tuple:
+        content = None if mapped.streamed else mapped.content
+        return (mapped.filePath, content, mapped.colorMap, size)
+
+    """
+        The score of the icon at filePath (or with content, for icons that
+        aren't streamed) mapped with colorMap, rendered at size. Meant to be run
+        in the RenderPool.
+    """
+    @staticmethod
+    def ScoreFile(filePath: str, content: bytes, colorMap: dict, size: int) -> float:
+        svgFile = SvgFile(filePath, content)
+        before = RenderPool.RenderArray(svgFile.getContentMappedWith({}), size).astype(np.float32) / 255
+        svgFile.setColorMap(colorMap)
+        after = RenderPool.RenderArray(svgFile.getColorMappedContent(), size).astype(np.float32) / 255
+        return VisualDiff.Difference(before, after)[1]
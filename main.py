@@ -1,38 +1,28 @@
-from PySide6.QtWidgets import QComboBox
-from FlowList import FlowList
+import time
+STARTTIME = time.perf_counter() # Before the (Qt) imports so those are timed as well
+
+from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QLabel, QWidget, QComboBox
 from PySide6.QtGui import QColor, QPixmap
-from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QLabel, QWidget
-from PySide6.QtGui import QColor
 from PySide6 import QtCore
 from PySide6 import QtWidgets
 from PySide6 import QtGui
 from SvgFile import SvgFile
+from ColorTable import ColorTable
 from ColorTree import ColorTreeWidget, ColorTreeItem, ColIndex
-from FlowList import FlowList, IconModel
-from enum import Enum
-import glob
+from FlowList import FlowList, IconModel, IconProxyModel
+from Settings import SETTINGS, SettingsVar, APPNAME
+from Profiles import PaletteProfiles
+from ProjectFile import ProjectFile
+from ChangeReport import ChangeReport
+from ChangeReportDialog import ChangeReportDialog
+from Archive import Archive, ArchiveWriter
+from IconIndex import IconIndex
+from MappingLayers import MappingLayers, MappingLayer
+from ThemeVariables import ThemeVariables
+from SvgMinifier import SvgMinifier
+import struct
 import sys
 
-# Instead of writing the same string to both set and get settings names which is 
-# error prone. Set it one place and just refer to it instead.
-class SettingsVar(str, Enum):
-    INPUT_FOLDER = 'InputFolder'
-    OUTPUT_FOLDER = 'OutputFolder'
-    PREVIEW_ICON_SIZE = 'PreviewIconSize'
-    INPUT_BACKGROUND_COLOR = 'InputBackgroundColor'
-    OUTPUT_BACKGROUND_COLOR = 'OutputBackgroundColor'
-    SHOW_CONTRAST = 'ShowContrast'
-    COLOR_SWAPS = 'ColorSwaps'
-    CUSTOM_INPUT_COLORS = 'CustomInputColors'
-    CUSTOM_OUTPUT_COLORS = 'CustomOutputColors'
-    WINDOW_GEOMETRY = 'WindowGeometry'
-    TREE_DOCK_POSITION = 'TreeDockPosition'
-    STYLE_AS_DISABLED = 'StyleAsDisabled'
-
-
-ORGANIZATION = 'SVG Color Swapper'
-APPNAME = 'SVG Color Swapper'
-SETTINGS = QtCore.QSettings(ORGANIZATION, APPNAME)
 """
     A custom ComboBox widget for selecting colors.
 
@@ -81,34 +71,84 @@ class ColorComboBox(QComboBox):
             if color == selectedColor:
                 self.setCurrentText(color)
 
-class MainWindow(QMainWindow):
+"""
+    Measures how long it takes for the application to start up.
 
-    listSvgFiles = []
+    Enabled by passing --timing, it then reports the time it took to get to the
+    first paint of the main window and the time until the window is fully
+    interactive (icons loaded, color tree populated and swaps restored). With
+    --timing-quit the application quits right after so it can be scripted.
+"""
+class StartupTimer(QtCore.QObject):
+    FIRSTPAINT = 'first paint'
+    INTERACTIVE = 'interactive'
 
-    def __init__(self, appName: str):
+    def __init__(self, startTime: float, quitWhenInteractive: bool):
+        super().__init__()
+        self.startTime = startTime
+        self.quitWhenInteractive = quitWhenInteractive
+        self.marks = {}
+
+    def mark(self, name: str):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.startTime
+
+        if name == StartupTimer.INTERACTIVE:
+            self.report()
+            if self.quitWhenInteractive:
+                QtCore.QTimer.singleShot(0, QApplication.quit)
+
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() == QtCore.QEvent.Paint:
+            self.mark(StartupTimer.FIRSTPAINT)
+            watched.removeEventFilter(self)
+        return False
+
+    def report(self):
+        for name, seconds in self.marks.items():
+            print(f'time to {name}: {seconds * 1000:.1f} ms')
+
+
+# The orders the icons can be sorted in, see MainWindow.updateIconRows
+class IconOrder:
+    FOLDER = 'folder'
+    LOWEST_CONTRAST = 'lowestContrast'
+    MOST_CHANGED = 'mostChanged'
+
+
+class MainWindow(QMainWindow):
+    # Milliseconds of typing in a filter field before the icons are filtered
+    FILTERDELAY = 150
+    # Milliseconds between re-sorts while the changes of the icons are scored
+    RESORTINTERVAL = 1000
+
+    def __init__(self, appName: str, startupTimer: StartupTimer = None):
         super().__init__()
         self.inputListSvgFiles = []
         self.outputListSvgFiles = []
+        self.profiles = PaletteProfiles()
+        self.mappingLayers = MappingLayers()
+        # The layer the color tree shows (and edits) the swaps of, None for the profile
+        self.editedLayer = None
+        self.initialIconsRequested = False
+        self.contrastBatch = None
+        self.changeScoreBatch = None
+        self.validationBatch = None
+        self.variableRenderBatch = None
+        self.iconIndex = IconIndex(self.inputListSvgFiles)
+        self.startupTimer = startupTimer
+        if startupTimer is not None:
+            self.installEventFilter(startupTimer)
 
         self.setWindowTitle('SVG Color Swapper')
+        self.addProjectMenu()
         self.addBottomGui()         # Must be done BEFORE addCenterGui
         self.addCenterGui()
         self.addDockedColorWidget() # Must be done AFTER addCenterGui
+        self.addFilterToolBar()
         self.resize(1280, 800)
         self.setMouseTracking(True)
 
-        if SETTINGS.contains(SettingsVar.INPUT_FOLDER):
-            self.populateListSvgFiles()
-
-        # Populate tree with any previously done colorswaps
-        colorSwaps = SETTINGS.value(SettingsVar.COLOR_SWAPS, {})
-        for colorToLookFor, colorToSet in colorSwaps.items():
-            for i in range(self.tree.topLevelItemCount()):
-                colorTreeItem: ColorTreeItem = self.tree.topLevelItem(i)
-                if colorTreeItem.text(ColIndex.OLDHEX.value) == colorToLookFor:
-                    colorTreeItem.setText(ColIndex.NEWHEX.value, colorToSet)
-                    colorTreeItem.updateNewColumns()
-            
         # All of the UI is set up. Start hooking up events.
         self.inputBackgroundColorComboBox.currentIndexChanged.connect(self.onChangeInputBackground)
         self.outputBackgroundColorComboBox.currentIndexChanged.connect(self.onChangeOutputBackground)
@@ -138,16 +178,123 @@ class MainWindow(QMainWindow):
         # Restore the geometry of the window from SETTINGS
         self.restoreGeometry(SETTINGS.value(SettingsVar.WINDOW_GEOMETRY, b''))
 
+
+    # Reading the icons is by far the slowest part of starting up, so the window
+    # gets painted (empty) first and is only filled after that, see loadInitialIcons
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.initialIconsRequested:
+            self.initialIconsRequested = True
+            QtCore.QTimer.singleShot(0, self.loadInitialIcons)
+
+    def loadInitialIcons(self):
+        if SETTINGS.contains(SettingsVar.INPUT_FOLDER):
+            self.populateListSvgFiles()
+
+        # Populate tree with the colorswaps of the active profile
+        self.applySwapsToTree(self.profiles.current())
         self.replaceOutputColorsWithTreeColors()
 
+        if self.startupTimer is not None:
+            self.startupTimer.mark(StartupTimer.INTERACTIVE)
+
     def closeEvent(self, event):
         # Save the state of the dock widgets to SETTINGS
         SETTINGS.setValue(SettingsVar.TREE_DOCK_POSITION, self.saveState())
 
         # Save the geometry of the window to SETTINGS
         SETTINGS.setValue(SettingsVar.WINDOW_GEOMETRY, self.saveGeometry())
+        SETTINGS.flush()
         super().closeEvent(event)
 
+    def addProjectMenu(self):
+        projectMenu = self.menuBar().addMenu('&Project')
+
+        openAction = projectMenu.addAction('&Open project...')
+        openAction.setShortcut(QtGui.QKeySequence.Open)
+        openAction.triggered.connect(self.onTriggeredOpenProject)
+
+        saveAction = projectMenu.addAction('&Save project as...')
+        saveAction.setShortcut(QtGui.QKeySequence.SaveAs)
+        saveAction.triggered.connect(self.onTriggeredSaveProject)
+
+        projectMenu.addSeparator()
+        jobsAction = projectMenu.addAction('&Run jobs...')
+        jobsAction.setToolTip('Runs a job file: many input folders, each saved with a profile to an output folder')
+        jobsAction.triggered.connect(self.onTriggeredRunJobs)
+
+    def onTriggeredOpenProject(self):
+        filePath, _ = QFileDialog.getOpenFileName(self, 'Open project', QtCore.QDir.homePath(), 'Project files (*.json)')
+        if filePath == '':
+            return
+
+        try:
+            project = ProjectFile.Load(filePath)
+        except (OSError, ValueError) as error:
+            QtWidgets.QMessageBox.critical(self, 'Open project', str(error))
+            return
+
+        self.loadProject(project)
+        self.statusBar().showMessage(f'Opened project {filePath}')
+
+    def onTriggeredSaveProject(self):
+        filePath, _ = QFileDialog.getSaveFileName(self, 'Save project', QtCore.QDir.homePath(), 'Project files (*.json)')
+        if filePath == '':
+            return
+
+        try:
+            ProjectFile.Save(filePath, SETTINGS)
+        except OSError as error:
+            QtWidgets.QMessageBox.critical(self, 'Save project', str(error))
+            return
+
+        self.statusBar().showMessage(f'Saved project to {filePath}')
+
+    def onTriggeredRunJobs(self):
+        # Imported here as it pulls in NumPy, which isn't needed to start up
+        from Jobs import JobQueue
+        from JobsDialog import JobsDialog
+
+        filePath, _ = QFileDialog.getOpenFileName(self, 'Run jobs', QtCore.QDir.homePath(), 'Job files (*.json)')
+        if filePath == '':
+            return
+
+        try:
+            # Profiles the job file doesn't have are taken from the ones made here
+            jobQueue = JobQueue.Load(filePath, self.profiles.profiles)
+        except (OSError, ValueError) as error:
+            QtWidgets.QMessageBox.critical(self, 'Run jobs', str(error))
+            return
+
+        JobsDialog(self, jobQueue).exec()
+
+    # Applies the project to SETTINGS and brings the whole UI in line with it
+    def loadProject(self, project: dict):
+        ProjectFile.ApplyTo(SETTINGS, project)
+
+        self.lineEditInputFolder.setText(SETTINGS.value(SettingsVar.INPUT_FOLDER, '', str))
+        self.lineEditOutputFolder.setText(SETTINGS.value(SettingsVar.OUTPUT_FOLDER, '', str))
+        for comboBox, setting, default in (
+            (self.inputBackgroundColorComboBox, SettingsVar.INPUT_BACKGROUND_COLOR, '#000000'),
+            (self.outputBackgroundColorComboBox, SettingsVar.OUTPUT_BACKGROUND_COLOR, '#FFFFFF')
+        ):
+            comboBox.rePopulate()
+            comboBox.setCurrentText(SETTINGS.value(setting, default, str))
+
+        self.profiles = PaletteProfiles()
+        self.rePopulateProfiles()
+        self.mappingLayers = MappingLayers()
+        self.editedLayer = None
+        self.rePopulateLayers()
+        self.comboBoxColorMode.setCurrentIndex(max(0, self.comboBoxColorMode.findData(
+            SETTINGS.value(SettingsVar.OUTPUT_COLOR_MODE, ThemeVariables.HEX)
+        )))
+        self.checkboxMinify.setChecked(SETTINGS.value(SettingsVar.MINIFY, False, bool))
+        self.spinBoxPathPrecision.setValue(SETTINGS.value(SettingsVar.MINIFY_PRECISION, 0, int))
+        if SETTINGS.contains(SettingsVar.INPUT_FOLDER):
+            self.populateListSvgFiles()
+        self.onChangeProfile(self.profiles.currentName)
+
     def onPressedAddBackgroundColor(self, colors: SettingsVar, color: SettingsVar):
         QtWidgets.QColorDialog()
 
@@ -210,6 +357,8 @@ class MainWindow(QMainWindow):
         iconControlsLayout.addWidget(self.comboBoxSizes)
         layoutBottom.addWidget(iconControlsWidget)
 
+        layoutBottom.addWidget(self.createIconOrderControls())
+
         spacer = QtWidgets.QSpacerItem(20, 1)
         layoutBottom.addItem(spacer)
 
@@ -225,7 +374,54 @@ class MainWindow(QMainWindow):
         self.buttonSave.setIcon(self.buttonSave.style().standardIcon(
             QtWidgets.QStyle.SP_DialogSaveButton))
         self.buttonSave.setDisabled(True)
-        self.buttonSave.clicked.connect(self.createAndSaveIcons)
+        self.buttonSave.clicked.connect(self.onPressedSave)
+        self.checkboxValidateRenders = QtWidgets.QCheckBox('check renders')
+        self.checkboxValidateRenders.setToolTip(
+            'Before saving, checks that every icon still renders (and changed where it should)'
+        )
+        self.checkboxValidateRenders.setChecked(SETTINGS.value(SettingsVar.VALIDATE_RENDERS, False, bool))
+        self.checkboxValidateRenders.toggled.connect(
+            lambda checked: SETTINGS.setValue(SettingsVar.VALIDATE_RENDERS, checked)
+        )
+        self.checkboxMinify = QtWidgets.QCheckBox('minify')
+        self.checkboxMinify.setToolTip(
+            'Leaves out comments, editor metadata and whitespace and writes colors as short as possible'
+        )
+        self.checkboxMinify.setChecked(SETTINGS.value(SettingsVar.MINIFY, False, bool))
+        self.checkboxMinify.toggled.connect(lambda checked: SETTINGS.setValue(SettingsVar.MINIFY, checked))
+        self.spinBoxPathPrecision = QtWidgets.QSpinBox()
+        self.spinBoxPathPrecision.setToolTip('Decimals the numbers in path data are rounded to when minifying')
+        self.spinBoxPathPrecision.setRange(0, 6)
+        self.spinBoxPathPrecision.setSpecialValueText('all decimals')
+        self.spinBoxPathPrecision.setSuffix(' decimals')
+        self.spinBoxPathPrecision.setValue(SETTINGS.value(SettingsVar.MINIFY_PRECISION, 0, int))
+        self.spinBoxPathPrecision.valueChanged.connect(
+            lambda value: SETTINGS.setValue(SettingsVar.MINIFY_PRECISION, value)
+        )
+        self.spinBoxPathPrecision.setEnabled(self.checkboxMinify.isChecked())
+        self.checkboxMinify.toggled.connect(self.spinBoxPathPrecision.setEnabled)
+        self.comboBoxColorMode = QtWidgets.QComboBox()
+        self.comboBoxColorMode.setToolTip(
+            'How the new colors are written: as hex colors, or as CSS variables so the theme can be swapped '
+            'by swapping the stylesheet (these only show in renderers with CSS variables, browsers for one)'
+        )
+        for mode, description in ThemeVariables.MODES.items():
+            self.comboBoxColorMode.addItem(description, mode)
+        self.comboBoxColorMode.setCurrentIndex(max(0, self.comboBoxColorMode.findData(
+            SETTINGS.value(SettingsVar.OUTPUT_COLOR_MODE, ThemeVariables.HEX)
+        )))
+        self.comboBoxColorMode.currentIndexChanged.connect(
+            lambda: SETTINGS.setValue(SettingsVar.OUTPUT_COLOR_MODE, self.comboBoxColorMode.currentData())
+        )
+        self.buttonDryRun = QtWidgets.QPushButton('&Dry run')
+        self.buttonDryRun.setToolTip('Lists what saving would change without writing anything')
+        self.buttonDryRun.setDisabled(True)
+        self.buttonDryRun.clicked.connect(self.onPressedDryRun)
+        layoutSave.addWidget(self.buttonDryRun)
+        layoutSave.addWidget(self.checkboxValidateRenders)
+        layoutSave.addWidget(self.checkboxMinify)
+        layoutSave.addWidget(self.spinBoxPathPrecision)
+        layoutSave.addWidget(self.comboBoxColorMode)
         layoutSave.addWidget(self.buttonSave)
         layoutBottom.addWidget(widgetSave)
 
@@ -233,12 +429,229 @@ class MainWindow(QMainWindow):
         self.statusBar().setSizeGripEnabled(False)
 
 
+    def createIconOrderControls(self) -> QWidget:
+        orderWidget = QWidget()
+        layoutOrder = QtWidgets.QHBoxLayout(orderWidget)
+
+        self.buttonAnalyzeContrast = QtWidgets.QPushButton('Analyze contrast')
+        self.buttonAnalyzeContrast.setToolTip(
+            'Renders the output icons and rates how much of each icon contrasts well with the output background'
+        )
+        self.buttonAnalyzeContrast.clicked.connect(self.onPressedAnalyzeContrast)
+        layoutOrder.addWidget(self.buttonAnalyzeContrast)
+
+        self.comboBoxIconOrder = QComboBox()
+        self.comboBoxIconOrder.addItem('Folder order', IconOrder.FOLDER)
+        self.comboBoxIconOrder.addItem('Lowest contrast first', IconOrder.LOWEST_CONTRAST)
+        self.comboBoxIconOrder.addItem('Most changed first', IconOrder.MOST_CHANGED)
+        self.comboBoxIconOrder.currentIndexChanged.connect(self.updateIconRows)
+        layoutOrder.addWidget(self.comboBoxIconOrder)
+
+        # Sorting by the most changed icons re-sorts now and then while the
+        # scores come in, not for every single one
+        self.resortTimer = QtCore.QTimer(self)
+        self.resortTimer.setSingleShot(True)
+        self.resortTimer.setInterval(MainWindow.RESORTINTERVAL)
+        self.resortTimer.timeout.connect(self.updateIconRows)
+
+        self.checkboxLowContrastOnly = QtWidgets.QCheckBox('low contrast only')
+        self.checkboxLowContrastOnly.setToolTip('Only shows the icons the contrast analysis flagged')
+        self.checkboxLowContrastOnly.toggled.connect(self.updateIconRows)
+        layoutOrder.addWidget(self.checkboxLowContrastOnly)
+
+        self.checkboxShowDifferences = QtWidgets.QCheckBox('show differences')
+        self.checkboxShowDifferences.setToolTip(
+            'Shows a heatmap of what the color swaps changed in the output icons, with how much they changed'
+        )
+        self.checkboxShowDifferences.toggled.connect(self.onToggleShowDifferences)
+        layoutOrder.addWidget(self.checkboxShowDifferences)
+
+        return orderWidget
+
+    def addFilterToolBar(self):
+        filterToolBar = self.addToolBar('Filter')
+        filterToolBar.setObjectName('FilterToolBar')
+        filterToolBar.setMovable(False)
+
+        # Looking up the matching rows is instant, but resetting and laying out
+        # the list isn't (tens of milliseconds for 10k icons), typing waits for
+        # a pause instead of doing that for every key
+        self.filterTimer = QtCore.QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(MainWindow.FILTERDELAY)
+        self.filterTimer.timeout.connect(self.updateIconRows)
+
+        self.lineEditNameFilter = QtWidgets.QLineEdit()
+        self.lineEditNameFilter.setPlaceholderText('Filter by name')
+        self.lineEditNameFilter.setToolTip('Part of the file name, or a pattern like <em>arrow-*.svg</em>')
+        self.lineEditNameFilter.setClearButtonEnabled(True)
+        self.lineEditNameFilter.textChanged.connect(lambda: self.filterTimer.start())
+        filterToolBar.addWidget(self.lineEditNameFilter)
+
+        self.lineEditColorFilter = QtWidgets.QLineEdit()
+        self.lineEditColorFilter.setPlaceholderText('Contains color')
+        self.lineEditColorFilter.setToolTip('Only icons that contain this hex color (#rgb, #rrggbb or #rrggbbaa)')
+        self.lineEditColorFilter.setClearButtonEnabled(True)
+        self.lineEditColorFilter.setMaximumWidth(160)
+        self.lineEditColorFilter.textChanged.connect(lambda: self.filterTimer.start())
+        filterToolBar.addWidget(self.lineEditColorFilter)
+
+        self.checkboxChangedOnly = QtWidgets.QCheckBox('changed by the swaps')
+        self.checkboxChangedOnly.setToolTip('Only icons the current color swaps change')
+        self.checkboxChangedOnly.toggled.connect(self.updateIconRows)
+        filterToolBar.addWidget(self.checkboxChangedOnly)
+
+        self.checkboxDuplicatesOnly = QtWidgets.QCheckBox('duplicates')
+        self.checkboxDuplicatesOnly.setToolTip('Only icons that are identical to another icon, grouped together')
+        self.checkboxDuplicatesOnly.toggled.connect(self.updateIconRows)
+        filterToolBar.addWidget(self.checkboxDuplicatesOnly)
+
+    # Sorts and filters the icon pairs, see IconProxyModel
+    def updateIconRows(self):
+        self.filterTimer.stop()
+        rows = range(self.iconIndex.rowCount())
+        nameFilter = self.lineEditNameFilter.text().strip()
+        if nameFilter != '':
+            rows = self.iconIndex.rowsMatchingName(nameFilter)
+
+        allowedRows = []
+        try:
+            allowedRows.append(self.iconIndex.rowsWithColor(ColorTable.Parse(self.lineEditColorFilter.text().strip())))
+        except ValueError:
+            pass # No (complete) color yet, nothing to filter on
+        if self.checkboxChangedOnly.isChecked():
+            if self.mappingLayers.layers:
+                # Layers give icons mappings of their own, go by what every icon ended up with
+                allowedRows.append({row for row, svgFile in enumerate(self.outputListSvgFiles) if svgFile.colorMap})
+            else:
+                allowedRows.append(self.iconIndex.rowsChangedBy(self.getColorMapping()))
+        if self.checkboxDuplicatesOnly.isChecked():
+            allowedRows.append(self.iconIndex.rowsWithDuplicates())
+        for allowed in allowedRows:
+            rows = [row for row in rows if row in allowed]
+        if self.checkboxDuplicatesOnly.isChecked():
+            # Stable, so the order picked below applies within and across the groups
+            rows = sorted(rows, key=lambda row: self.iconIndex.duplicateGroups[row])
+
+        if self.checkboxLowContrastOnly.isChecked() or self.comboBoxIconOrder.currentData() == IconOrder.LOWEST_CONTRAST:
+            analyses = [svgFile.getContrastAnalysis() for svgFile in self.outputListSvgFiles]
+        if self.checkboxLowContrastOnly.isChecked():
+            rows = [row for row in rows if analyses[row] is not None and analyses[row].isFlagged()]
+        if self.comboBoxIconOrder.currentData() == IconOrder.LOWEST_CONTRAST:
+            # Icons that haven't been analysed (for the current colors) go last
+            rows = sorted(rows, key=lambda row: -analyses[row].bad if analyses[row] is not None else 1)
+        elif self.comboBoxIconOrder.currentData() == IconOrder.MOST_CHANGED:
+            # Unlike the heatmaps, which are only made for the icons that get
+            # painted, sorting needs the score of every icon. Those that aren't
+            # known yet are scored in the background and go last until then.
+            from VisualDiff import VisualDiff
+            # At the device pixel size the delegate renders (and caches) them at
+            size = SvgFile.DevicePixels(self.selectedSize(), self.flowList.viewport().devicePixelRatioF())
+            scores = [VisualDiff.CachedScore(svgFile, size) for svgFile in self.outputListSvgFiles]
+            unscored = [svgFile for svgFile, score in zip(self.outputListSvgFiles, scores) if score is None]
+            if unscored and self.changeScoreBatch is None:
+                self.scoreChanges(unscored, size)
+            rows = sorted(rows, key=lambda row: -scores[row] if scores[row] is not None else 1)
+
+        self.flowList.model().setRows(rows)
+
+    # Scores how much svgFiles changed in the RenderPool, for sorting by it
+    def scoreChanges(self, svgFiles: list, size: int):
+        # Imported here as they pull in NumPy, which isn't needed to start up
+        from VisualDiff import VisualDiff
+        from RenderPool import RenderBatch
+
+        mappingKeys = [svgFile.compiledColorMap.key for svgFile in svgFiles]
+        self.changeScoreBatch = RenderBatch(
+            VisualDiff.ScoreFile, [VisualDiff.Arguments(svgFile, size) for svgFile in svgFiles], self
+        )
+        self.changeScoreBatch.resultReady.connect(
+            lambda i, score: self.onChangeScoreReady(svgFiles[i], mappingKeys[i], size, score)
+        )
+        self.changeScoreBatch.finished.connect(
+            lambda failures: self.onChangeScoresFinished(svgFiles, mappingKeys, size)
+        )
+        self.statusBar().showMessage(f'Scoring how much {len(svgFiles)} icons changed...')
+        self.changeScoreBatch.start()
+
+    def onChangeScoreReady(self, svgFile: SvgFile, mappingKey: frozenset, size: int, score: float):
+        from VisualDiff import VisualDiff
+
+        VisualDiff.SetScore(svgFile, mappingKey, size, score)
+        if not self.resortTimer.isActive():
+            self.resortTimer.start()
+
+    def onChangeScoresFinished(self, svgFiles: list, mappingKeys: list, size: int):
+        from VisualDiff import VisualDiff
+
+        self.changeScoreBatch = None
+        # Icons that couldn't be scored sort as unchanged rather than being
+        # tried again and again. Icons whose mapping changed meanwhile are
+        # scored again by the next sort.
+        for svgFile, mappingKey in zip(svgFiles, mappingKeys):
+            if VisualDiff.CachedScore(svgFile, size) is None:
+                VisualDiff.SetScore(svgFile, mappingKey, size, 0.0)
+        self.statusBar().clearMessage()
+        self.resortTimer.stop()
+        if self.comboBoxIconOrder.currentData() == IconOrder.MOST_CHANGED:
+            self.updateIconRows()
+
+    def onPressedAnalyzeContrast(self):
+        # Imported here as they pull in NumPy, which isn't needed to start up
+        from ContrastAnalysis import ContrastAnalysis
+        from RenderPool import RenderBatch
+
+        background = self.outputBackgroundColorComboBox.currentText()
+        svgFiles = list(self.outputListSvgFiles)
+        mappingKeys = [svgFile.compiledColorMap.key for svgFile in svgFiles]
+        self.contrastBatch = RenderBatch(
+            ContrastAnalysis.Analyze,
+            [(svgFile.getColorMappedContent(), background) for svgFile in svgFiles],
+            self
+        )
+        self.contrastBatch.resultReady.connect(
+            lambda i, analysis: self.onContrastAnalysisReady(svgFiles[i], mappingKeys[i], background, analysis)
+        )
+        self.contrastBatch.finished.connect(lambda failures: self.onContrastAnalysisFinished(svgFiles, failures))
+
+        self.buttonAnalyzeContrast.setEnabled(False)
+        self.statusBar().showMessage(f'Analyzing the contrast of {len(svgFiles)} icons...')
+        self.contrastBatch.start()
+
+    def onContrastAnalysisReady(self, svgFile: SvgFile, mappingKey: frozenset, background: str, analysis):
+        # The background changed while the analysis was running, it no longer applies
+        if background != self.outputBackgroundColorComboBox.currentText():
+            return
+
+        analysis.mappingKey = mappingKey
+        analysis.background = background
+        svgFile.contrastAnalysis = analysis
+
+    def onContrastAnalysisFinished(self, svgFiles: list, failures: int):
+        self.contrastBatch = None
+        self.buttonAnalyzeContrast.setEnabled(True)
+
+        flagged = sum(
+            1 for svgFile in svgFiles
+            if svgFile.getContrastAnalysis() is not None and svgFile.getContrastAnalysis().isFlagged()
+        )
+        message = f'{flagged} of {len(svgFiles)} icons are mostly low contrast'
+        if failures > 0:
+            message += f', {failures} could not be analyzed'
+        self.statusBar().showMessage(message)
+
+        self.updateIconRows()
+        self.flowList.viewport().update()
+
+    @QtCore.Slot(bool)
+    def onToggleShowDifferences(self, checked: bool):
+        self.flowList.setShowDifferences(checked)
+
     @QtCore.Slot(int)
     def onDisabledStyleChange(self, state: int):
         styleIt = self.checkboxDisabledStyling.checkState() == QtCore.Qt.CheckState.Checked
         SETTINGS.setValue(SettingsVar.STYLE_AS_DISABLED, styleIt)
-        self.flowListInput.setDisabledStyling(styleIt)
-        self.flowListOutput.setDisabledStyling(styleIt)
+        self.flowList.setDisabledStyling(styleIt)
 
     def selectedSize(self) -> int:
         return int(self.comboBoxSizes.currentText())
@@ -247,61 +660,239 @@ class MainWindow(QMainWindow):
     @QtCore.Slot(int)
     def onChangeIconSIze(self, index: int):
         size = self.selectedSize()
-        self.flowListInput.setIconSize(size)
-        self.flowListOutput.setIconSize(size)
-        self.flowListInput.repaint()
+        self.flowList.setIconSize(size)
         SETTINGS.setValue(SettingsVar.PREVIEW_ICON_SIZE, size)
 
 
-    def createAndSaveIcons(self):
-        model = self.flowListOutput.model()
+    def onPressedSave(self):
+        # All of them, not just the ones that pass the filter of the output pane
+        if not self.checkboxValidateRenders.isChecked():
+            self.createAndSaveIcons(self.outputListSvgFiles)
+            return
+
+        # Imported here as they pull in NumPy, which isn't needed to start up
+        from RenderValidation import RenderValidation
+        from RenderPool import RenderBatch
+
+        svgFiles = list(self.outputListSvgFiles)
+        minifier = self.createMinifier()
+        problems = {}
+        self.validationBatch = RenderBatch(
+            RenderValidation.CheckFile,
+            [RenderValidation.Arguments(svgFile, minifier) for svgFile in svgFiles],
+            self
+        )
+        self.validationBatch.resultReady.connect(
+            lambda i, problem: self.onValidationResult(problems, svgFiles[i], problem)
+        )
+        self.validationBatch.finished.connect(
+            lambda failures: self.onValidationFinished(svgFiles, problems, failures)
+        )
+
+        self.buttonSave.setEnabled(False)
+        self.statusBar().showMessage(f'Checking the renders of {len(svgFiles)} icons...')
+        self.validationBatch.start()
+
+    def onValidationResult(self, problems: dict, svgFile: SvgFile, problem: str):
+        if problem is not None:
+            problems[svgFile] = problem
+
+    # Saves right away if all renders checked out, asks what to do otherwise
+    def onValidationFinished(self, svgFiles: list, problems: dict, failures: int):
+        from RenderValidation import RenderValidation
+
+        self.validationBatch = None
+        self.buttonSave.setEnabled(True)
+        if not problems and failures == 0:
+            self.createAndSaveIcons(svgFiles)
+            return
+
+        messageBox = QtWidgets.QMessageBox(self)
+        messageBox.setIcon(QtWidgets.QMessageBox.Warning)
+        messageBox.setWindowTitle('Check renders')
+        text = f'{len(problems)} of {len(svgFiles)} icons might not render correctly.'
+        if failures > 0:
+            text += f' {failures} icons could not be checked.'
+        messageBox.setText(text)
+        messageBox.setDetailedText('\n'.join(
+            f'{svgFile.filePath}: {RenderValidation.DESCRIPTIONS[problem]}' for svgFile, problem in problems.items()
+        ))
+        buttonSaveAll = messageBox.addButton('Save all', QtWidgets.QMessageBox.AcceptRole)
+        buttonSaveOthers = messageBox.addButton('Save all others', QtWidgets.QMessageBox.AcceptRole)
+        messageBox.addButton(QtWidgets.QMessageBox.Cancel)
+        messageBox.exec()
+
+        if messageBox.clickedButton() == buttonSaveAll:
+            self.createAndSaveIcons(svgFiles)
+        elif messageBox.clickedButton() == buttonSaveOthers:
+            self.createAndSaveIcons([svgFile for svgFile in svgFiles if svgFile not in problems])
+        else:
+            self.statusBar().showMessage('❌ Saving cancelled, no files were created')
+
+    # The minifier to save with, None when not minifying
+    def createMinifier(self) -> SvgMinifier:
+        if not self.checkboxMinify.isChecked():
+            return None
+
+        # 0 (shown as 'all decimals') leaves the path data as it is
+        return SvgMinifier(self.spinBoxPathPrecision.value() or None)
+
+    # ' (<size> saved by minifying)' for the status bar
+    @staticmethod
+    def DescribeBytesSaved(minifier: SvgMinifier) -> str:
+        if minifier is None:
+            return ''
+
+        return f' ({QtCore.QLocale().formattedDataSize(minifier.bytesSaved)} saved by minifying)'
+
+    def createAndSaveIcons(self, svgFiles: list):
+        mode = self.comboBoxColorMode.currentData()
+        if Archive.IsArchive(self.lineEditOutputFolder.text()):
+            if mode != ThemeVariables.HEX:
+                self.statusBar().showMessage('❌ CSS variables can only be saved to a folder, not to an archive')
+                return
+            self.saveIconsToArchive(svgFiles)
+            return
+
+        if mode != ThemeVariables.HEX:
+            self.saveIconsWithVariables(svgFiles, mode)
+            return
+
+        minifier = self.createMinifier()
         fileWrittenCount = 0
-        for row in range(model.rowCount()):
-            index = model.index(row, 0)
-            svgFile: SvgFile = model.data(index, QtCore.Qt.DecorationRole)
-            newFilePath = svgFile.filePath.replace(
+        def onSaved(done: int):
+            nonlocal fileWrittenCount
+            fileWrittenCount = done
+
+        # Identical icons with the same mapping are only mapped and written once
+        try:
+            SvgFile.SaveToFolder(
+                svgFiles,
                 self.lineEditInputFolder.text(),
-                self.lineEditOutputFolder.text()
+                self.lineEditOutputFolder.text(),
+                onSaved,
+                minifier
             )
-            
-            # Create directories if they don't exist
-            QtCore.QDir().mkpath(QtCore.QFileInfo(newFilePath).path())
-
-            # Create the file
-            file = QtCore.QFile(newFilePath)
-            if file.open(QtCore.QIODevice.WriteOnly | QtCore.QIODevice.Text):
-                if file.write(svgFile.getColorMappedContent().encode('utf-8')) != -1:
-                    fileWrittenCount += 1
-                file.close()
+        except (OSError, ValueError) as error:
+            self.statusBar().showMessage(f'❌ Saved {fileWrittenCount} .svg\'s, then failed: {error}')
+            return
 
         if fileWrittenCount > 0:
             self.statusBar().showMessage(
-                "✅ Created {} .svg's in {}".format(
+                "✅ Created {} .svg's in {}{}".format(
                     fileWrittenCount,
-                    self.lineEditOutputFolder.text()
+                    self.lineEditOutputFolder.text(),
+                    MainWindow.DescribeBytesSaved(minifier)
                 )
             )
         else:
             self.statusBar().showMessage('❌ No files were created')
-    
+
+    def saveIconsWithVariables(self, svgFiles: list, mode: str):
+        inputFolder = self.lineEditInputFolder.text()
+        outputFolder = self.lineEditOutputFolder.text()
+        try:
+            # The output files have the mapping of the layers covering them already set
+            written = ThemeVariables.Save(svgFiles, inputFolder, outputFolder, mode)
+        except (OSError, ValueError) as error:
+            self.statusBar().showMessage(f'❌ Could not save to {outputFolder}: {error}')
+            return
+
+        unchanged = len(svgFiles) - written
+        message = f"✅ Created {written} .svg's with CSS variables in {outputFolder}"
+        if unchanged > 0:
+            message += f' ({unchanged} already up to date)'
+        if mode == ThemeVariables.STYLESHEET:
+            message += f', colors in {ThemeVariables.STYLESHEETNAME}'
+        self.statusBar().showMessage(message)
+        self.checkVariableRenders(svgFiles, mode, inputFolder, outputFolder, message)
+
+    # Tells how many of the saved icons won't show their colors in Qt (and
+    # other SVG Tiny 1.2 renderers) once the rendering check is done
+    def checkVariableRenders(self, svgFiles: list, mode: str, inputFolder: str, outputFolder: str, message: str):
+        # Imported here as it pulls in NumPy, which isn't needed to start up
+        from RenderPool import RenderBatch
+
+        differing = []
+        stylesheetColorMap = ThemeVariables.StylesheetColorMap(svgFiles)
+        argumentsList = []
+        for svgFile in svgFiles:
+            headers = ThemeVariables.Headers(
+                svgFile, mode, svgFile.getOutputFilePath(inputFolder, outputFolder), outputFolder, stylesheetColorMap
+            )
+            argumentsList.append(ThemeVariables.Arguments(svgFile, headers))
+        self.variableRenderBatch = RenderBatch(ThemeVariables.CheckRender, argumentsList, self)
+        self.variableRenderBatch.resultReady.connect(
+            lambda i, same: None if same else differing.append(i)
+        )
+        self.variableRenderBatch.finished.connect(
+            lambda failures: self.onVariableRendersChecked(message, len(svgFiles), len(differing) + failures)
+        )
+        self.variableRenderBatch.start()
+
+    def onVariableRendersChecked(self, message: str, total: int, differing: int):
+        self.variableRenderBatch = None
+        if differing > 0:
+            message += (
+                f'. ⚠ {differing} of {total} icons look different here: SVG Tiny 1.2 (Qt) has no CSS variables, '
+                'they need a renderer that does (browsers for one)'
+            )
+        self.statusBar().showMessage(message)
+
+    def saveIconsToArchive(self, svgFiles: list):
+        inputFolder = self.lineEditInputFolder.text()
+        archivePath = self.lineEditOutputFolder.text()
+        minifier = self.createMinifier()
+        try:
+            with ArchiveWriter(archivePath) as archive:
+                for svgFile in svgFiles:
+                    archive.add(svgFile.getRelativePath(inputFolder), svgFile, minifier)
+        except (OSError, ValueError) as error:
+            self.statusBar().showMessage(f'❌ Could not write {archivePath}: {error}')
+            return
+
+        self.statusBar().showMessage(
+            "✅ Saved {} .svg's to {}{}".format(len(svgFiles), archivePath, MainWindow.DescribeBytesSaved(minifier))
+        )
+
+    def onPressedDryRun(self):
+        # The output files have the mapping of the layers covering them already set
+        mode = self.comboBoxColorMode.currentData()
+        try:
+            report = ChangeReport.Build(
+                self.outputListSvgFiles,
+                None,
+                self.lineEditInputFolder.text(),
+                self.lineEditOutputFolder.text(),
+                mode,
+                # Saving with CSS variables doesn't minify
+                self.createMinifier() if mode == ThemeVariables.HEX else None
+            )
+        except (OSError, ValueError) as error:
+            self.statusBar().showMessage(f'❌ Could not compare with {self.lineEditOutputFolder.text()}: {error}')
+            return
+        ChangeReportDialog(self, report).exec()
+
     #Populates self.inputListSvgFiles and self.outputListSvgFiles with the content
     #from the input folder. Also ensures the lists showing these are repainted.
     def populateListSvgFiles(self):
         colors = []
+        self.inputListSvgFiles.clear()
+        self.outputListSvgFiles.clear()
+        self.tree.clear()
         
-        #Filter down to just .svg's
-        dir = QtCore.QDir(SETTINGS.value(SettingsVar.INPUT_FOLDER))
-        dir.setNameFilters(['*.svg'])
-
-        #
-        it = QtCore.QDirIterator(dir)
-        while it.hasNext():
-            it.next()
-            inputSvgFile = SvgFile(it.filePath())
+        try:
+            inputSvgFiles = Archive.LoadSvgFiles(SETTINGS.value(SettingsVar.INPUT_FOLDER))
+        except (OSError, ValueError) as error:
+            QtWidgets.QMessageBox.critical(self, 'Input', str(error))
+            inputSvgFiles = []
+
+        for inputSvgFile in inputSvgFiles:
             self.inputListSvgFiles.append(inputSvgFile)
             colors += inputSvgFile.colors.keys()
 
-            self.outputListSvgFiles.append(SvgFile(it.filePath()))
+            # Shares what was read from the input, nothing gets read or parsed twice
+            self.outputListSvgFiles.append(inputSvgFile.sharedCopy(inputSvgFile.filePath))
 
         self.evaluateSaveButtonState()
 
@@ -310,8 +901,18 @@ class MainWindow(QMainWindow):
             self.inputBackgroundColorComboBox.currentText(),
             self.outputBackgroundColorComboBox.currentText()
         )
-        self.flowListInput.repaint()
-        self.flowListOutput.repaint()
+        # Gives the freshly added items the right contrasting text colors
+        self.tree.setInputHalfBackground(self.inputBackgroundColorComboBox.currentText())
+        self.tree.setOutputHalfBackground(self.outputBackgroundColorComboBox.currentText())
+        self.iconIndex = IconIndex(self.inputListSvgFiles)
+        self.flowList.model().sourceModel().refresh()
+        self.updateIconRows()
+
+        duplicateGroups = self.iconIndex.duplicateGroups
+        if duplicateGroups:
+            self.statusBar().showMessage('{} icons are identical to another icon, in {} groups'.format(
+                len(duplicateGroups), len(set(duplicateGroups.values()))
+            ))
 
     # Evaluates if everything is in order to save files
     # Everything checks out? Enable saveButton
@@ -342,6 +943,9 @@ class MainWindow(QMainWindow):
         
         # No write permissions on output folder? Disable
         fileInfo = QtCore.QFileInfo(SETTINGS.value(SettingsVar.OUTPUT_FOLDER))
+        if Archive.IsArchive(fileInfo.filePath()):
+            # The archive gets (re)created, it's the folder it's in that has to be writable
+            fileInfo = QtCore.QFileInfo(fileInfo.path())
         if not fileInfo.isWritable():
             message.setText('No write permissions on the output folder')
             icon.setPixmap(icon.style().standardPixmap(QtWidgets.QStyle.SP_MessageBoxCritical))
@@ -351,21 +955,7 @@ class MainWindow(QMainWindow):
         icon.setPixmap(icon.style().standardPixmap(QtWidgets.QStyle.SP_MessageBoxWarning))
         message.setText('This will overwrite any already existing files')
         self.buttonSave.setEnabled(evaluationPassed)
-
-    def syncScrollBars(self, value):
-        # If one is scrolled, programmatically scroll the other.
-        if self.sender() == self.flowListInput.verticalScrollBar():
-            self.flowListOutput.verticalScrollBar().setValue(value)
-        else:
-            self.flowListInput.verticalScrollBar().setValue(value)
-
-    @QtCore.Slot(QtCore.QItemSelection, QtCore.QItemSelection)
-    def syncSelections(self, selected, deselected):
-        sender = self.sender()
-        otherView = self.flowListInput if sender == self.flowListOutput.selectionModel() else self.flowListOutput
-        # Update the selection of the other view
-        otherView.selectionModel().select(selected, QtCore.QItemSelectionModel.Select)
-        otherView.selectionModel().select(deselected, QtCore.QItemSelectionModel.Deselect)
+        self.buttonDryRun.setEnabled(evaluationPassed)
 
     # Run addBottomGui before this. The bottom GUI contains the size selection
     # which is used for the icon sizes here
@@ -375,55 +965,56 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(scrollArea)
 
         mainCenterWidget = QtWidgets.QWidget()
-        mainCenterLayout = QtWidgets.QHBoxLayout(mainCenterWidget)
+        mainCenterLayout = QtWidgets.QVBoxLayout(mainCenterWidget)
         mainCenterLayout.setSpacing(0)
         mainCenterLayout.setContentsMargins(0, 0, 0, 0)
+        layoutPanels = QtWidgets.QHBoxLayout()
 
         # Create input panel
-        inputPanel, self.flowListInput, self.lineEditInputFolder, self.inputBackgroundColorComboBox, \
+        inputPanel, self.lineEditInputFolder, self.inputBackgroundColorComboBox, \
         self.buttonAddInputColor, self.buttonDeleteInputColor = \
         self.createPanel(
             'Input',
-            self.inputListSvgFiles,
             SettingsVar.INPUT_FOLDER,
             '/path/to/svg/filled/folder',
             self.onClickSetInputFolder,
+            self.onClickSetInputArchive,
             SettingsVar.CUSTOM_INPUT_COLORS,
             SettingsVar.INPUT_BACKGROUND_COLOR
         )
 
         # Create output panel
-        outputPanel, self.flowListOutput, self.lineEditOutputFolder, self.outputBackgroundColorComboBox, \
+        outputPanel, self.lineEditOutputFolder, self.outputBackgroundColorComboBox, \
         self.buttonAddOutputColor, self.buttonDeleteOutputColor = \
         self.createPanel(
             'Output',
-            self.outputListSvgFiles,
             SettingsVar.OUTPUT_FOLDER,
             '/path/for/new/icons',
             self.onClickSetOutputFolder,
+            self.onClickSetOutputArchive,
             SettingsVar.CUSTOM_OUTPUT_COLORS,
             SettingsVar.OUTPUT_BACKGROUND_COLOR
         )
 
         # Add panels to main layout
-        mainCenterLayout.addWidget(inputPanel)
-        mainCenterLayout.addWidget(outputPanel)
+        layoutPanels.addWidget(inputPanel)
+        layoutPanels.addWidget(outputPanel)
+        mainCenterLayout.addLayout(layoutPanels)
+
+        # A single list below both panels shows every input icon next to its output
+        self.flowList = FlowList(self.selectedSize())
+        self.flowList.openFailed.connect(lambda filePath: self.statusBar().showMessage(f'❌ Could not open {filePath}'))
+        model = IconProxyModel(self.flowList)
+        model.setSourceModel(IconModel(self.inputListSvgFiles, self.outputListSvgFiles, self.flowList))
+        self.flowList.setModel(model)
+        mainCenterLayout.addWidget(self.flowList, 1)
 
         scrollArea.setWidget(mainCenterWidget)
 
-    def createPanel(self, label, svgFiles, settingsVar, defaultPath, setFolderFunc, colors: SettingsVar, color: SettingsVar):
+    def createPanel(self, label, settingsVar, defaultPath, setFolderFunc, setArchiveFunc, colors: SettingsVar, color: SettingsVar):
         panel = QtWidgets.QWidget()
         layout = QtWidgets.QGridLayout(panel)
 
-        listView = FlowList(self.selectedSize())
-        model = IconModel(svgFiles)
-        listView.setModel(model)
-
-        # Make the scrollbars scroll at the same time.
-        listView.verticalScrollBar().valueChanged.connect(self.syncScrollBars)
-        # Select in one, select in the other
-        listView.selectionModel().selectionChanged.connect(self.syncSelections)
-
         lbl = QLabel(label)
         lbl.setStyleSheet('font-size: 28px;')
         layout.addWidget(lbl, 0, 0, 1, 3)
@@ -433,7 +1024,11 @@ class MainWindow(QMainWindow):
         lineEditFolder.setReadOnly(True)
         layout.addWidget(lineEditFolder, 1, 1, 1, 2)
         dirButton = QtWidgets.QPushButton()
-        dirButton.clicked.connect(setFolderFunc)
+        dirButton.setToolTip('A folder, or a .zip/.tar archive')
+        dirMenu = QtWidgets.QMenu(dirButton)
+        dirMenu.addAction('Folder...').triggered.connect(setFolderFunc)
+        dirMenu.addAction('Archive...').triggered.connect(setArchiveFunc)
+        dirButton.setMenu(dirMenu)
         dirButton.setIcon(dirButton.style().standardIcon(QtWidgets.QStyle.SP_DialogOpenButton))
         layout.addWidget(dirButton, 1, 3, 1, 1)
         layout.addWidget(QLabel('Background'), 2, 0, 1, 1)
@@ -448,10 +1043,9 @@ class MainWindow(QMainWindow):
         buttonDeleteColor.setIcon(QtGui.QIcon('Delete.svg'))
         layout.addWidget(buttonDeleteColor, 2, 3, 1, 1)
 
-        layout.addWidget(listView, 3, 0, 1, 4)
         layout.setColumnStretch(1, 1)
 
-        return panel, listView, lineEditFolder, backgroundColorComboBox, buttonAddColor, buttonDeleteColor
+        return panel, lineEditFolder, backgroundColorComboBox, buttonAddColor, buttonDeleteColor
 
     def onClickSetInputFolder(self):
         folder = QFileDialog.getExistingDirectory(self, 'Select input folder', SETTINGS.value(SettingsVar.INPUT_FOLDER, QtCore.QDir.homePath()))
@@ -460,9 +1054,27 @@ class MainWindow(QMainWindow):
                 self.triggerInputEqualsOutputErrorDialog()
                 self.onClickSetInputFolder()
             else:
-                SETTINGS.setValue(SettingsVar.INPUT_FOLDER, folder)
-                self.lineEditInputFolder.setText(folder)
-                self.evaluateSaveButtonState()
+                self.setInputSource(folder)
+
+    def onClickSetInputArchive(self):
+        filePath, _ = QFileDialog.getOpenFileName(
+            self, 'Select input archive', SETTINGS.value(SettingsVar.INPUT_FOLDER, QtCore.QDir.homePath()),
+            Archive.FILEFILTER
+        )
+        if filePath != '':
+            if filePath == SETTINGS.value(SettingsVar.OUTPUT_FOLDER):
+                self.triggerInputEqualsOutputErrorDialog()
+            else:
+                self.setInputSource(filePath)
+
+    # Input folder or archive
+    def setInputSource(self, path: str):
+        SETTINGS.setValue(SettingsVar.INPUT_FOLDER, path)
+        self.lineEditInputFolder.setText(path)
+        self.populateListSvgFiles()
+        self.editProfileSwaps()
+        self.applySwapsToTree(self.profiles.current())
+        self.replaceOutputColorsWithTreeColors()
 
     def onClickSetOutputFolder(self):
         folder = QFileDialog.getExistingDirectory(self, 'Select outpput folder', SETTINGS.value(SettingsVar.OUTPUT_FOLDER, QtCore.QDir.homePath()))
@@ -475,13 +1087,26 @@ class MainWindow(QMainWindow):
                 self.lineEditOutputFolder.setText(folder)
                 self.evaluateSaveButtonState()
 
+    def onClickSetOutputArchive(self):
+        filePath, _ = QFileDialog.getSaveFileName(
+            self, 'Select output archive', SETTINGS.value(SettingsVar.OUTPUT_FOLDER, QtCore.QDir.homePath()),
+            Archive.FILEFILTER
+        )
+        if filePath == '':
+            return
+        if not Archive.IsArchive(filePath):
+            filePath += '.zip'
+        if filePath == SETTINGS.value(SettingsVar.INPUT_FOLDER):
+            self.triggerInputEqualsOutputErrorDialog()
+            return
+
+        SETTINGS.setValue(SettingsVar.OUTPUT_FOLDER, filePath)
+        self.lineEditOutputFolder.setText(filePath)
+        self.evaluateSaveButtonState()
+
     def triggerInputEqualsOutputErrorDialog(self):
         QtWidgets.QMessageBox.critical(self, 'Input = Output', 'The output folder has to differ from the input folder')
 
-    def getSvgFilePaths(self) -> list:
-        folder = SETTINGS.value(SettingsVar.INPUT_FOLDER) + '/'
-        return glob.glob(folder + '*.svg')
-
     def addDockedColorWidget(self):
         self.treeDockWidget = QtWidgets.QDockWidget('Colors', self)
         self.treeDockWidget.setObjectName('ColorDock')
@@ -503,6 +1128,31 @@ class MainWindow(QMainWindow):
         checkUnfoldAll.setCheckable(True)
         checkUnfoldAll.toggled.connect(self.onToggleShowContrast)
         layoutTreeAndControls.addWidget(checkUnfoldAll)
+        layoutTreeAndControls.addWidget(self.createProfileControls())
+        layoutTreeAndControls.addWidget(self.createLayerControls())
+
+        buttonMapToPalette = QtWidgets.QPushButton('Map to palette')
+        buttonMapToPalette.setToolTip('Swaps every color for the closest color (CIEDE2000) in a palette')
+        paletteMenu = QtWidgets.QMenu(buttonMapToPalette)
+        paletteMenu.addAction('From palette file (.gpl, .ase, hex list)...').triggered.connect(
+            lambda: self.onTriggeredMapToPalette(True))
+        paletteMenu.addAction('From hex colors...').triggered.connect(
+            lambda: self.onTriggeredMapToPalette(False))
+        buttonMapToPalette.setMenu(paletteMenu)
+
+        buttonConsolidate = QtWidgets.QPushButton('Consolidate')
+        buttonConsolidate.setToolTip('Merges nearly identical colors by clustering all colors in the folder')
+        buttonConsolidate.clicked.connect(self.onPressedConsolidate)
+
+        buttonAdjustTones = QtWidgets.QPushButton('Adjust tones')
+        buttonAdjustTones.setToolTip('Shifts the hue, saturation or lightness of all colors at once')
+        buttonAdjustTones.clicked.connect(self.onPressedAdjustTones)
+
+        layoutPalette = QtWidgets.QHBoxLayout()
+        layoutPalette.addWidget(buttonMapToPalette)
+        layoutPalette.addWidget(buttonConsolidate)
+        layoutPalette.addWidget(buttonAdjustTones)
+        layoutTreeAndControls.addLayout(layoutPalette)
 
         showContrast = SETTINGS.value(SettingsVar.SHOW_CONTRAST, False, bool)
         self.tree = ColorTreeWidget(self.treeDockWidget, showContrast)
@@ -520,21 +1170,327 @@ class MainWindow(QMainWindow):
         self.treeDockWidget.setAllowedAreas(QtCore.Qt.DockWidgetArea.RightDockWidgetArea | QtCore.Qt.DockWidgetArea.LeftDockWidgetArea)
         self.setCorner(QtCore.Qt.Corner.BottomRightCorner, QtCore.Qt.DockWidgetArea.RightDockWidgetArea)
 
+    def createProfileControls(self) -> QWidget:
+        profileWidget = QWidget()
+        layoutProfile = QtWidgets.QHBoxLayout(profileWidget)
+        layoutProfile.setContentsMargins(0, 0, 0, 0)
+
+        layoutProfile.addWidget(QLabel('Profile'))
+        self.comboBoxProfiles = QComboBox()
+        self.comboBoxProfiles.setToolTip('Each profile holds its own set of color swaps')
+        layoutProfile.addWidget(self.comboBoxProfiles, 1)
+
+        buttonNewProfile = QtWidgets.QPushButton()
+        buttonNewProfile.setToolTip('New (empty) profile')
+        buttonNewProfile.setIcon(QtGui.QIcon('Add.svg'))
+        buttonNewProfile.clicked.connect(lambda: self.onPressedNewProfile(False))
+        layoutProfile.addWidget(buttonNewProfile)
+
+        buttonDuplicateProfile = QtWidgets.QPushButton()
+        buttonDuplicateProfile.setToolTip('Duplicate the current profile')
+        buttonDuplicateProfile.setIcon(buttonDuplicateProfile.style().standardIcon(
+            QtWidgets.QStyle.SP_FileDialogNewFolder))
+        buttonDuplicateProfile.clicked.connect(lambda: self.onPressedNewProfile(True))
+        layoutProfile.addWidget(buttonDuplicateProfile)
+
+        self.buttonDeleteProfile = QtWidgets.QPushButton()
+        self.buttonDeleteProfile.setToolTip('Delete the current profile')
+        self.buttonDeleteProfile.setIcon(QtGui.QIcon('Delete.svg'))
+        self.buttonDeleteProfile.clicked.connect(self.onPressedDeleteProfile)
+        layoutProfile.addWidget(self.buttonDeleteProfile)
+
+        self.rePopulateProfiles()
+        self.comboBoxProfiles.currentTextChanged.connect(self.onChangeProfile)
+
+        return profileWidget
+
+    def rePopulateProfiles(self):
+        self.comboBoxProfiles.blockSignals(True)
+        self.comboBoxProfiles.clear()
+        self.comboBoxProfiles.addItems(self.profiles.names())
+        self.comboBoxProfiles.setCurrentText(self.profiles.currentName)
+        self.comboBoxProfiles.blockSignals(False)
+        self.buttonDeleteProfile.setEnabled(len(self.profiles.names()) > 1)
+
+    def onPressedNewProfile(self, duplicate: bool):
+        title = 'Duplicate profile' if duplicate else 'New profile'
+        name, accepted = QtWidgets.QInputDialog.getText(self, title, 'Profile name')
+        name = name.strip()
+        if not accepted or name == '':
+            return
+
+        created = self.profiles.duplicate(name) if duplicate else self.profiles.create(name)
+        if not created:
+            QtWidgets.QMessageBox.critical(self, title, f'A profile named "{name}" already exists')
+            return
+
+        self.rePopulateProfiles()
+        self.onChangeProfile(name)
+
+    def onPressedDeleteProfile(self):
+        if self.profiles.removeCurrent():
+            self.rePopulateProfiles()
+            self.onChangeProfile(self.profiles.currentName)
+
+    @QtCore.Slot(str)
+    def onChangeProfile(self, name: str):
+        self.profiles.setCurrent(name)
+        self.editProfileSwaps()
+        self.applySwapsToTree(self.profiles.current())
+        self.replaceOutputColorsWithTreeColors()
+        self.flowList.viewport().update()
+        self.tree.fakeUpdate()
+
+    def createLayerControls(self) -> QWidget:
+        layerWidget = QWidget()
+        layoutLayer = QtWidgets.QHBoxLayout(layerWidget)
+        layoutLayer.setContentsMargins(0, 0, 0, 0)
+
+        layoutLayer.addWidget(QLabel('Layer'))
+        self.comboBoxLayers = QComboBox()
+        self.comboBoxLayers.setToolTip(
+            'The swaps of a layer only apply to the icons it covers, on top of those of the profile'
+        )
+        layoutLayer.addWidget(self.comboBoxLayers, 1)
+
+        buttonNewLayer = QtWidgets.QPushButton()
+        buttonNewLayer.setToolTip('New layer')
+        buttonNewLayer.setIcon(QtGui.QIcon('Add.svg'))
+        layerMenu = QtWidgets.QMenu(buttonNewLayer)
+        layerMenu.addAction('For the selected icons...').triggered.connect(lambda: self.onTriggeredNewLayer(True))
+        layerMenu.addAction('For icons matching a name...').triggered.connect(lambda: self.onTriggeredNewLayer(False))
+        buttonNewLayer.setMenu(layerMenu)
+        layoutLayer.addWidget(buttonNewLayer)
+
+        self.buttonDeleteLayer = QtWidgets.QPushButton()
+        self.buttonDeleteLayer.setToolTip('Delete the current layer')
+        self.buttonDeleteLayer.setIcon(QtGui.QIcon('Delete.svg'))
+        self.buttonDeleteLayer.clicked.connect(self.onPressedDeleteLayer)
+        layoutLayer.addWidget(self.buttonDeleteLayer)
+
+        self.rePopulateLayers()
+        self.comboBoxLayers.currentIndexChanged.connect(self.onChangeEditedLayer)
+
+        return layerWidget
+
+    def rePopulateLayers(self):
+        self.comboBoxLayers.blockSignals(True)
+        self.comboBoxLayers.clear()
+        self.comboBoxLayers.addItem('All icons (profile)')
+        self.comboBoxLayers.addItems(self.mappingLayers.names())
+        if self.editedLayer is not None:
+            self.comboBoxLayers.setCurrentIndex(self.mappingLayers.layers.index(self.editedLayer) + 1)
+        self.comboBoxLayers.blockSignals(False)
+        self.buttonDeleteLayer.setEnabled(self.editedLayer is not None)
+
+    # The swaps the color tree shows and edits
+    def editedSwaps(self) -> dict:
+        return self.profiles.current() if self.editedLayer is None else self.editedLayer.swaps
+
+    # Like PaletteProfiles.setSwaps, but for the profile or layer being edited
+    def setEditedSwaps(self, swaps: dict):
+        if self.editedLayer is None:
+            self.profiles.setSwaps(swaps)
+        else:
+            self.editedLayer.setSwaps(ColorTable.MergeSwaps(self.editedLayer.swaps, swaps))
+            self.mappingLayers.save()
+
+    # Switches the color tree back to the swaps of the profile
+    def editProfileSwaps(self):
+        self.comboBoxLayers.setCurrentIndex(0)
+
+    @QtCore.Slot(int)
+    def onChangeEditedLayer(self, index: int):
+        # Whatever was previewed of the layer edited so far is dropped
+        previewLayer = self.mappingLayers.previewLayer
+        if previewLayer is not None:
+            self.mappingLayers.clearPreview()
+            self.mappingLayers.apply(
+                self.outputListSvgFiles, self.iconIndex, ColorTable.ParseSwaps(self.profiles.current()),
+                self.mappingLayers.coveredRows(previewLayer, self.iconIndex)
+            )
+
+        self.editedLayer = None if index <= 0 else self.mappingLayers.layers[index - 1]
+        self.buttonDeleteLayer.setEnabled(self.editedLayer is not None)
+        self.applySwapsToTree(self.editedSwaps())
+        self.flowList.viewport().update()
+        self.tree.fakeUpdate()
+
+    def onTriggeredNewLayer(self, fromSelection: bool):
+        filePaths = set()
+        pattern = ''
+        if fromSelection:
+            filePaths = {
+                index.data(QtCore.Qt.DecorationRole).filePath for index in self.flowList.selectionModel().selectedIndexes()
+            }
+            if not filePaths:
+                QtWidgets.QMessageBox.warning(self, 'New layer', 'Select the icons the layer is for first')
+                return
+        else:
+            pattern, accepted = QtWidgets.QInputDialog.getText(
+                self, 'New layer', 'Icons with a name containing (or matching a pattern like arrow-*.svg)'
+            )
+            pattern = pattern.strip()
+            if not accepted or pattern == '':
+                return
+
+        name, accepted = QtWidgets.QInputDialog.getText(self, 'New layer', 'Layer name')
+        name = name.strip()
+        if not accepted or name == '':
+            return
+
+        layer = MappingLayer(name, pattern, filePaths)
+        if not self.mappingLayers.add(layer):
+            QtWidgets.QMessageBox.critical(self, 'New layer', f'A layer named "{name}" already exists')
+            return
+
+        self.editedLayer = layer
+        self.rePopulateLayers()
+        self.onChangeEditedLayer(self.comboBoxLayers.currentIndex())
+        covered = len(self.mappingLayers.coveredRows(layer, self.iconIndex))
+        self.statusBar().showMessage(f'Layer "{name}" covers {covered} icons')
+
+    def onPressedDeleteLayer(self):
+        if self.editedLayer is None:
+            return
+
+        self.mappingLayers.remove(self.editedLayer)
+        self.editedLayer = None
+        self.rePopulateLayers()
+        self.applySwapsToTree(self.profiles.current())
+        self.replaceOutputColorsWithTreeColors()
+        self.flowList.viewport().update()
+        self.tree.fakeUpdate()
+
+    def onTriggeredMapToPalette(self, fromFile: bool):
+        # Imported here as it pulls in NumPy, which isn't needed to start up
+        from Palette import Palette
+
+        if fromFile:
+            filePath, _ = QFileDialog.getOpenFileName(
+                self, 'Open palette', QtCore.QDir.homePath(),
+                'Palettes (*.gpl *.ase *.txt *.hex *.css);;All files (*)'
+            )
+            if filePath == '':
+                return
+            try:
+                palette = Palette.Load(filePath)
+            except (OSError, ValueError, struct.error) as error:
+                QtWidgets.QMessageBox.critical(self, 'Open palette', str(error))
+                return
+        else:
+            text, accepted = QtWidgets.QInputDialog.getMultiLineText(
+                self, 'Map to palette', 'Hex colors (one per line, or comma separated)'
+            )
+            if not accepted:
+                return
+            palette = Palette.ParseHexList(text)
+
+        if not palette:
+            QtWidgets.QMessageBox.warning(self, 'Map to palette', 'No colors found in the palette')
+            return
+
+        colors = [self.tree.topLevelItem(i).text(ColIndex.OLDHEX.value) for i in range(self.tree.topLevelItemCount())]
+        colorSwaps = Palette.NearestColors(colors, palette)
+        self.setEditedSwaps(colorSwaps)
+        self.applySwapsToTree(self.editedSwaps())
+        self.replaceOutputColorsWithTreeColors()
+        self.flowList.viewport().update()
+        self.tree.fakeUpdate()
+        self.statusBar().showMessage(f'Mapped {len(colorSwaps)} colors to a palette of {len(palette)} colors')
+
+    def onPressedConsolidate(self):
+        # Imported here as it pulls in NumPy, which isn't needed to start up
+        from ConsolidateDialog import ConsolidateDialog
+
+        colorCounts = {}
+        for svgFile in self.inputListSvgFiles:
+            for color, count in svgFile.colors.items():
+                hex = ColorTable.ToHex(color)
+                colorCounts[hex] = colorCounts.get(hex, 0) + count
+
+        dialog = ConsolidateDialog(self, colorCounts)
+        if dialog.exec() == QtWidgets.QDialog.Accepted and dialog.colorSwaps:
+            # Merged colors follow along with any swap their group's color already has
+            currentSwaps = self.editedSwaps()
+            self.setEditedSwaps({
+                color: currentSwaps.get(newColor, newColor) for color, newColor in dialog.colorSwaps.items()
+            })
+            self.applySwapsToTree(self.editedSwaps())
+            self.replaceOutputColorsWithTreeColors()
+            self.flowList.viewport().update()
+            self.tree.fakeUpdate()
+            self.statusBar().showMessage(f'Merged {len(dialog.colorSwaps)} colors')
+
+    def onPressedAdjustTones(self):
+        # Imported here as it pulls in NumPy, which isn't needed to start up
+        from ToneDialog import ToneDialog
+
+        # Starts from the swaps of the profile (or layer) being edited alone,
+        # accepting mustn't copy the swaps of other layers into it
+        editedColorMap = ColorTable.ParseSwaps(self.editedSwaps())
+        colors = {}
+        for i in range(self.tree.topLevelItemCount()):
+            color = self.tree.topLevelItem(i).color
+            colors[color] = editedColorMap.get(color, color)
+
+        dialog = ToneDialog(self, colors)
+        dialog.swapsChanged.connect(self.onPreviewToneSwaps)
+        # The output icons catch up in the background while the sliders move
+        self.flowList.setProgressiveRendering(True)
+        accepted = dialog.exec() == QtWidgets.QDialog.Accepted
+        self.flowList.setProgressiveRendering(False)
+
+        if accepted:
+            # Colors the transform brings back to themselves lose their swap
+            self.setEditedSwaps({
+                ColorTable.ToHex(color): None if color == newColor else ColorTable.ToHex(newColor)
+                for color, newColor in dialog.colorMap.items()
+                if color in editedColorMap or color != newColor
+            })
+            self.statusBar().showMessage(f'Adjusted the tones of {len(dialog.colorSwaps)} colors')
+        self.applySwapsToTree(self.editedSwaps())
+        self.replaceOutputColorsWithTreeColors()
+        self.flowList.viewport().update()
+        self.tree.fakeUpdate()
+
+    def onPreviewToneSwaps(self, colorSwaps: dict):
+        self.applySwapsToTree(colorSwaps)
+        self.replaceOutputColorsWithTreeColors()
+        self.flowList.viewport().update()
+        self.tree.fakeUpdate()
+
+    # Sets the 'new' side of the color tree to the given {oldHex: newHex} swaps,
+    # colors without a swap go back to 'Change'
+    def applySwapsToTree(self, colorSwaps: dict):
+        colorMap = ColorTable.ParseSwaps(colorSwaps)
+        for i in range(self.tree.topLevelItemCount()):
+            colorTreeItem: ColorTreeItem = self.tree.topLevelItem(i)
+            colorToSet = 'Change'
+            if colorTreeItem.color in colorMap:
+                colorToSet = ColorTable.ToHex(colorMap[colorTreeItem.color])
+            if colorTreeItem.text(ColIndex.NEWHEX.value) != colorToSet:
+                colorTreeItem.setText(ColIndex.NEWHEX.value, colorToSet)
+                colorTreeItem.updateNewColumns()
+
     def onChangeInputBackground(self):
         hex = self.inputBackgroundColorComboBox.currentText()
         SETTINGS.setValue(SettingsVar.INPUT_BACKGROUND_COLOR, hex)
         self.buttonDeleteInputColor.setEnabled(hex not in ColorComboBox.DefaultColors)
         self.tree.setInputHalfBackground(hex)
-        self.flowListInput.setStyleSheet(f'background-color: {hex};')
-        self.flowListInput.setFontColorToContrastWith(QColor(hex))
+        self.flowList.setInputBackground(QColor(hex))
 
     def onChangeOutputBackground(self):
         hex = self.outputBackgroundColorComboBox.currentText()
         SETTINGS.setValue(SettingsVar.OUTPUT_BACKGROUND_COLOR,hex)
         self.buttonDeleteOutputColor.setEnabled(hex not in ColorComboBox.DefaultColors)
         self.tree.setOutputHalfBackground(hex)
-        self.flowListOutput.setStyleSheet(f'background-color: {hex};')
-        self.flowListOutput.setFontColorToContrastWith(QColor(hex))
+        self.flowList.setOutputBackground(QColor(hex))
+
+        # Contrast analyses were made against the previous background
+        for svgFile in self.outputListSvgFiles:
+            svgFile.contrastAnalysis = None
+        self.updateIconRows()
 
     @QtCore.Slot(bool)
     def onToggleShowContrast(self, checked):
@@ -548,15 +1504,17 @@ class MainWindow(QMainWindow):
 
     @QtCore.Slot(QtWidgets.QTreeWidgetItem, QtWidgets.QTreeWidgetItem)
     def onItemChangeColorTreeSelectMatchingIcons(self, itCur: QtWidgets.QTreeWidgetItem, itPrev: QtWidgets.QTreeWidgetItem):
-        hexToSearchFor = itCur.text(ColIndex.OLDHEX.value)
+        if not isinstance(itCur, ColorTreeItem):
+            return
+        colorToSearchFor = itCur.color
 
-        model = self.flowListInput.model()
-        self.flowListInput.selectionModel().clear()
+        model = self.flowList.model()
+        self.flowList.selectionModel().clear()
         for row in range(model.rowCount()):
             index = model.index(row, 0)
             svgFile: SvgFile = model.data(index, QtCore.Qt.DecorationRole)
-            if hexToSearchFor in svgFile.colors:
-                self.flowListInput.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
+            if colorToSearchFor in svgFile.colors:
+                self.flowList.selectionModel().select(index, QtCore.QItemSelectionModel.Select)
     
     @QtCore.Slot(QtWidgets.QTreeWidgetItem, int)
     def onPressedTreeColor(self, it: ColorTreeItem, col):
@@ -573,6 +1531,7 @@ class MainWindow(QMainWindow):
                 restoreOldNew = True
             
             colorDialog = QtWidgets.QColorDialog(startColor)
+            colorDialog.setOption(QtWidgets.QColorDialog.ShowAlphaChannel)
             colorDialog.currentColorChanged.connect(self.onChangeColorTreeColor)
 
             result = colorDialog.exec()
@@ -586,38 +1545,81 @@ class MainWindow(QMainWindow):
                 it.updateNewColumns()
                 self.replaceOutputColorsWithTreeColors()
             else:
-                # Save to settings
-                colorSwaps = SETTINGS.value(SettingsVar.COLOR_SWAPS, {})
-                colorSwaps[it.text(ColIndex.OLDHEX.value)] = it.text(ColIndex.NEWHEX.value)
-                SETTINGS.setValue(SettingsVar.COLOR_SWAPS, colorSwaps)
+                # Save to the active profile (or layer)
+                self.setEditedSwaps({ColorTable.ToHex(it.color): it.text(ColIndex.NEWHEX.value)})
 
-    # Takes the old/new colors from the ColorTree and applies them to the output preview
-    def replaceOutputColorsWithTreeColors(self):
-        # Create the color mapping based on the color tree
+    # Creates the color mapping based on the color tree
+    def getColorMapping(self) -> dict:
         colorMapping = {}
         for i in range(0, self.tree.topLevelItemCount()):
             colorTreeItem: ColorTreeItem = self.tree.topLevelItem(i)
             colorMapping |= colorTreeItem.getColorMapping()
 
-        # Apply the color mapping on the preview SvgFiles/list
-        outputModel = self.flowListOutput.model()
-        for i in range(outputModel.rowCount()):
-            index = outputModel.index(i, 0)
-            svgFile: SvgFile = outputModel.data(index, QtCore.Qt.DecorationRole)
-            svgFile.setColorMap(colorMapping)
-            outputModel.setData(index, svgFile, QtCore.Qt.DecorationRole)
+        return colorMapping
+
+    # Takes the old/new colors from the ColorTree and applies them to the output preview
+    def replaceOutputColorsWithTreeColors(self):
+        colorMapping = self.getColorMapping()
+        rows = None
+        if self.editedLayer is None:
+            globalColorMap = colorMapping
+        else:
+            # The tree shows the swaps of the layer being edited, those only
+            # change the icons the layer covers. They're previewed, the layer
+            # itself only changes through setEditedSwaps. Swaps of colors that
+            # aren't in the tree (not in the current folder) are kept, so are
+            # the ones that aren't a valid color (from a hand-edited profile).
+            treeColors = {self.tree.topLevelItem(i).color for i in range(self.tree.topLevelItemCount())}
+            swaps = {}
+            for oldHex, newHex in self.editedLayer.swaps.items():
+                try:
+                    if ColorTable.Parse(oldHex) in treeColors:
+                        continue
+                except (ValueError, AttributeError):
+                    pass
+                swaps[oldHex] = newHex
+            self.mappingLayers.setPreview(self.editedLayer, swaps | {
+                ColorTable.ToHex(color): ColorTable.ToHex(newColor) for color, newColor in colorMapping.items()
+            })
+            globalColorMap = ColorTable.ParseSwaps(self.profiles.current())
+            rows = self.mappingLayers.coveredRows(self.editedLayer, self.iconIndex)
+
+        # Apply the color mapping on the preview SvgFiles, including the ones
+        # filtered out of the output pane
+        self.mappingLayers.apply(self.outputListSvgFiles, self.iconIndex, globalColorMap, rows)
+
+        if self.checkboxChangedOnly.isChecked():
+            self.updateIconRows()
 
     @QtCore.Slot(QColor)
     def onChangeColorTreeColor(self, color: QColor):
-        self.tree.currentItem().setText(ColIndex.NEWHEX.value, color.name())
+        # rgba() is 0xAARRGGBB like the ColorTable colors, name() would drop the alpha
+        self.tree.currentItem().setText(ColIndex.NEWHEX.value, ColorTable.ToHex(color.rgba()))
         self.tree.currentItem().updateNewColumns()
         self.replaceOutputColorsWithTreeColors()
-        self.flowListOutput.repaint()
+        self.flowList.repaint()
         self.tree.fakeUpdate()
 
-app = QApplication(sys.argv)
-app.setWindowIcon(QtGui.QIcon('AppIcon.svg'))
-window = MainWindow(APPNAME)
-window.show()
+def main():
+    app = QApplication(sys.argv)
+    app.setWindowIcon(QtGui.QIcon('AppIcon.svg'))
+
+    arguments = app.arguments()[1:]
+    startupTimer = None
+    if '--timing' in arguments or '--timing-quit' in arguments:
+        startupTimer = StartupTimer(STARTTIME, '--timing-quit' in arguments)
+
+    # A project file can be passed along to start with its settings
+    projectFiles = [argument for argument in arguments if not argument.startswith('--')]
+    if projectFiles:
+        ProjectFile.ApplyTo(SETTINGS, ProjectFile.Load(projectFiles[0]))
+
+    window = MainWindow(APPNAME, startupTimer)
+    window.show()
+    # Settings are written in batches, make sure the last batch doesn't get lost
+    app.aboutToQuit.connect(SETTINGS.flush)
+
+    return app.exec()
 
-app.exec()
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,22 @@
+import os
+import sys
+
+# The modules live in the root of the repository, the tests don't need a screen
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QApplication
+from Settings import SETTINGS
+import pytest
+
+# Tests with widgets need a QApplication, a QGuiApplication made first would rule it out
+application = QApplication.instance() or QApplication([])
+
+
+# Keeps the tests away from the settings of the user running them
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, 'settings', QSettings(str(tmp_path / 'settings.ini'), QSettings.IniFormat))
+    monkeypatch.setattr(SETTINGS, 'pending', {})
+    return SETTINGS
@@ -0,0 +1,62 @@
+import io
+import tarfile
+import zipfile
+import pytest
+from Archive import Archive, ArchiveWriter
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#4d4d4d;"/></svg>'
+NAMES = ['actions/add.svg', './actions/../../evil.svg', '/tmp/evil.svg', 'C:/evil.svg', 'a/./b.svg']
+
+
+def writeZip(path, names):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name in names:
+            archive.writestr(name, ICON)
+
+
+def writeTar(path, names):
+    with tarfile.open(path, 'w') as archive:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = len(ICON)
+            archive.addfile(info, io.BytesIO(ICON))
+
+
+@pytest.mark.parametrize('extension, write', [('.zip', writeZip), ('.tar', writeTar)])
+def test_members_outside_the_archive_are_left_out(tmp_path, extension, write):
+    archivePath = str(tmp_path / ('icons' + extension))
+    write(archivePath, NAMES)
+    svgFiles = Archive.LoadSvgFiles(archivePath)
+    assert [svgFile.filePath for svgFile in svgFiles] == [
+        archivePath + '/actions/add.svg', archivePath + '/a/b.svg'
+    ]
+
+    outputFolder = tmp_path / 'out'
+    SvgFile.SaveToFolder(svgFiles, archivePath, str(outputFolder))
+    assert sorted(str(path.relative_to(tmp_path)) for path in tmp_path.rglob('*.svg')) == [
+        'out/a/b.svg', 'out/actions/add.svg'
+    ]
+
+
+def test_files_outside_the_input_folder_are_not_saved(tmp_path):
+    svgFile = SvgFile(str(tmp_path / 'evil.svg'), ICON)
+    with pytest.raises(ValueError):
+        svgFile.getOutputFilePath(str(tmp_path / 'in'), str(tmp_path / 'out'))
+
+
+@pytest.mark.parametrize('extension', ['.zip', '.tar.gz'])
+def test_archives_round_trip(tmp_path, extension):
+    sourcePath = str(tmp_path / 'source.zip')
+    writeZip(sourcePath, ['actions/add.svg'])
+    svgFile = Archive.LoadSvgFiles(sourcePath)[0]
+    svgFile.setColorMap({ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')})
+
+    archivePath = str(tmp_path / ('icons' + extension))
+    with ArchiveWriter(archivePath) as archive:
+        archive.add(svgFile.getRelativePath(sourcePath), svgFile)
+
+    loaded = Archive.LoadSvgFiles(archivePath)
+    assert [svgFile.filePath for svgFile in loaded] == [archivePath + '/actions/add.svg']
+    assert loaded[0].content == ICON.replace(b'#4d4d4d', b'#ff0000')
@@ -0,0 +1,84 @@
+from SvgFile import SvgFile
+from Archive import ArchiveWriter
+from SvgMinifier import SvgMinifier
+from ThemeVariables import ThemeVariables
+from ChangeReport import ChangeReport, FileChange
+from ColorTable import ColorTable
+import json
+import os
+import pytest
+import subprocess
+import sys
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg">\n  <!-- x -->\n  <path style="fill:#4d4d4d;" d="M1 1L2 2"/>\n</svg>\n'
+
+
+def saveAndReport(tmp_path, mode: str, minifier) -> list:
+    inputFolder = tmp_path / 'in'
+    inputFolder.mkdir()
+    (inputFolder / 'icon.svg').write_bytes(ICON)
+    svgFiles = SvgFile.LoadFolder(str(inputFolder))
+    svgFiles[0].setColorMap({ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')})
+    outputFolder = str(tmp_path / 'out')
+    if mode == ThemeVariables.HEX:
+        SvgFile.SaveToFolder(svgFiles, str(inputFolder), outputFolder, minifier=minifier)
+    else:
+        ThemeVariables.Save(svgFiles, str(inputFolder), outputFolder, mode)
+
+    report = ChangeReport.Build(svgFiles, None, str(inputFolder), outputFolder, mode, minifier)
+    return [change.status for change in report.changes]
+
+
+def test_minified_output_is_unchanged(tmp_path):
+    assert saveAndReport(tmp_path, ThemeVariables.HEX, SvgMinifier(1)) == [FileChange.UNCHANGED]
+
+
+def test_variable_output_is_unchanged(tmp_path):
+    assert saveAndReport(tmp_path, ThemeVariables.INLINE, None) == [FileChange.UNCHANGED]
+
+
+def test_plain_output_is_unchanged(tmp_path):
+    assert saveAndReport(tmp_path, ThemeVariables.HEX, None) == [FileChange.UNCHANGED]
+
+
+def test_an_edit_that_keeps_the_size_is_a_change(tmp_path):
+    assert saveAndReport(tmp_path, ThemeVariables.HEX, None) == [FileChange.UNCHANGED]
+    outputFile = tmp_path / 'out' / 'icon.svg'
+    outputFile.write_bytes(outputFile.read_bytes().replace(b'M1 1L2 2', b'M1 1L3 3'))
+
+    svgFiles = SvgFile.LoadFolder(str(tmp_path / 'in'))
+    colorMap = {ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')}
+    report = ChangeReport.Build(svgFiles, colorMap, str(tmp_path / 'in'), str(tmp_path / 'out'))
+    assert [change.status for change in report.changes] == [FileChange.CHANGED]
+
+
+@pytest.mark.parametrize('extension', ['.zip', '.tar.gz'])
+def test_archive_output_is_compared_with_its_members(tmp_path, extension):
+    inputFolder = tmp_path / 'in'
+    inputFolder.mkdir()
+    (inputFolder / 'icon.svg').write_bytes(ICON)
+    (inputFolder / 'other.svg').write_bytes(ICON.replace(b'M1 1', b'M0 0'))
+    svgFiles = sorted(SvgFile.LoadFolder(str(inputFolder)), key=lambda svgFile: svgFile.filePath)
+    colorMap = {ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')}
+    for svgFile in svgFiles:
+        svgFile.setColorMap(colorMap)
+    archivePath = str(tmp_path / f'out{extension}')
+    with ArchiveWriter(archivePath) as archive:
+        archive.add('icon.svg', svgFiles[0])
+
+    report = ChangeReport.Build(svgFiles, None, str(inputFolder), archivePath)
+    assert [change.status for change in report.changes] == [FileChange.UNCHANGED, FileChange.NEW]
+    svgFiles[0].setColorMap({ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#00ff00')})
+    report = ChangeReport.Build(svgFiles, None, str(inputFolder), archivePath)
+    assert report.changes[0].status == FileChange.CHANGED
+
+
+def test_the_headless_report_needs_both_folders(tmp_path):
+    projectFile = tmp_path / 'project.json'
+    projectFile.write_text(json.dumps({'version': 1, 'InputFolder': str(tmp_path)}))
+    result = subprocess.run(
+        [sys.executable, 'ChangeReport.py', str(projectFile)], cwd=REPOSITORY, capture_output=True, text=True
+    )
+    assert result.returncode == 1
+    assert 'Usage:' in result.stderr
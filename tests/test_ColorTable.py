@@ -0,0 +1,19 @@
+from ColorTable import ColorTable
+from PySide6.QtGui import QColor
+
+
+def test_merged_swaps_replace_differently_written_colors():
+    swaps = {'#FF0000': '#00FF00', '#abc': '#000', 'not a color': '#fff'}
+    merged = ColorTable.MergeSwaps(swaps, {'#ff0000': '#0000ff80', '#AABBCC': '#ffffff'})
+    assert merged == {'#ff0000': '#0000ff80', '#aabbcc': '#ffffff', 'not a color': '#ffffff'}
+
+
+def test_qt_colors_keep_their_alpha():
+    color = QColor(255, 0, 0, 128)
+    assert ColorTable.ToHex(color.rgba()) == '#ff000080'
+    assert ColorTable.ToQColor(ColorTable.Parse('#ff000080')) == color
+
+
+def test_merging_none_removes_a_swap():
+    merged = ColorTable.MergeSwaps({'#FF0000': '#00ff00', '#0000ff': '#000000'}, {'#ff0000': None})
+    assert merged == {'#0000ff': '#000000'}
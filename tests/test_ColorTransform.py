@@ -0,0 +1,25 @@
+from ColorTransform import ColorTransform
+from ColorTable import ColorTable
+import numpy as np
+
+COLORS = [ColorTable.Parse(hex) for hex in ('#000000', '#ffffff', '#ff0000', '#336699', '#4d4d4d80', '#c0ffee10')]
+
+
+def test_rgb_to_hsl_and_back_is_the_same_color():
+    rgb = np.random.default_rng(0).random((500, 3))
+    assert np.allclose(ColorTransform.HslToRgb(ColorTransform.RgbToHsl(rgb)), rgb)
+
+
+def test_no_transform_leaves_the_colors_as_they_are():
+    assert ColorTransform.Apply(COLORS).tolist() == COLORS
+
+
+def test_alpha_is_kept():
+    transformed = ColorTransform.Apply(COLORS, hue=120, saturation=-50, lightness=30, invertLightness=True)
+    assert [color >> 24 for color in transformed.tolist()] == [color >> 24 for color in COLORS]
+
+
+def test_inverting_the_lightness_keeps_the_hue():
+    black, white, red = ColorTransform.Apply(COLORS[:3], invertLightness=True).tolist()
+    assert (ColorTable.ToHex(black), ColorTable.ToHex(white), ColorTable.ToHex(red)) == ('#ffffff', '#000000', '#ff0000')
+    assert ColorTable.ToHex(ColorTransform.Apply([COLORS[2]], hue=120).tolist()[0]) == '#00ff00'
@@ -0,0 +1,48 @@
+from PySide6.QtGui import QColor
+from ContrastAnalysis import ContrastAnalysis
+from ColorCalc import ColorCalc
+import numpy as np
+import pytest
+
+
+def icon(*rects: bytes) -> bytes:
+    return b'<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64">' + b''.join(rects) + b'</svg>'
+
+
+def test_luminance_matches_the_one_of_the_color_tree():
+    for hex in ('#000000', '#ffffff', '#4d4d4d', '#ff8000'):
+        color = QColor(hex)
+        rgb = np.array((color.red(), color.green(), color.blue()), dtype=np.float64)
+        assert ContrastAnalysis.RelativeLuminance(rgb) == pytest.approx(ColorCalc.RelativeLuminance(color))
+
+
+def test_pixels_are_weighed_by_how_much_they_cover():
+    # Black on three quarters of the icon, light grey on the last quarter
+    analysis = ContrastAnalysis.Analyze(icon(
+        b'<rect width="64" height="48" fill="#000000"/>',
+        b'<rect y="48" width="64" height="16" fill="#eeeeee"/>'
+    ), '#ffffff')
+    assert (analysis.good, analysis.ok, analysis.bad) == pytest.approx((0.75, 0, 0.25))
+    assert analysis.coverage == pytest.approx(1)
+    assert not analysis.isFlagged()
+
+
+def test_an_icon_mostly_blending_into_the_background_is_flagged():
+    analysis = ContrastAnalysis.Analyze(icon(b'<rect width="32" height="64" fill="#111111"/>'), '#000000')
+    assert analysis.bad == pytest.approx(1)
+    assert analysis.coverage == pytest.approx(0.5)
+    assert analysis.isFlagged()
+
+
+def test_half_transparent_pixels_count_for_half():
+    analysis = ContrastAnalysis.Analyze(icon(
+        b'<rect width="32" height="64" fill="#000000"/>',
+        b'<rect x="32" width="32" height="64" fill="#ffffff" fill-opacity="0.5"/>'
+    ), '#ffffff')
+    assert analysis.good == pytest.approx(2 / 3, abs=0.01)
+    assert analysis.coverage == pytest.approx(0.75, abs=0.01)
+
+
+def test_an_empty_icon_has_nothing_to_analyze():
+    analysis = ContrastAnalysis.Analyze(icon(), '#ffffff')
+    assert (analysis.good, analysis.ok, analysis.bad, analysis.coverage) == (0, 0, 0, 0)
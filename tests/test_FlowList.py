@@ -0,0 +1,84 @@
+from PySide6.QtCore import QRect, QModelIndex
+from PySide6.QtGui import QImage, QPainter, QColor
+from PySide6.QtWidgets import QStyleOptionViewItem
+from FlowList import FlowList, IconModel, IconProxyModel
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16"><rect width="16" height="16" style="fill:#000000;"/></svg>'
+
+
+def iconPairs(count: int) -> tuple:
+    inputIcons = [SvgFile(f'icon{row}.svg', ICON) for row in range(count)]
+    outputIcons = [svgFile.sharedCopy(svgFile.filePath) for svgFile in inputIcons]
+    for svgFile in outputIcons:
+        svgFile.setColorMap({ColorTable.Parse('#000000'): ColorTable.Parse('#ff0000')})
+
+    return inputIcons, outputIcons
+
+
+def test_a_row_holds_an_input_and_its_output():
+    inputIcons, outputIcons = iconPairs(3)
+    model = IconModel(inputIcons, outputIcons)
+    assert model.rowCount() == 3
+    index = model.index(1, 0)
+    assert index.data(IconModel.INPUTROLE) is inputIcons[1]
+    assert index.data(IconModel.OUTPUTROLE) is outputIcons[1]
+    assert index.data() == 'icon1.svg'
+
+
+def test_the_proxy_shows_rows_in_the_order_given():
+    model = IconModel(*iconPairs(4))
+    proxy = IconProxyModel()
+    proxy.setSourceModel(model)
+    assert proxy.rowCount() == 4
+
+    proxy.setRows([3, 1])
+    assert [proxy.mapToSource(proxy.index(row, 0)).row() for row in range(proxy.rowCount())] == [3, 1]
+    assert proxy.mapFromSource(model.index(1, 0)).row() == 1
+    assert proxy.mapFromSource(model.index(2, 0)) == QModelIndex()
+    # Icons being read anew show all of them again
+    model.refresh()
+    assert proxy.rowCount() == 4
+
+
+def test_a_cell_paints_the_input_left_and_the_output_right():
+    model = IconModel(*iconPairs(1))
+    delegate = FlowList.IconTextDelegate(16)
+    delegate.inputBackground = delegate.outputBackground = QColor('#ffffff')
+    # The names in a color of their own, apart from the icons
+    delegate.inputContrastingColor = delegate.outputContrastingColor = QColor('#0000ff')
+    cell = FlowList.CELLSIZE
+    image = QImage(cell.width() * 2, cell.height(), QImage.Format_ARGB32)
+    option = QStyleOptionViewItem()
+    option.rect = QRect(0, 0, cell.width() * 2, cell.height())
+
+    painter = QPainter(image)
+    delegate.paint(painter, option, model.index(0, 0))
+    painter.end()
+
+    def count(hex: str, left: int) -> int:
+        return sum(
+            image.pixelColor(x, y).name() == hex
+            for x in range(left, left + cell.width()) for y in range(cell.height())
+        )
+    assert count('#000000', 0) == 16 * 16 and count('#ff0000', 0) == 0
+    assert count('#ff0000', cell.width()) == 16 * 16 and count('#000000', cell.width()) == 0
+
+
+def test_painting_as_disabled_reuses_the_disabled_thumbnail():
+    model = IconModel(*iconPairs(1))
+    delegate = FlowList.IconTextDelegate(16)
+    delegate.setDisabledStyling(True)
+    image = QImage(FlowList.CELLSIZE.width() * 2, FlowList.CELLSIZE.height(), QImage.Format_ARGB32)
+    option = QStyleOptionViewItem()
+    option.rect = image.rect()
+
+    variants = []
+    for _ in range(2):
+        painter = QPainter(image)
+        delegate.paint(painter, option, model.index(0, 0))
+        painter.end()
+        outputSvgFile = model.index(0, 0).data(IconModel.OUTPUTROLE)
+        variants.append(outputSvgFile.getThumbnail(16).disabled)
+    assert variants[0] is not None and variants[0] is variants[1]
@@ -0,0 +1,112 @@
+import json
+import queue
+import time
+from Jobs import JobQueue, Job
+from SvgFile import SvgFile
+from RenderPool import RenderPool
+
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg">\n  <path style="fill:#000000;"/>\n</svg>\n'
+THEMES = {'Red': {'#000000': '#ff0000'}, 'Blue': {'#000000': '#0000ff'}}
+
+
+def writeInputs(tmp_path) -> list:
+    folders = []
+    for name in ('actions', 'places'):
+        folder = tmp_path / name
+        folder.mkdir()
+        (folder / f'{name}.svg').write_bytes(ICON)
+        folders.append(folder)
+
+    return folders
+
+
+def test_a_grid_of_inputs_and_themes(tmp_path):
+    writeInputs(tmp_path)
+    jobFile = tmp_path / 'jobs.json'
+    jobFile.write_text(json.dumps({
+        'version': 1,
+        'profiles': THEMES,
+        'jobs': [
+            {'input': folder, 'output': f'build/{folder}-{theme}', 'profile': theme}
+            for folder in ('actions', 'places') for theme in THEMES
+        ],
+    }))
+
+    jobQueue = JobQueue.Load(str(jobFile))
+    jobQueue.start()
+    deadline = time.time() + 60
+    while not jobQueue.isDone() and time.time() < deadline:
+        jobQueue.poll(timeout=0.5)
+    RenderPool.Shutdown()
+
+    assert [job.status for job in jobQueue.jobs] == [Job.DONE] * 4
+    for folder in ('actions', 'places'):
+        for theme, swaps in THEMES.items():
+            content = (tmp_path / 'build' / f'{folder}-{theme}' / f'{folder}.svg').read_bytes()
+            assert content == ICON.replace(b'#000000', swaps['#000000'].encode('ascii'))
+
+
+def test_a_failing_job_leaves_the_others_in_its_group_alone(tmp_path, monkeypatch):
+    inputFolder = writeInputs(tmp_path)[0]
+    saveToFolder = SvgFile.SaveToFolder
+
+    def failOnBroken(svgFiles, inputFolder, outputFolder, *arguments):
+        if outputFolder.endswith('broken'):
+            raise KeyError('boom')
+        saveToFolder(svgFiles, inputFolder, outputFolder, *arguments)
+
+    monkeypatch.setattr(SvgFile, 'SaveToFolder', failOnBroken)
+    jobs = [
+        (0, str(tmp_path / 'red'), THEMES['Red']),
+        (1, str(tmp_path / 'broken'), THEMES['Red']),
+        (2, str(tmp_path / 'missing'), None),
+        (3, str(tmp_path / 'blue'), THEMES['Blue']),
+    ]
+    results = JobQueue.RunGroup(str(inputFolder), jobs, [], 'hex', None, queue.Queue())
+    assert results == [(0, None), (1, "KeyError: 'boom'"), (2, 'No such profile'), (3, None)]
+    assert (tmp_path / 'blue' / 'actions.svg').read_bytes() == ICON.replace(b'#000000', b'#0000ff')
+
+
+def test_jobs_save_like_the_project(tmp_path):
+    inputFolder = writeInputs(tmp_path)[0]
+    layers = [{'name': 'Actions', 'pattern': 'act*', 'swaps': {'#000000': '#00ff00'}}]
+    project = {'version': 1, 'MappingLayers': layers, 'OutputColorMode': 'inline'}
+    (tmp_path / 'project.json').write_text(json.dumps(project))
+    jobFile = tmp_path / 'jobs.json'
+    jobFile.write_text(json.dumps({
+        'version': 1, 'project': 'project.json', 'profiles': THEMES,
+        'jobs': [{'input': 'actions', 'output': 'out', 'profile': 'Red'}],
+    }))
+
+    jobQueue = JobQueue.Load(str(jobFile))
+    job = jobQueue.jobs[0]
+    results = JobQueue.RunGroup(
+        str(inputFolder), [(0, job.outputFolder, job.swaps)],
+        jobQueue.layers, jobQueue.mode, jobQueue.minifier, queue.Queue()
+    )
+    assert results == [(0, None)]
+    # The layer wins over the profile, the color is set in an inline <style>
+    content = (tmp_path / 'out' / 'actions.svg').read_bytes()
+    assert b'<style>:root { --c-000000: #00ff00; }</style>' in content
+    assert b'fill:var(--c-000000,#000000);' in content
+
+
+def test_jobs_minify_when_the_project_does(tmp_path):
+    inputFolder = writeInputs(tmp_path)[0]
+    (tmp_path / 'project.json').write_text(json.dumps({'version': 1, 'Minify': True, 'MinifyPrecision': 2}))
+    jobFile = tmp_path / 'jobs.json'
+    jobFile.write_text(json.dumps({
+        'version': 1, 'project': 'project.json', 'profiles': THEMES,
+        'jobs': [{'input': 'actions', 'output': 'out', 'profile': 'Red'}],
+    }))
+
+    jobQueue = JobQueue.Load(str(jobFile))
+    assert jobQueue.minifier.precision == 2
+    results = JobQueue.RunGroup(
+        str(inputFolder), [(0, str(tmp_path / 'out'), THEMES['Red'])],
+        [], jobQueue.mode, jobQueue.minifier, queue.Queue()
+    )
+    assert results == [(0, None)]
+    assert (tmp_path / 'out' / 'actions.svg').read_bytes() == (
+        b'<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#f00;"/></svg>'
+    )
@@ -0,0 +1,85 @@
+from PySide6.QtWidgets import QApplication
+from main import MainWindow
+from Settings import SettingsVar
+import os
+import pytest
+import subprocess
+import sys
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ICONS = {
+    'arrow-left.svg': '#000000',
+    'arrow-right.svg': '#ff0000',
+    'edit.svg': '#ff0000',
+    'trash.svg': '#00ff00',
+}
+
+
+@pytest.fixture
+def window(settings, tmp_path):
+    inputFolder = tmp_path / 'icons'
+    inputFolder.mkdir()
+    for name, color in ICONS.items():
+        (inputFolder / name).write_text(f'<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:{color};"/></svg>')
+    settings.setValue(SettingsVar.INPUT_FOLDER, str(inputFolder))
+    settings.setValue(SettingsVar.OUTPUT_FOLDER, str(tmp_path / 'out'))
+    settings.setValue(SettingsVar.PROFILES, {'Default': {'#ff0000': '#0000ff'}})
+
+    window = MainWindow('test')
+    window.loadInitialIcons()
+    yield window
+    window.close()
+
+
+def shownNames(window: MainWindow) -> list:
+    model = window.flowList.model()
+    return sorted(os.path.basename(window.inputListSvgFiles[row].filePath) for row in model.rows)
+
+
+def test_the_icons_are_loaded_after_the_window_is_painted(settings, monkeypatch):
+    loads = []
+    monkeypatch.setattr(MainWindow, 'loadInitialIcons', lambda self: loads.append(self))
+    window = MainWindow('test')
+    QApplication.processEvents()
+    assert loads == []
+
+    window.show()
+    QApplication.processEvents()
+    assert window.initialIconsRequested
+    QApplication.processEvents()
+    assert loads == [window]
+    window.close()
+
+
+def test_starting_up_imports_neither_numpy_nor_pyqt5():
+    result = subprocess.run(
+        [sys.executable, '-c', 'import main, sys; print(sorted({"numpy", "PyQt5"} & set(sys.modules)))'],
+        cwd=REPOSITORY, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    )
+    assert result.stdout.strip() == '[]'
+
+
+def test_typing_a_filter_waits_for_a_pause(window):
+    window.lineEditNameFilter.setText('arrow')
+    window.lineEditNameFilter.setText('arrow-*')
+    assert window.filterTimer.isActive()
+    assert len(shownNames(window)) == len(ICONS)
+
+    window.filterTimer.timeout.emit()
+    assert shownNames(window) == ['arrow-left.svg', 'arrow-right.svg']
+
+
+def test_filters_combine(window):
+    window.lineEditColorFilter.setText('#f00')
+    window.updateIconRows()
+    assert shownNames(window) == ['arrow-right.svg', 'edit.svg']
+
+    window.lineEditNameFilter.setText('arrow')
+    window.updateIconRows()
+    assert shownNames(window) == ['arrow-right.svg']
+
+
+def test_only_the_icons_the_swaps_change(window):
+    window.checkboxChangedOnly.setChecked(True)
+    assert shownNames(window) == ['arrow-right.svg', 'edit.svg']
+    assert not window.filterTimer.isActive()
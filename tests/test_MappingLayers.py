@@ -0,0 +1,95 @@
+from MappingLayers import MappingLayers, MappingLayer
+from IconIndex import IconIndex
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+BLACK, RED, GREEN, BLUE = (ColorTable.Parse(hex) for hex in ('#000000', '#ff0000', '#00ff00', '#0000ff'))
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#000000;"/></svg>'
+OTHERICON = b'<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#0000ff;"/></svg>'
+
+
+class Settings:
+    def __init__(self):
+        self.values = {}
+
+    def setValue(self, key, value):
+        self.values[key] = value
+
+
+def loadIcons() -> list:
+    loaded = {}
+    return [
+        SvgFile.Load('arrow-left.svg', loaded, ICON),
+        SvgFile.Load('arrow-right.svg', loaded, ICON),
+        SvgFile.Load('edit.svg', loaded, OTHERICON),
+    ]
+
+
+def test_layers_stack_over_the_profile_and_the_last_one_wins():
+    svgFiles = loadIcons()
+    mappingLayers = MappingLayers(Settings(), [
+        {'name': 'Arrows', 'pattern': 'arrow-*', 'swaps': {'#000000': '#00ff00'}},
+        {'name': 'Left', 'filePaths': ['arrow-left.svg'], 'swaps': {'#000': '#0000ff'}},
+    ])
+    mappingLayers.apply(svgFiles, IconIndex(svgFiles), {BLACK: RED, BLUE: RED})
+
+    assert svgFiles[0].colorMap == {BLACK: BLUE}
+    assert svgFiles[1].colorMap == {BLACK: GREEN}
+    assert svgFiles[2].colorMap == {BLUE: RED}
+
+
+def test_files_covered_by_the_same_layers_share_one_combined_mapping():
+    svgFiles = loadIcons()
+    mappingLayers = MappingLayers(Settings(), [{'name': 'Arrows', 'pattern': 'arrow', 'swaps': {'#000000': '#00ff00'}}])
+    iconIndex = IconIndex(svgFiles)
+    mappingLayers.apply(svgFiles, iconIndex, {})
+    combined = mappingLayers.combinedColorMap({}, frozenset(), mappingLayers.layers)
+    assert combined is mappingLayers.combinedColorMap({}, frozenset(), mappingLayers.layers)
+
+    # A layer that changes is combined anew
+    mappingLayers.layers[0].setSwaps({'#000000': '#ff0000'})
+    assert mappingLayers.combinedColorMap({}, frozenset(), mappingLayers.layers) == {BLACK: RED}
+
+
+def test_covered_rows_are_kept_per_index():
+    svgFiles = loadIcons()
+    layer = MappingLayer('Arrows', 'arrow-*', ['edit.svg'])
+    mappingLayers = MappingLayers(Settings(), [])
+    iconIndex = IconIndex(svgFiles)
+    rows = mappingLayers.coveredRows(layer, iconIndex)
+    assert rows == {0, 1, 2}
+    assert mappingLayers.coveredRows(layer, iconIndex) is rows
+
+    # Another folder, another index
+    otherIndex = IconIndex(svgFiles[:2])
+    assert mappingLayers.coveredRows(layer, otherIndex) == {0, 1}
+
+
+def test_a_preview_leaves_the_layer_alone():
+    svgFiles = loadIcons()
+    settings = Settings()
+    mappingLayers = MappingLayers(settings, [{'name': 'Arrows', 'pattern': 'arrow', 'swaps': {'#000000': '#00ff00'}}])
+    layer = mappingLayers.layers[0]
+    iconIndex = IconIndex(svgFiles)
+
+    mappingLayers.setPreview(layer, {'#000000': '#ff0000'})
+    mappingLayers.apply(svgFiles, iconIndex, {})
+    assert svgFiles[0].colorMap == {BLACK: RED}
+    assert layer.swaps == {'#000000': '#00ff00'}
+
+    mappingLayers.clearPreview()
+    mappingLayers.apply(svgFiles, iconIndex, {})
+    assert svgFiles[0].colorMap == {BLACK: GREEN}
+    mappingLayers.save()
+    assert settings.values['MappingLayers'][0]['swaps'] == {'#000000': '#00ff00'}
+
+
+def test_icon_index_lookups():
+    svgFiles = loadIcons()
+    iconIndex = IconIndex(svgFiles)
+    assert iconIndex.rowsMatchingName('ARROW') == [0, 1]
+    assert iconIndex.rowsMatchingName('*-right.svg') == [1]
+    assert iconIndex.rowsWithPaths(['edit.svg', 'missing.svg']) == {2}
+    assert iconIndex.rowsWithColor(BLACK) == {0, 1}
+    assert iconIndex.rowsWithDuplicates() == {0, 1}
+    assert iconIndex.rowsChangedBy({BLACK: BLACK, BLUE: RED}) == {2}
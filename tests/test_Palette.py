@@ -0,0 +1,67 @@
+from Palette import Palette
+import numpy as np
+import pytest
+import struct
+
+
+def test_nearest_color_keeps_the_alpha():
+    swaps = Palette.NearestColors(['#1a1a1a80', '#eeeeee'], ['#000000', '#ffffff'])
+    assert swaps == {'#1a1a1a80': '#00000080', '#eeeeee': '#ffffff'}
+
+
+def test_consolidate_keeps_the_alpha():
+    swaps = Palette.Consolidate({'#101010': 10, '#11111180': 1}, clusterCount=1)
+    assert swaps == {'#11111180': '#10101080'}
+
+
+def test_colors_differing_in_alpha_alone_are_left_alone():
+    assert Palette.Consolidate({'#101010': 10, '#10101080': 1}, clusterCount=1) == {}
+
+
+def test_palette_entries_keep_their_alpha():
+    text = '#FF000080\n#00ff00, #abc\n0000ff80\n#12345\n'
+    assert Palette.ParseHexList(text) == ['#ff000080', '#00ff00', '#aabbcc', '#0000ff80']
+
+
+def test_opaque_colors_take_the_alpha_of_the_palette_entry():
+    swaps = Palette.NearestColors(['#101010', '#10101040'], ['#00000080', '#ffffff'])
+    assert swaps == {'#101010': '#00000080', '#10101040': '#00000040'}
+
+
+def test_ciede2000_matches_the_reference_data():
+    # Pairs 1, 7, 17 and 25 of Sharma, Wu and Dalal's test data
+    pairs = [
+        ((50, 2.6772, -79.7751), (50, 0, -82.7485), 2.0425),
+        ((50, 0, 0), (50, -1, 2), 2.3669),
+        ((50, 2.5, 0), (73, 25, -18), 27.1492),
+        ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ]
+    for lab1, lab2, expected in pairs:
+        assert Palette.Ciede2000(np.array([lab1]), np.array([lab2]))[0, 0] == pytest.approx(expected, abs=1e-4)
+
+
+def test_nearest_colors_are_perceptual():
+    # Closer to the blue in RGB, but a dark purple looks closer to the black
+    assert Palette.NearestColors(['#200040'], ['#000000', '#0000ff']) == {'#200040': '#000000'}
+    # Thousands of colors against a palette come out in the order they went in
+    colors = ['#{:06x}'.format(value * 997) for value in range(5000)]
+    swaps = Palette.NearestColors(colors, ['#000000', '#ffffff'])
+    assert list(swaps) == colors and set(swaps.values()) == {'#000000', '#ffffff'}
+
+
+def test_gpl_and_ase_palettes_are_read(tmp_path):
+    gpl = tmp_path / 'palette.gpl'
+    gpl.write_text('GIMP Palette\nName: test\n#\n255   0   0\tRed\n  0 128 255\tBlue\n255   0   0\tRed again\n')
+    assert Palette.Load(str(gpl)) == ['#ff0000', '#0080ff']
+
+    def block(model: bytes, values: tuple) -> bytes:
+        name = 'x\0'.encode('utf-16-be')
+        body = struct.pack('>H', 2) + name + model + struct.pack(f'>{len(values)}f', *values) + struct.pack('>H', 0)
+        return struct.pack('>HI', 0x0001, len(body)) + body
+
+    ase = tmp_path / 'palette.ase'
+    ase.write_bytes(
+        b'ASEF' + struct.pack('>HHI', 1, 0, 3)
+        + block(b'RGB ', (0, 1, 0)) + block(b'Gray', (0.5,)) + block(b'CMYK', (0, 0, 0, 1))
+    )
+    assert Palette.Load(str(ase)) == ['#00ff00', '#808080', '#000000']
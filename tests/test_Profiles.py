@@ -0,0 +1,58 @@
+from PySide6.QtGui import QGuiApplication
+from Profiles import PaletteProfiles
+from Settings import SettingsVar
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+application = QGuiApplication.instance() or QGuiApplication([])
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg"><rect width="8" height="8" style="fill:#000000;"/></svg>'
+
+
+class Settings:
+    def __init__(self, values: dict = None):
+        self.values = dict(values or {})
+
+    def value(self, key, defaultValue=None, type=None):
+        return self.values.get(key, defaultValue)
+
+    def setValue(self, key, value):
+        self.values[key] = value
+
+
+def test_the_old_single_mapping_becomes_the_default_profile():
+    profiles = PaletteProfiles(Settings({SettingsVar.COLOR_SWAPS: {'#000000': '#ffffff'}}))
+    assert profiles.names() == [PaletteProfiles.DEFAULTNAME]
+    assert profiles.current() == {'#000000': '#ffffff'}
+
+
+def test_profiles_are_created_duplicated_and_switched():
+    settings = Settings()
+    profiles = PaletteProfiles(settings)
+    profiles.setSwap('#000000', '#ffffff')
+    assert profiles.duplicate('Copy')
+    assert not profiles.create('Copy')
+    profiles.setSwap('#000000', '#ff0000')
+
+    assert profiles.currentName == 'Copy'
+    assert settings.values[SettingsVar.PROFILES] == {
+        PaletteProfiles.DEFAULTNAME: {'#000000': '#ffffff'}, 'Copy': {'#000000': '#ff0000'}
+    }
+    profiles.setCurrent(PaletteProfiles.DEFAULTNAME)
+    assert settings.values[SettingsVar.CURRENT_PROFILE] == PaletteProfiles.DEFAULTNAME
+    assert profiles.removeCurrent()
+    assert not profiles.removeCurrent()
+    assert profiles.names() == ['Copy']
+
+
+def test_switching_back_to_a_profile_reuses_its_thumbnail():
+    svgFile = SvgFile('icon.svg', ICON)
+    profiles = PaletteProfiles(Settings({SettingsVar.PROFILES: {'A': {'#000000': '#ff0000'}, 'B': {}}}))
+    thumbnails = {}
+    for name in ('A', 'B', 'A'):
+        profiles.setCurrent(name)
+        svgFile.setColorMap(ColorTable.ParseSwaps(profiles.current()))
+        slot = svgFile.getThumbnail(16)
+        assert thumbnails.setdefault(name, slot) is slot
+
+    assert thumbnails['A'] is not thumbnails['B']
+    assert thumbnails['A'].copy().toImage().pixelColor(8, 8).name() == '#ff0000'
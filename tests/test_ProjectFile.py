@@ -0,0 +1,63 @@
+from PySide6.QtCore import QSettings
+from Settings import DeferredSettings, SettingsVar
+from ProjectFile import ProjectFile
+import json
+import pytest
+
+
+def deferredSettings(tmp_path) -> DeferredSettings:
+    return DeferredSettings(QSettings(str(tmp_path / 'settings.ini'), QSettings.IniFormat))
+
+
+def test_pending_values_read_back_as_they_do_once_written(tmp_path):
+    settings = deferredSettings(tmp_path)
+    cases = [
+        (SettingsVar.SHOW_CONTRAST, 'true', bool, False),
+        (SettingsVar.PREVIEW_ICON_SIZE, '48', int, 0),
+        (SettingsVar.INPUT_FOLDER, 12, str, ''),
+        (SettingsVar.CUSTOM_INPUT_COLORS, '#ff0000', list, []),
+        (SettingsVar.CUSTOM_OUTPUT_COLORS, ['#ff0000', '#00ff00'], list, []),
+    ]
+    for key, value, valueType, default in cases:
+        settings.pending[key] = value
+    pending = [settings.value(key, default, valueType) for key, _, valueType, default in cases]
+
+    settings.flush()
+    assert pending == [settings.value(key, default, valueType) for key, _, valueType, default in cases]
+
+
+def test_removed_keys_read_as_their_default(tmp_path):
+    settings = deferredSettings(tmp_path)
+    settings.setValue(SettingsVar.INPUT_FOLDER, 'icons')
+    settings.flush()
+
+    settings.remove(SettingsVar.INPUT_FOLDER)
+    assert not settings.contains(SettingsVar.INPUT_FOLDER)
+    assert settings.value(SettingsVar.INPUT_FOLDER, '', str) == ''
+    settings.flush()
+    assert not settings.settings.contains(SettingsVar.INPUT_FOLDER)
+
+
+def test_applying_a_project_clears_what_it_does_not_have(tmp_path):
+    settings = deferredSettings(tmp_path)
+    ProjectFile.ApplyTo(settings, {
+        SettingsVar.INPUT_FOLDER.value: 'first',
+        SettingsVar.PROFILES.value: {'Dark': {'#000000': '#ffffff'}},
+        SettingsVar.MAPPING_LAYERS.value: [{'name': 'Layer'}],
+    })
+    ProjectFile.ApplyTo(settings, {SettingsVar.INPUT_FOLDER.value: 'second'})
+    settings.flush()
+
+    assert settings.value(SettingsVar.INPUT_FOLDER, '', str) == 'second'
+    assert not settings.contains(SettingsVar.PROFILES)
+    assert not settings.contains(SettingsVar.MAPPING_LAYERS)
+
+
+def test_values_of_the_wrong_type_are_refused(tmp_path):
+    filePath = tmp_path / 'project.json'
+    filePath.write_text(json.dumps({'version': ProjectFile.VERSION, SettingsVar.PROFILES.value: ['Dark']}))
+    with pytest.raises(ValueError):
+        ProjectFile.Load(str(filePath))
+
+    filePath.write_text(json.dumps({'version': ProjectFile.VERSION, SettingsVar.INPUT_FOLDER.value: 'icons'}))
+    assert ProjectFile.Load(str(filePath)) == {SettingsVar.INPUT_FOLDER.value: 'icons'}
@@ -0,0 +1,35 @@
+from PySide6.QtGui import QGuiApplication
+from RenderValidation import RenderValidation
+from SvgMinifier import SvgMinifier
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16"><rect width="16" height="16" fill="#4d4d4d"/></svg>'
+RED = {ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')}
+
+application = QGuiApplication.instance() or QGuiApplication([])
+
+
+def check(svgFile, minifier=None):
+    return RenderValidation.CheckFile(*RenderValidation.Arguments(svgFile, minifier))
+
+
+def test_arguments_leave_streamed_files_to_the_worker(tmp_path, monkeypatch):
+    filePath = tmp_path / 'icon.svg'
+    filePath.write_bytes(ICON)
+    monkeypatch.setattr(SvgFile, 'STREAMTHRESHOLD', 0)
+    svgFile = SvgFile(str(filePath))
+    svgFile.setColorMap(RED)
+
+    arguments = RenderValidation.Arguments(svgFile, SvgMinifier(1))
+    assert arguments == (str(filePath), None, svgFile.colorMap, True, 1)
+    assert RenderValidation.CheckFile(*arguments) is None
+
+
+def test_problems_are_found_in_the_worker():
+    svgFile = SvgFile('icon.svg', ICON)
+    svgFile.setColorMap(RED)
+    assert check(svgFile, SvgMinifier()) is None
+
+    assert check(SvgFile('hidden.svg', ICON.replace(b'/>', b' opacity="0"/>'))) == RenderValidation.BLANK
+    assert check(SvgFile('broken.svg', b'<svg')) == RenderValidation.INVALID
@@ -0,0 +1,116 @@
+from PySide6.QtGui import QGuiApplication
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+import pytest
+
+application = QGuiApplication.instance() or QGuiApplication([])
+
+MIXED = (
+    b'<svg xmlns="http://www.w3.org/2000/svg">'
+    b'<path style="fill:#4d4d4d;"/><rect fill="#4d4d4d"/><stop stop-color=\'#4D4D4D\'/>'
+    b'<use href="#add"/></svg>'
+)
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#000000;"/></svg>'
+
+
+def test_style_and_attribute_colors_are_both_mapped():
+    svgFile = SvgFile('mixed.svg', MIXED)
+    assert svgFile.colors == {ColorTable.Parse('#4d4d4d'): 3}
+
+    svgFile.setColorMap({ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')})
+    mapped = svgFile.getColorMappedContent()
+    assert mapped.count(b'#ff0000') == 3
+    assert b'4d4d4d' not in mapped.lower()
+    # A link to an id isn't a color, even if it reads like one
+    assert b'href="#add"' in mapped
+
+
+def test_streamed_tokens_match_the_tokens_in_memory(tmp_path):
+    filePath = tmp_path / 'mixed.svg'
+    filePath.write_bytes(MIXED)
+    tokens = [token for _, token in SvgFile.StreamTokens(str(filePath)) if token is not None]
+    assert tokens == [b'#4d4d4d', b'#4d4d4d', b'#4D4D4D']
+
+
+def saveAliases(tmp_path) -> list:
+    inputFolder = tmp_path / 'in'
+    inputFolder.mkdir()
+    for name in ('edit.svg', 'pencil.svg'):
+        (inputFolder / name).write_bytes(ICON)
+    svgFiles = sorted(SvgFile.LoadFolder(str(inputFolder)), key=lambda svgFile: svgFile.filePath)
+    assert svgFiles[0].contentHash == svgFiles[1].contentHash
+
+    return svgFiles
+
+
+def test_aliases_are_saved_as_copies(tmp_path):
+    svgFiles = saveAliases(tmp_path)
+    SvgFile.SaveToFolder(svgFiles, str(tmp_path / 'in'), str(tmp_path / 'out'))
+
+    edit, pencil = tmp_path / 'out' / 'edit.svg', tmp_path / 'out' / 'pencil.svg'
+    assert edit.read_bytes() == pencil.read_bytes() == ICON
+    assert edit.stat().st_nlink == pencil.stat().st_nlink == 1
+
+
+def test_aliases_with_different_mappings_are_written_each(tmp_path):
+    svgFiles = saveAliases(tmp_path)
+    # A layer over pencil.svg alone
+    svgFiles[1].setColorMap({ColorTable.Parse('#000000'): ColorTable.Parse('#ff0000')})
+    SvgFile.SaveToFolder(svgFiles, str(tmp_path / 'in'), str(tmp_path / 'out'))
+
+    assert (tmp_path / 'out' / 'edit.svg').read_bytes() == ICON
+    assert b'#ff0000' in (tmp_path / 'out' / 'pencil.svg').read_bytes()
+
+
+def test_a_failed_write_is_not_copied(tmp_path, monkeypatch):
+    svgFiles = saveAliases(tmp_path)
+    monkeypatch.setattr(SvgFile, 'writeColorMappedTo', lambda self, file, minifier=None: False)
+    with pytest.raises(OSError):
+        SvgFile.SaveToFolder(svgFiles, str(tmp_path / 'in'), str(tmp_path / 'out'))
+    assert not (tmp_path / 'out' / 'pencil.svg').exists()
+
+
+@pytest.mark.parametrize('ratio', [1.0, 1.5, 2.0])
+def test_pixmaps_have_the_device_pixels_of_the_ratio(ratio):
+    svgFile = SvgFile('icon.svg', ICON)
+    assert SvgFile.DevicePixels(32, ratio) == round(32 * ratio)
+
+    pixmap = svgFile.getPixmapScaledTo(32, ratio)
+    assert (pixmap.width(), pixmap.height()) == (round(32 * ratio), round(32 * ratio))
+    assert pixmap.devicePixelRatio() == ratio
+    # The same thumbnail as the size in device pixels at a ratio of 1
+    assert pixmap.toImage() == svgFile.getPixmapScaledTo(round(32 * ratio)).toImage()
+
+
+@pytest.mark.parametrize('chunkSize', [1, 2, 3, 5, 7, 11, 16])
+def test_colors_straddling_chunks_are_mapped_like_in_memory(tmp_path, monkeypatch, chunkSize):
+    filePath = tmp_path / 'mixed.svg'
+    filePath.write_bytes(MIXED * 3)
+    colorMap = {ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff000080')}
+    inMemory = SvgFile(str(filePath), MIXED * 3)
+    inMemory.setColorMap(colorMap)
+
+    monkeypatch.setattr(SvgFile, 'STREAMTHRESHOLD', 0)
+    monkeypatch.setattr(SvgFile, 'STREAMCHUNKSIZE', chunkSize)
+    assert b''.join(text + (token or b'') for text, token in SvgFile.StreamTokens(str(filePath))) == MIXED * 3
+    streamed = SvgFile(str(filePath))
+    streamed.setColorMap(colorMap)
+    assert streamed.streamed
+    assert streamed.colors == inMemory.colors
+    assert streamed.getColorMappedContent() == inMemory.getColorMappedContent()
+    assert streamed.getColorMappedSize(streamed.compiledColorMap) == len(inMemory.getColorMappedContent())
+
+
+def test_streamed_files_are_saved_without_being_read_whole(tmp_path, monkeypatch):
+    inputFolder = tmp_path / 'in'
+    inputFolder.mkdir()
+    (inputFolder / 'big.svg').write_bytes(MIXED * 50)
+    monkeypatch.setattr(SvgFile, 'STREAMTHRESHOLD', 0)
+    monkeypatch.setattr(SvgFile, 'STREAMCHUNKSIZE', 64)
+    svgFile, = SvgFile.LoadFolder(str(inputFolder))
+    svgFile.setColorMap({ColorTable.Parse('#4d4d4d'): ColorTable.Parse('#ff0000')})
+    monkeypatch.setattr(SvgFile, 'getColorMappedContent', None)
+
+    SvgFile.SaveToFolder([svgFile], str(inputFolder), str(tmp_path / 'out'))
+    saved = (tmp_path / 'out' / 'big.svg').read_bytes()
+    assert saved == SvgFile('big.svg', MIXED * 50).getContentMappedWith(svgFile.colorMap)
@@ -0,0 +1,42 @@
+from SvgMinifier import SvgMinifier
+from SvgFile import SvgFile
+
+
+def roundPath(data: bytes, precision: int = 1) -> bytes:
+    return SvgMinifier(precision).roundPath(data)
+
+
+def test_compact_arc_flags_are_left_alone():
+    assert roundPath(b'M0 0a5 5 0 015 5') == b'M0 0a5 5 0 01 5 5'
+    assert roundPath(b'M0 0A5.04 5 0 1 1 5.96 5', 0) == b'M0 0A5 5 0 1 1 6 5'
+
+
+def test_rounded_numbers_dont_run_together():
+    assert roundPath(b'M1.04.5.96-.04') == b'M1 .5 1 0'
+
+
+def test_unparsable_path_data_is_left_as_is():
+    assert roundPath(b'M0 0a5 5 0 2 1 5 5') == b'M0 0a5 5 0 2 1 5 5'
+
+
+def test_whitespace_is_only_left_out_between_tags():
+    content = (
+        b'<svg>\n  <title>Two  spaces</title>\n  <text>a <tspan>b</tspan> <tspan>c</tspan></text>\n'
+        b'  <style><![CDATA[ a  >  b ]]></style>\n  <path\n    d="M0 0"  />\n</svg>'
+    )
+    assert SvgMinifier().minify(content) == (
+        b'<svg><title>Two  spaces</title><text>a <tspan>b</tspan> <tspan>c</tspan></text>'
+        b'<style><![CDATA[ a  >  b ]]></style><path d="M0 0"/></svg>'
+    )
+
+
+def test_xml_space_is_kept_across_chunks(tmp_path, monkeypatch):
+    filePath = tmp_path / 'icon.svg'
+    filePath.write_bytes(b'<svg>\n <g xml:space="preserve">' + b'  <path/>  ' * 8 + b'</g>\n <path/>\n</svg>')
+    monkeypatch.setattr(SvgFile, 'STREAMTHRESHOLD', 0)
+    monkeypatch.setattr(SvgFile, 'STREAMCHUNKSIZE', 16)
+    svgFile = SvgFile(str(filePath))
+    assert svgFile.streamed
+
+    minified = b''.join(SvgMinifier().iterateChunks(svgFile))
+    assert minified == b'<svg><g xml:space="preserve">' + b'  <path/>  ' * 8 + b'</g><path/></svg>'
@@ -0,0 +1,48 @@
+from ThemeVariables import ThemeVariables
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+BLACK, RED, GREEN = ColorTable.Parse('#000000'), ColorTable.Parse('#ff0000'), ColorTable.Parse('#00ff00')
+
+
+def icon(comment: bytes = b'') -> bytes:
+    return b'<?xml version="1.0"?>\n<!--' + comment + b'-->\n<svg xmlns="http://www.w3.org/2000/svg"><path style="fill:#000000;"/></svg>'
+
+
+def test_the_style_goes_in_the_root_element_when_it_starts_in_a_later_chunk(tmp_path, monkeypatch):
+    filePath = tmp_path / 'icon.svg'
+    filePath.write_bytes(icon(b'x' * 300))
+    monkeypatch.setattr(SvgFile, 'STREAMTHRESHOLD', 0)
+    monkeypatch.setattr(SvgFile, 'STREAMCHUNKSIZE', 64)
+    svgFile = SvgFile(str(filePath))
+    svgFile.setColorMap({BLACK: RED})
+    assert svgFile.streamed
+
+    headers = ThemeVariables.Headers(svgFile, ThemeVariables.INLINE, str(filePath), str(tmp_path), {})
+    content = b''.join(ThemeVariables.IterateChunks(svgFile, headers))
+    assert content == icon(b'x' * 300).replace(
+        b'<svg xmlns="http://www.w3.org/2000/svg">',
+        b'<svg xmlns="http://www.w3.org/2000/svg"><style>:root { --c-000000: #ff0000; }</style>'
+    ).replace(b'#000000;', b'var(--c-000000,#000000);')
+
+
+def test_the_stylesheet_has_the_colors_of_the_layers(tmp_path):
+    inputFolder = tmp_path / 'in'
+    inputFolder.mkdir()
+    for name in ('a', 'b', 'c'):
+        (inputFolder / f'{name}.svg').write_bytes(icon(name.encode('ascii')))
+    svgFiles = sorted(SvgFile.LoadFolder(str(inputFolder)), key=lambda svgFile: svgFile.filePath)
+    # Like a layer over two of the icons and another one over the third
+    svgFiles[0].setColorMap({BLACK: RED})
+    svgFiles[1].setColorMap({BLACK: RED})
+    svgFiles[2].setColorMap({BLACK: GREEN})
+
+    outputFolder = tmp_path / 'out'
+    assert ThemeVariables.Save(svgFiles, str(inputFolder), str(outputFolder), ThemeVariables.STYLESHEET) == 3
+    assert '--c-000000: #ff0000;' in (outputFolder / ThemeVariables.STYLESHEETNAME).read_text()
+    assert b'<style>' not in (outputFolder / 'a.svg').read_bytes()
+    assert b'<style>:root { --c-000000: #00ff00; }</style>' in (outputFolder / 'c.svg').read_bytes()
+    assert b'<?xml-stylesheet type="text/css" href="palette.css"?>' in (outputFolder / 'c.svg').read_bytes()
+
+    # Saved again the same way nothing is written
+    assert ThemeVariables.Save(svgFiles, str(inputFolder), str(outputFolder), ThemeVariables.STYLESHEET) == 0
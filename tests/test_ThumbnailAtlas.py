@@ -0,0 +1,68 @@
+from PySide6.QtCore import QByteArray
+from PySide6.QtSvg import QSvgRenderer
+from ThumbnailAtlas import ThumbnailAtlas
+import pytest
+
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16"><rect width="16" height="16" fill="#ff0000"/></svg>'
+
+
+@pytest.fixture
+def atlas(monkeypatch) -> ThumbnailAtlas:
+    # 4 slots a page, 8 in all
+    monkeypatch.setattr(ThumbnailAtlas, 'PAGESIZE', 32)
+    monkeypatch.setattr(ThumbnailAtlas, 'MAXPAGES', 2)
+    return ThumbnailAtlas(16)
+
+
+def test_atlases_are_shared_per_size():
+    assert ThumbnailAtlas.ForSize(24) is ThumbnailAtlas.ForSize(24)
+    assert ThumbnailAtlas.ForSize(24) is not ThumbnailAtlas.ForSize(48)
+
+
+def test_the_least_recently_used_slot_is_reused_when_full(atlas):
+    slots = [atlas.allocate() for _ in range(8)]
+    assert len(atlas.pages) == 2
+    assert len({(slot.page, slot.rect.x(), slot.rect.y()) for slot in slots}) == 8
+
+    atlas.touch(slots[0])
+    slot = atlas.allocate()
+    assert len(atlas.pages) == 2
+    assert slots[0].valid and not slots[1].valid
+    assert (slot.page, slot.rect) == (slots[1].page, slots[1].rect)
+
+
+def test_released_slots_are_reused_first(atlas):
+    slots = [atlas.allocate() for _ in range(5)]
+    atlas.release(slots[2])
+    assert not slots[2].valid
+
+    slot = atlas.allocate()
+    assert (slot.page, slot.rect) == (slots[2].page, slots[2].rect)
+    assert all(slot.valid for slot in slots[:2] + slots[3:])
+
+
+def test_thumbnails_are_drawn_into_their_slot_only(atlas):
+    first, second = atlas.allocate(), atlas.allocate()
+    atlas.render(second, QSvgRenderer(QByteArray(ICON)))
+    assert second.copy().toImage().pixelColor(8, 8).name() == '#ff0000'
+    assert first.copy().toImage().pixelColor(8, 8).alpha() == 0
+
+
+def test_the_disabled_variant_is_made_once(atlas):
+    slot = atlas.allocate()
+    atlas.render(slot, QSvgRenderer(QByteArray(ICON)))
+    variant = atlas.disabledVariant(slot)
+    assert atlas.disabledVariant(slot) is variant
+    assert variant.copy().toImage() != slot.copy().toImage()
+
+    # Drawing the thumbnail anew drops the variant made from what was there before
+    atlas.render(slot, QSvgRenderer(QByteArray(ICON)))
+    assert slot.disabled is None and not variant.valid
+    assert atlas.disabledVariant(slot) is not variant
+
+
+def test_the_variant_goes_along_with_its_thumbnail(atlas):
+    slot = atlas.allocate()
+    variant = atlas.disabledVariant(slot)
+    atlas.release(slot)
+    assert not variant.valid
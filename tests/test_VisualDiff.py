@@ -0,0 +1,36 @@
+from PySide6.QtGui import QGuiApplication
+from VisualDiff import VisualDiff
+from SvgFile import SvgFile
+from ColorTable import ColorTable
+
+ICON = b'<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16"><rect width="16" height="16" fill="#000000"/></svg>'
+
+application = QGuiApplication.instance() or QGuiApplication([])
+
+
+def test_scores_from_the_pool_are_kept_for_the_mapping_they_were_made_for():
+    svgFile = SvgFile('icon.svg', ICON)
+    svgFile.setColorMap({ColorTable.Parse('#000000'): ColorTable.Parse('#ffffff')})
+    assert VisualDiff.CachedScore(svgFile, 16) is None
+
+    score = VisualDiff.ScoreFile(*VisualDiff.Arguments(svgFile, 16))
+    assert score > 0.99
+    VisualDiff.SetScore(svgFile, svgFile.compiledColorMap.key, 16, score)
+    assert VisualDiff.CachedScore(svgFile, 16) == score
+    assert VisualDiff.CachedScore(svgFile, 32) is None
+
+    # A score that arrives after the mapping changed is of no use
+    outdatedKey = svgFile.compiledColorMap.key
+    svgFile.setColorMap({})
+    assert VisualDiff.CachedScore(svgFile, 16) is None
+    VisualDiff.SetScore(svgFile, outdatedKey, 16, score)
+    assert VisualDiff.CachedScore(svgFile, 16) is None
+    assert VisualDiff.ScoreFile(*VisualDiff.Arguments(svgFile, 16)) == 0.0
+
+
+def test_painted_diffs_count_as_scores():
+    original = SvgFile('icon.svg', ICON)
+    mapped = original.sharedCopy('icon.svg')
+    mapped.setColorMap({ColorTable.Parse('#000000'): ColorTable.Parse('#ffffff')})
+    visualDiff = VisualDiff.Get(mapped, original, 16)
+    assert VisualDiff.CachedScore(mapped, 16) == visualDiff.score > 0.99